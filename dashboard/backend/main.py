@@ -2,11 +2,19 @@
 FastAPI backend for the Customer Experience Analytics Dashboard.
 Serves review data from PostgreSQL to the React frontend.
 """
-from fastapi import FastAPI, Query
+import os
+import sys
+from fastapi import FastAPI, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
 from database import fetch_all, fetch_one
 from typing import Optional
 
+# Project root, for the analysis package (src/) and persisted topic models
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(ROOT)
+TOPIC_MODEL_DIR = os.path.join(ROOT, "data", "models", "lda")
+
 app = FastAPI(
     title="Bank Reviews Analytics API",
     description="API for the Customer Experience Analytics Dashboard",
@@ -23,10 +31,21 @@ app.add_middleware(
 )
 
 
-def _bank_filter(bank: Optional[str]) -> tuple[str, tuple]:
+# reviews is partitioned by bank_id: filtering on bank_id (resolved from the
+# name in an InitPlan) lets PostgreSQL prune to the bank's partition at run time
+BANK_ID_CONDITION = "{alias}.bank_id = (SELECT bank_id FROM banks WHERE bank_name = %s)"
+
+# Aggregate endpoints read the review_summary materialized view (one row per
+# bank × theme × sentiment_label × month, refreshed by insert_reviews.py), so
+# their cost does not grow with the reviews table. Averages are ratios of
+# the stored sums and counts.
+AVG_SENTIMENT = "ROUND((SUM(s.sentiment_sum) / NULLIF(SUM(s.sentiment_count), 0))::numeric, 3)"
+
+
+def _bank_filter(bank: Optional[str], alias: str = "s") -> tuple[str, tuple]:
     """Return SQL WHERE clause and params for optional bank filter."""
     if bank and bank.lower() != "all":
-        return "WHERE b.bank_name = %s", (bank,)
+        return "WHERE " + BANK_ID_CONDITION.format(alias=alias), (bank,)
     return "", ()
 
 
@@ -48,15 +67,14 @@ def get_summary(bank: Optional[str] = Query(None)):
     where, params = _bank_filter(bank)
     query = f"""
         SELECT
-            COUNT(*)                               AS total_reviews,
-            ROUND(AVG(r.rating)::numeric, 2)       AS avg_rating,
-            ROUND(AVG(r.sentiment_score)::numeric, 3) AS avg_sentiment,
-            ROUND(100.0 * SUM(CASE WHEN r.sentiment_label = 'positive' THEN 1 ELSE 0 END)
-                  / NULLIF(COUNT(*), 0), 1)        AS pct_positive,
-            ROUND(100.0 * SUM(CASE WHEN r.sentiment_label = 'negative' THEN 1 ELSE 0 END)
-                  / NULLIF(COUNT(*), 0), 1)        AS pct_negative
-        FROM reviews r
-        JOIN banks b ON r.bank_id = b.bank_id
+            COALESCE(SUM(s.review_count), 0)::bigint AS total_reviews,
+            ROUND(SUM(s.rating_sum)::numeric / NULLIF(SUM(s.review_count), 0), 2) AS avg_rating,
+            {AVG_SENTIMENT}                        AS avg_sentiment,
+            ROUND(100.0 * COALESCE(SUM(s.review_count) FILTER (WHERE s.sentiment_label = 'positive'), 0)
+                  / NULLIF(SUM(s.review_count), 0), 1) AS pct_positive,
+            ROUND(100.0 * COALESCE(SUM(s.review_count) FILTER (WHERE s.sentiment_label = 'negative'), 0)
+                  / NULLIF(SUM(s.review_count), 0), 1) AS pct_negative
+        FROM review_summary s
         {where}
     """
     return fetch_one(query, params)
@@ -72,13 +90,12 @@ def get_themes(bank: Optional[str] = Query(None)):
     where, params = _bank_filter(bank)
     query = f"""
         SELECT
-            r.theme,
-            COUNT(*)                               AS review_count,
-            ROUND(AVG(r.sentiment_score)::numeric, 3) AS avg_sentiment
-        FROM reviews r
-        JOIN banks b ON r.bank_id = b.bank_id
+            s.theme,
+            SUM(s.review_count)::bigint            AS review_count,
+            {AVG_SENTIMENT}                        AS avg_sentiment
+        FROM review_summary s
         {where}
-        GROUP BY r.theme
+        GROUP BY s.theme
         ORDER BY review_count DESC
     """
     return fetch_all(query, params)
@@ -94,13 +111,12 @@ def get_sentiment(bank: Optional[str] = Query(None)):
     where, params = _bank_filter(bank)
     query = f"""
         SELECT
-            r.sentiment_label,
-            COUNT(*) AS count
-        FROM reviews r
-        JOIN banks b ON r.bank_id = b.bank_id
+            s.sentiment_label,
+            SUM(s.review_count)::bigint AS count
+        FROM review_summary s
         {where}
-        GROUP BY r.sentiment_label
-        ORDER BY r.sentiment_label
+        GROUP BY s.sentiment_label
+        ORDER BY s.sentiment_label
     """
     rows = fetch_all(query, params)
     # Return as dict: {positive: N, negative: N, neutral: N}
@@ -118,18 +134,26 @@ def get_reviews(
     bank: Optional[str] = Query(None),
     theme: Optional[str] = Query(None),
     sentiment: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, max_length=200),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
 ):
     """
     Return paginated reviews sorted by topic_confidence DESC.
-    Filterable by bank, theme, and sentiment label.
+    Filterable by bank, theme, and sentiment label. With q, full-text
+    search (web search syntax: "quoted phrases", or, -exclude) over the
+    review text, ranked by relevance.
+    A review is identified by (review_id, bank_id): review_id is only
+    unique within a bank. The key breaks ties in the ordering, so pages
+    neither repeat nor skip reviews of equal rank / confidence.
     """
     conditions = []
     params = []
+    search_from, search_params = "", []
+    rank, order = "", "r.topic_confidence DESC"
 
     if bank and bank.lower() != "all":
-        conditions.append("b.bank_name = %s")
+        conditions.append(BANK_ID_CONDITION.format(alias="r"))
         params.append(bank)
     if theme:
         conditions.append("r.theme = %s")
@@ -137,6 +161,13 @@ def get_reviews(
     if sentiment:
         conditions.append("r.sentiment_label = %s")
         params.append(sentiment)
+    if q and q.strip():
+        # GIN index on search_vector; the query is parsed once per request
+        search_from = "\n        CROSS JOIN websearch_to_tsquery('english', %s) AS query"
+        search_params = [q]
+        conditions.append("r.search_vector @@ query")
+        rank = ",\n            ts_rank(r.search_vector, query) AS rank"
+        order = "rank DESC, r.topic_confidence DESC"
 
     where = ""
     if conditions:
@@ -148,6 +179,7 @@ def get_reviews(
     query = f"""
         SELECT
             r.review_id,
+            r.bank_id,
             r.review_text,
             r.rating,
             r.review_date,
@@ -155,23 +187,22 @@ def get_reviews(
             r.sentiment_score,
             r.sentiment_label,
             r.topic_confidence,
-            r.theme
+            r.theme{rank}
         FROM reviews r
-        JOIN banks b ON r.bank_id = b.bank_id
+        JOIN banks b ON r.bank_id = b.bank_id{search_from}
         {where}
-        ORDER BY r.topic_confidence DESC
+        ORDER BY {order}, r.review_id, r.bank_id
         LIMIT %s OFFSET %s
     """
-    reviews = fetch_all(query, tuple(params))
+    reviews = fetch_all(query, tuple(search_params + params))
 
     # Also get total count for pagination
     count_query = f"""
         SELECT COUNT(*) AS total
-        FROM reviews r
-        JOIN banks b ON r.bank_id = b.bank_id
+        FROM reviews r{search_from}
         {where}
     """
-    count_params = tuple(params[:-2])  # exclude limit and offset
+    count_params = tuple(search_params + params[:-2])  # exclude limit and offset
     total = fetch_one(count_query, count_params)
 
     return {
@@ -191,21 +222,62 @@ def get_theme_sentiment(bank: Optional[str] = Query(None)):
     where, params = _bank_filter(bank)
     query = f"""
         SELECT
-            r.theme,
-            r.sentiment_label,
-            COUNT(*) AS count,
-            ROUND(AVG(r.sentiment_score)::numeric, 3) AS avg_sentiment,
-            ROUND(MIN(r.sentiment_score)::numeric, 3) AS min_sentiment,
-            ROUND(MAX(r.sentiment_score)::numeric, 3) AS max_sentiment
-        FROM reviews r
-        JOIN banks b ON r.bank_id = b.bank_id
+            s.theme,
+            s.sentiment_label,
+            SUM(s.review_count)::bigint AS count,
+            {AVG_SENTIMENT} AS avg_sentiment,
+            ROUND(MIN(s.sentiment_min)::numeric, 3) AS min_sentiment,
+            ROUND(MAX(s.sentiment_max)::numeric, 3) AS max_sentiment
+        FROM review_summary s
         {where}
-        GROUP BY r.theme, r.sentiment_label
-        ORDER BY r.theme, r.sentiment_label
+        GROUP BY s.theme, s.sentiment_label
+        ORDER BY s.theme, s.sentiment_label
     """
     return fetch_all(query, params)
 
 
+# ── Topic Inference (persisted per-bank LDA models) ──────────────
+_topic_inference = None
+
+
+def _get_topic_inference():
+    """Load the inference API on first use; models are cached per bank."""
+    global _topic_inference
+    if _topic_inference is None:
+        from src.topic_inference import TopicInference
+        _topic_inference = TopicInference(TOPIC_MODEL_DIR)
+    return _topic_inference
+
+
+class TopicRequest(BaseModel):
+    bank: str
+    texts: list[str]
+
+
+@app.get("/api/topics")
+def get_topics(bank: str = Query(...), n_words: int = Query(10, ge=1, le=50)):
+    """
+    Return the top words of each topic of a bank's latest model.
+    """
+    try:
+        return _get_topic_inference().topics(bank, n_words=n_words)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/api/topics/predict")
+def predict_topics(request: TopicRequest):
+    """
+    Assign topic_id / topic_confidence to a batch of new review texts
+    with the bank's latest model.
+    """
+    try:
+        result = _get_topic_inference().predict(request.bank, request.texts)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return result.to_dict(orient="records")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -38,11 +38,13 @@ export async function fetchReviews(
   sentiment,
   page = 1,
   limit = 10,
+  q = "",
 ) {
   const params = new URLSearchParams();
   if (bank && bank !== "All") params.set("bank", bank);
   if (theme) params.set("theme", theme);
   if (sentiment) params.set("sentiment", sentiment);
+  if (q) params.set("q", q);
   params.set("page", page);
   params.set("limit", limit);
   const res = await fetch(`${API_BASE}/api/reviews?${params.toString()}`);
@@ -1,9 +1,12 @@
 import { useEffect, useState } from "react";
 import { fetchThemes } from "../api/client";
 import ThemeCard from "./ThemeCard";
+import SearchResults from "./SearchResults";
 
 export default function ReviewsExplorer({ selectedBank }) {
   const [themes, setThemes] = useState([]);
+  const [input, setInput] = useState("");
+  const [query, setQuery] = useState("");
 
   useEffect(() => {
     fetchThemes(selectedBank).then(setThemes);
@@ -14,9 +17,37 @@ export default function ReviewsExplorer({ selectedBank }) {
       <h2 className="section-title">📋 Reviews Explorer</h2>
       <p className="section-sub">
         Click a theme to explore positive & negative reviews, sorted by topic
-        confidence.
+        confidence, or search the review text.
       </p>
-      {themes.length === 0 ? (
+      <form
+        className="search-bar"
+        onSubmit={(e) => {
+          e.preventDefault();
+          setQuery(input.trim());
+        }}
+      >
+        <input
+          type="search"
+          className="search-input"
+          placeholder='Search reviews, e.g. otp, "transfer failed", telebirr -fee'
+          value={input}
+          onChange={(e) => {
+            setInput(e.target.value);
+            if (!e.target.value) setQuery("");
+          }}
+        />
+        <button type="submit" className="tab-btn">
+          🔍 Search
+        </button>
+      </form>
+      {query ? (
+        // Remount per search so paging restarts at page 1
+        <SearchResults
+          key={`${selectedBank}|${query}`}
+          query={query}
+          selectedBank={selectedBank}
+        />
+      ) : themes.length === 0 ? (
         <p className="loading-text">Loading themes...</p>
       ) : (
         themes.map((t) => (
@@ -0,0 +1,60 @@
+import { useState, useEffect } from "react";
+import { fetchReviews } from "../api/client";
+import ReviewRow from "./ReviewRow";
+
+export default function SearchResults({ query, selectedBank }) {
+  const [reviews, setReviews] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState(1);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    let active = true;
+    // eslint-disable-next-line
+    setLoading(true);
+    fetchReviews(selectedBank, null, null, page, 10, query).then((res) => {
+      if (!active) return;
+      setReviews(res.reviews || []);
+      setTotal(res.total || 0);
+      setLoading(false);
+    });
+    return () => {
+      active = false;
+    };
+  }, [query, selectedBank, page]);
+
+  const totalPages = Math.ceil(total / 10);
+
+  if (loading) return <p className="loading-text">Searching reviews...</p>;
+  if (reviews.length === 0)
+    return <p className="empty-text">No reviews match “{query}”.</p>;
+
+  return (
+    <div className="search-results">
+      <p className="search-count">
+        {total} reviews match “{query}”, most relevant first
+      </p>
+      <div className="reviews-list">
+        {reviews.map((r) => (
+          <ReviewRow key={`${r.bank_id}-${r.review_id}`} review={r} />
+        ))}
+      </div>
+      {totalPages > 1 && (
+        <div className="pagination">
+          <button disabled={page <= 1} onClick={() => setPage(page - 1)}>
+            ← Prev
+          </button>
+          <span>
+            Page {page} of {totalPages}
+          </span>
+          <button
+            disabled={page >= totalPages}
+            onClick={() => setPage(page + 1)}
+          >
+            Next →
+          </button>
+        </div>
+      )}
+    </div>
+  );
+}
@@ -80,7 +80,7 @@ export default function ThemeCard({ theme, selectedBank }) {
             <>
               <div className="reviews-list">
                 {reviews.map((r) => (
-                  <ReviewRow key={r.review_id} review={r} />
+                  <ReviewRow key={`${r.bank_id}-${r.review_id}`} review={r} />
                 ))}
               </div>
               {totalPages > 1 && (
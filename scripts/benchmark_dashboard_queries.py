@@ -0,0 +1,200 @@
+"""
+Benchmark the dashboard API queries with EXPLAIN (ANALYZE, BUFFERS).
+
+Runs the SQL behind /api/summary, /api/themes, /api/sentiment,
+/api/theme-sentiment and /api/reviews (filtered list, full-text search +
+count) for all banks
+and for one bank, and reports planning / execution time, shared buffers
+touched, partitions scanned and the scan types of each plan. Save a run
+before applying scripts/migrations/001_partition_reviews.sql and compare
+after it:
+
+    python scripts/benchmark_dashboard_queries.py --save before.json
+    psql ... -1 -f scripts/migrations/001_partition_reviews.sql
+    python scripts/benchmark_dashboard_queries.py --baseline before.json
+
+Usage:
+    python scripts/benchmark_dashboard_queries.py [--bank NAME] [--repeat N]
+        [--q QUERY] [--save path.json] [--baseline path.json] [--show-plans]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from scripts.insert_reviews import connect
+
+BANK_ID_CONDITION = "r.bank_id = (SELECT bank_id FROM banks WHERE bank_name = %(bank)s)"
+
+# (name, SQL with an optional {where}) — mirrors dashboard/backend/main.py; the
+# aggregates are timed over reviews and, as the API now serves them, over the
+# review_summary materialized view
+QUERIES = (
+    ("summary", """
+        SELECT COUNT(*), AVG(r.rating), AVG(r.sentiment_score),
+               SUM(CASE WHEN r.sentiment_label = 'positive' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN r.sentiment_label = 'negative' THEN 1 ELSE 0 END)
+        FROM reviews r {where}
+    """),
+    ("themes", """
+        SELECT r.theme, COUNT(*) AS review_count, AVG(r.sentiment_score)
+        FROM reviews r {where}
+        GROUP BY r.theme ORDER BY review_count DESC
+    """),
+    ("sentiment", """
+        SELECT r.sentiment_label, COUNT(*)
+        FROM reviews r {where}
+        GROUP BY r.sentiment_label ORDER BY r.sentiment_label
+    """),
+    ("theme-sentiment", """
+        SELECT r.theme, r.sentiment_label, COUNT(*), AVG(r.sentiment_score),
+               MIN(r.sentiment_score), MAX(r.sentiment_score)
+        FROM reviews r {where}
+        GROUP BY r.theme, r.sentiment_label ORDER BY r.theme, r.sentiment_label
+    """),
+    ("theme-sentiment (review_summary)", """
+        SELECT r.theme, r.sentiment_label, SUM(r.review_count),
+               SUM(r.sentiment_sum) / NULLIF(SUM(r.sentiment_count), 0),
+               MIN(r.sentiment_min), MAX(r.sentiment_max)
+        FROM review_summary r {where}
+        GROUP BY r.theme, r.sentiment_label ORDER BY r.theme, r.sentiment_label
+    """),
+    ("reviews", """
+        SELECT r.review_id, r.review_text, r.rating, r.review_date, b.bank_name,
+               r.sentiment_score, r.sentiment_label, r.topic_confidence, r.theme
+        FROM reviews r JOIN banks b ON r.bank_id = b.bank_id
+        {where}
+        ORDER BY r.topic_confidence DESC, r.review_id, r.bank_id
+        LIMIT 20 OFFSET 0
+    """),
+    ("reviews (theme+sentiment)", """
+        SELECT r.review_id, r.review_text, r.rating, r.review_date, b.bank_name,
+               r.sentiment_score, r.sentiment_label, r.topic_confidence, r.theme
+        FROM reviews r JOIN banks b ON r.bank_id = b.bank_id
+        {where} {and_where} r.theme = %(theme)s AND r.sentiment_label = %(sentiment)s
+        ORDER BY r.topic_confidence DESC, r.review_id, r.bank_id
+        LIMIT 20 OFFSET 0
+    """),
+    ("reviews (search)", """
+        SELECT r.review_id, r.review_text, r.rating, r.review_date, b.bank_name,
+               r.sentiment_score, r.sentiment_label, r.topic_confidence, r.theme,
+               ts_rank(r.search_vector, query) AS rank
+        FROM reviews r JOIN banks b ON r.bank_id = b.bank_id
+        CROSS JOIN websearch_to_tsquery('english', %(q)s) AS query
+        {where} {and_where} r.search_vector @@ query
+        ORDER BY rank DESC, r.topic_confidence DESC, r.review_id, r.bank_id
+        LIMIT 20 OFFSET 0
+    """),
+    ("reviews count", """
+        SELECT COUNT(*) FROM reviews r
+        {where} {and_where} r.theme = %(theme)s AND r.sentiment_label = %(sentiment)s
+    """),
+)
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def explain(cur, sql, params):
+    """EXPLAIN (ANALYZE, BUFFERS) of one query; returns a metrics dict."""
+    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+    plan = cur.fetchone()[0][0]
+    nodes = list(_walk(plan["Plan"]))
+    scans = [n for n in nodes if n.get("Relation Name", "").startswith(("reviews", "review_summary"))]
+    return {
+        "planning_ms": plan["Planning Time"],
+        "execution_ms": plan["Execution Time"],
+        "shared_hit": plan["Plan"].get("Shared Hit Blocks", 0),
+        "shared_read": plan["Plan"].get("Shared Read Blocks", 0),
+        "partitions": len({n["Relation Name"] for n in scans}),
+        "scans": sorted({n["Node Type"] for n in scans}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bank", default=None, help="Bank for the per-bank runs (default: first bank)")
+    parser.add_argument("--theme", default=None, help="Theme filter (default: most common theme)")
+    parser.add_argument("--sentiment", default="negative", help="Sentiment label filter")
+    parser.add_argument("--q", default="otp", help="Full-text search query")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (best is reported)")
+    parser.add_argument("--save", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON file of an earlier run to compare against")
+    parser.add_argument("--show-plans", action="store_true", help="Print the text plan of every query")
+    args = parser.parse_args()
+
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = 'reviews'::regclass")
+        partitioned = cur.fetchone()[0]
+        cur.execute("SELECT to_regclass('review_summary') IS NOT NULL")
+        has_summary = cur.fetchone()[0]
+        cur.execute("""
+            SELECT EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'reviews' AND column_name = 'search_vector')
+        """)
+        has_search = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM reviews")
+        n_reviews = cur.fetchone()[0]
+        if args.bank is None:
+            cur.execute("SELECT bank_name FROM banks ORDER BY bank_name LIMIT 1")
+            args.bank = cur.fetchone()[0]
+        if args.theme is None:
+            cur.execute("SELECT theme FROM reviews GROUP BY theme ORDER BY COUNT(*) DESC LIMIT 1")
+            args.theme = cur.fetchone()[0]
+        print(f"reviews: {n_reviews:,} rows, {'partitioned' if partitioned else 'heap table'}; "
+              f"bank={args.bank!r} theme={args.theme!r} sentiment={args.sentiment!r}")
+
+        params = {"bank": args.bank, "theme": args.theme, "sentiment": args.sentiment, "q": args.q}
+        baseline = {}
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+
+        results = {}
+        header = f"\n{'Query':<44}{'Plan ms':>9}{'Exec ms':>10}{'Buffers':>10}{'Parts':>7}"
+        print(header + (f"{'Speed-up':>10}" if baseline else "") + "  Scans")
+        for name, template in QUERIES:
+            if ("review_summary" in template and not has_summary
+                    or "search_vector" in template and not has_search):
+                continue
+            for scope in ("all banks", "one bank"):
+                where = f"WHERE {BANK_ID_CONDITION}" if scope == "one bank" else ""
+                and_where = "AND" if where else "WHERE"
+                sql = template.format(where=where, and_where=and_where)
+                runs = [explain(cur, sql, params) for _ in range(args.repeat)]
+                best = min(runs, key=lambda r: r["execution_ms"])
+                key = f"{name} / {scope}"
+                results[key] = best
+
+                line = (f"{key:<44}{best['planning_ms']:>9.2f}{best['execution_ms']:>10.2f}"
+                        f"{best['shared_hit'] + best['shared_read']:>10,}{best['partitions']:>7}")
+                if baseline:
+                    before = baseline.get(key)
+                    line += f"{before['execution_ms'] / best['execution_ms']:>9.1f}x" if before else f"{'–':>10}"
+                print(f"{line}  {', '.join(best['scans'])}")
+
+                if args.show_plans:
+                    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+                    print("\n".join("      " + row for row, in cur.fetchall()) + "\n")
+
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump({"partitioned": partitioned, "reviews": n_reviews, "params": params,
+                           "results": results}, f, indent=2)
+            print(f"\n✓ Results saved to: {args.save}")
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
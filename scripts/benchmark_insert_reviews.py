@@ -0,0 +1,101 @@
+"""
+Benchmark insert_reviews load paths: rows/sec of execute_values vs COPY.
+
+Loads the same prepared rows into a scratch copy of the reviews table
+(CREATE TEMP TABLE ... LIKE reviews INCLUDING ALL, so the primary key and
+indexes are the real ones) with each mode — execute_values, COPY over one
+connection and parallel COPY over N connections into UNLOGGED staging
+tables — and reports rows/sec. The merge runs in one transaction that is
+rolled back, so the real reviews table is never touched. Needs a PostgreSQL
+database with schema.sql applied.
+
+Usage:
+    python scripts/benchmark_insert_reviews.py [--csv path] [--rows N] [--jobs 1,4]
+"""
+
+import os
+import sys
+import time
+import uuid
+import itertools
+import argparse
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from scripts.insert_reviews import (
+    connect, fetch_bank_map, prepare_rows, insert_rows, copy_rows, drop_staging, staging_prefix, COPY_CHUNK_SIZE,
+)
+
+CSV_PATH = os.path.join(ROOT, "data", "processed", "reviews_with_themes_lda.csv")
+
+SCRATCH_TABLE = "bench_reviews"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=CSV_PATH, help="Reviews CSV (reviews_with_themes_lda.csv)")
+    parser.add_argument("--rows", type=int, default=None,
+                        help="Replicate/trim the CSV to this many rows (unique review_ids)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is reported)")
+    parser.add_argument("--chunk-size", type=int, default=COPY_CHUNK_SIZE, help="Rows per COPY chunk")
+    parser.add_argument("--jobs", default="1,4", help="Comma-separated COPY connection counts")
+    args = parser.parse_args()
+
+    print(f"Loading CSV from: {args.csv}")
+    df = pd.read_csv(args.csv)
+    if args.rows:
+        copies = -(-args.rows // len(df))
+        df = pd.concat([df.assign(review_id=df["review_id"].astype(str) + f"-{i}") for i in range(copies)],
+                       ignore_index=True).iloc[:args.rows]
+    print(f"  → {len(df):,} reviews")
+
+    # Staging tables of this benchmark only (other loads may be running); every
+    # load gets its own names, as the dropped tables of earlier loads stay
+    # locked until the final rollback
+    run_id = f"bench{uuid.uuid4().hex[:8]}"
+    load_ids = (f"{run_id}_{n}" for n in itertools.count())
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        bank_map = fetch_bank_map(cur)
+        start = time.perf_counter()
+        rows = prepare_rows(df, bank_map)
+        t_prepare = time.perf_counter() - start
+
+        loaders = {"insert (execute_values)": lambda: insert_rows(cur, rows, table=SCRATCH_TABLE)}
+        for jobs in map(int, args.jobs.split(",")):
+            loaders[f"copy + merge, {jobs} conn"] = (
+                lambda jobs=jobs: copy_rows(cur, rows, table=SCRATCH_TABLE, chunk_size=args.chunk_size, n_jobs=jobs,
+                                            run_id=next(load_ids))
+            )
+
+        print(f"\n{'Mode':<26}{'Inserted':>10}{'Seconds':>10}{'Rows/s':>14}{'Speed-up':>10}")
+        baseline = None
+        for mode, load in loaders.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                cur.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+                cur.execute(f"CREATE TEMP TABLE {SCRATCH_TABLE} (LIKE reviews INCLUDING ALL)")
+                start = time.perf_counter()
+                inserted = load()
+                best = min(best, time.perf_counter() - start)
+            baseline = baseline or best
+            print(f"{mode:<26}{inserted:>10,}{best:>10.2f}{len(rows) / best:>14,.0f}{baseline / best:>9.1f}x")
+
+        print(f"\nVectorized row preparation (shared by all modes): {t_prepare:.2f}s "
+              f"({len(rows) / t_prepare:,.0f} rows/s)")
+    finally:
+        conn.rollback()
+        # Parallel staging tables are committed by the workers; the rollback
+        # undid their drops, so remove this run's tables
+        prefix = staging_prefix(run_id)
+        cur.execute("SELECT tablename FROM pg_tables WHERE left(tablename, %s) = %s", (len(prefix), prefix))
+        drop_staging(cur, [name for name, in cur.fetchall()])
+        conn.commit()
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark ThemeAnalyzerLDA preprocessing: cores vs throughput.
+
+Times the serial per-review path (preprocess_text, one nltk.pos_tag call
+per review) against the batched preprocess_texts with 1..N worker
+processes, and checks that every run produces identical clean_text.
+
+Usage:
+    python scripts/benchmark_lda_preprocessing.py [--csv path] [--max-jobs N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.theme_analysis_lda import ThemeAnalyzerLDA
+from src.text_preprocessing import LemmaCache
+
+CSV_PATH = os.path.join(ROOT, "data", "processed", "reviews_with_twitter_sentiment.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=CSV_PATH, help="Reviews CSV with a review_text column")
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count(), help="Largest worker count to try")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Sentences per tagging task")
+    args = parser.parse_args()
+
+    print(f"Loading CSV from: {args.csv}")
+    texts = pd.read_csv(args.csv)["review_text"].dropna().tolist()
+    n = len(texts)
+    print(f"  → {n:,} reviews, {os.cpu_count()} CPU cores")
+
+    analyzer = ThemeAnalyzerLDA()
+
+    start = time.perf_counter()
+    baseline = [analyzer.preprocess_text(t) for t in texts]
+    t_serial = time.perf_counter() - start
+
+    print(f"\n{'Path':<22}{'Seconds':>10}{'Reviews/s':>14}{'Speed-up':>10}")
+    print(f"{'serial per-review':<22}{t_serial:>10.2f}{n / t_serial:>14,.0f}{1:>9.1f}x")
+
+    jobs = 1
+    while jobs <= args.max_jobs:
+        # Fresh lemma cache so every run pays the same lemmatization cost
+        analyzer.lemma_cache = LemmaCache(analyzer.lemmatizer)
+        start = time.perf_counter()
+        result = analyzer.preprocess_texts(texts, n_jobs=jobs, chunk_size=args.chunk_size)
+        seconds = time.perf_counter() - start
+        assert result == baseline, f"batched output differs from serial (n_jobs={jobs})"
+        print(f"{f'batched, {jobs} job(s)':<22}{seconds:>10.2f}{n / seconds:>14,.0f}{t_serial / seconds:>9.1f}x")
+        jobs *= 2
+
+    print("\n✓ Batched output identical to the serial path for every worker count")
+
+
+if __name__ == "__main__":
+    main()
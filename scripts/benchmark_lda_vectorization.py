@@ -0,0 +1,83 @@
+"""
+Benchmark LDA vectorization modes: peak memory and fit time per bank.
+
+Compares the CountVectorizer vocabulary with the memory-bounded
+HashedTermVectorizer (feature hashing + top-term sketch), measuring
+vectorization + LDA fit time and peak traced memory (tracemalloc, in a
+separate run since tracing slows the fit down) for each bank, and the
+vectorization time saved by reusing the DTM cached during topic tuning
+for the final fit.
+
+Usage:
+    python scripts/benchmark_lda_vectorization.py [--csv path] [--n-features N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.theme_analysis_lda import ThemeAnalyzerLDA, _fit_lda
+
+CSV_PATH = os.path.join(ROOT, "data", "processed", "reviews_with_twitter_sentiment.csv")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def peak_mib(fn):
+    """Peak memory traced while running fn, in MiB."""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=CSV_PATH, help="Reviews CSV with bank_name and review_text columns")
+    parser.add_argument("--n-features", type=int, default=2 ** 18, help="Hash buckets for hashing mode")
+    parser.add_argument("--n-topics", type=int, default=5, help="Topics per bank")
+    args = parser.parse_args()
+
+    print(f"Loading CSV from: {args.csv}")
+    df = pd.read_csv(args.csv).dropna(subset=["review_text"])
+    print("Preprocessing (not timed) ...")
+    df["clean_text"] = ThemeAnalyzerLDA().preprocess_texts(df["review_text"])
+    df = df[df["clean_text"].str.len() > 0]
+    print(f"  → {len(df):,} reviews")
+
+    analyzers = {
+        "count": ThemeAnalyzerLDA(n_topics=args.n_topics),
+        "hashed": ThemeAnalyzerLDA(n_topics=args.n_topics, hashing=True, n_features=args.n_features),
+    }
+
+    print(f"\n{'Bank':<12}{'Mode':<8}{'Columns':>9}{'Vectorize s':>13}{'Fit s':>8}{'Peak MiB':>10}")
+    for bank, bank_texts in df.groupby("bank_name")["clean_text"]:
+        for mode, analyzer in analyzers.items():
+            (vectorizer, dtm), t_vec = timed(lambda: analyzer._vectorize(bank_texts, cache=False))
+            _, t_fit = timed(lambda: _fit_lda(dtm, args.n_topics))
+            peak = peak_mib(lambda: _fit_lda(analyzer._vectorize(bank_texts, cache=False)[1], args.n_topics))
+            print(f"{bank:<12}{mode:<8}{dtm.shape[1]:>9,}{t_vec:>13.2f}{t_fit:>8.2f}{peak:>10.1f}")
+
+    # Final fit after tuning: fresh vectorization vs. the DTM cached by tuning
+    analyzer = analyzers["count"]
+    banks = df.groupby("bank_name")["clean_text"]
+    analyzer.clear_dtm_cache()
+    analyzer.find_optimal_topics(df[["bank_name", "clean_text"]], range(2, 4), n_jobs=1)
+    _, t_fresh = timed(lambda: [analyzer._vectorize(texts, cache=False) for _, texts in banks])
+    _, t_reused = timed(lambda: [analyzer._vectorize(texts, bank=bank) for bank, texts in banks])
+    print(f"\nFinal-fit vectorization after tuning: fresh {t_fresh:.3f}s, "
+          f"reused DTM {t_reused:.3f}s ({t_fresh / t_reused:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
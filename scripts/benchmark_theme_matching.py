@@ -0,0 +1,73 @@
+"""
+Benchmark rule-based theme assignment over the full review corpus.
+
+Compares the original substring loop (one `keyword in text` scan per keyword
+per review) with the compiled KeywordMatcher used by ThemeAnalyzer.assign_theme,
+and reports throughput plus how many reviews changed theme because of
+word-boundary matching.
+
+Usage:
+    python scripts/benchmark_theme_matching.py [--csv path/to/reviews.csv]
+"""
+
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.theme_analysis import ThemeAnalyzer
+
+CSV_PATH = os.path.join(ROOT, "data", "processed", "reviews_with_twitter_sentiment.csv")
+
+
+def substring_theme(theme_keywords, text):
+    """The pre-matcher assign_theme: raw substring counts per theme."""
+    scores = {theme: 0 for theme in theme_keywords}
+    for theme, keywords in theme_keywords.items():
+        for keyword in keywords:
+            if keyword in text:
+                scores[theme] += 1
+    max_theme = max(scores, key=scores.get)
+    return max_theme if scores[max_theme] else "General/Unclassified"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=CSV_PATH, help="Reviews CSV with a review_text column")
+    args = parser.parse_args()
+
+    print(f"Loading CSV from: {args.csv}")
+    df = pd.read_csv(args.csv).dropna(subset=["review_text"])
+    print(f"  → {len(df):,} reviews")
+
+    analyzer = ThemeAnalyzer()
+    print("Preprocessing (not timed) ...")
+    texts = df["review_text"].apply(analyzer.preprocess_text).tolist()
+
+    start = time.perf_counter()
+    analyzer.compile_keywords()
+    compile_time = time.perf_counter() - start
+    print(f"\nCompiled {len(analyzer.matcher.keywords)} keywords in {compile_time * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    legacy = [substring_theme(analyzer.theme_keywords, t) for t in texts]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [analyzer.assign_theme(t) for t in texts]
+    compiled_time = time.perf_counter() - start
+
+    n = len(texts)
+    changed = sum(a != b for a, b in zip(legacy, compiled))
+    print(f"\n{'Path':<12}{'Seconds':>10}{'Reviews/s':>14}")
+    print(f"{'substring':<12}{legacy_time:>10.3f}{n / legacy_time:>14,.0f}")
+    print(f"{'compiled':<12}{compiled_time:>10.3f}{n / compiled_time:>14,.0f}")
+    print(f"\nSpeed-up: {legacy_time / compiled_time:.1f}x")
+    print(f"Reviews whose theme changed (word-boundary matching): {changed:,} ({changed / n:.1%})")
+
+
+if __name__ == "__main__":
+    main()
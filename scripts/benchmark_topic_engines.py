@@ -0,0 +1,85 @@
+"""
+Benchmark topic engines per bank: fit time, peak memory and c_v coherence.
+
+Fits every engine in ENGINES (online LDA, NMF on TF-IDF, MiniBatchKMeans
+on TF-IDF) on the same per-bank document-term matrix and reports fit +
+transform time, peak traced memory (tracemalloc, separate run), c_v
+coherence of the top words and the mean topic_confidence.
+
+Usage:
+    python scripts/benchmark_topic_engines.py [--csv path] [--n-topics N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.theme_analysis_lda import (
+    ThemeAnalyzerLDA, CoherenceScorer, ENGINES, _fit_topic_model, _top_words,
+)
+
+CSV_PATH = os.path.join(ROOT, "data", "processed", "reviews_with_twitter_sentiment.csv")
+
+
+def fit_and_assign(dtm, n_topics, engine):
+    model = _fit_topic_model(dtm, n_topics, engine)
+    return model, model.transform(dtm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=CSV_PATH, help="Reviews CSV with bank_name and review_text columns")
+    parser.add_argument("--n-topics", type=int, default=5, help="Topics per bank")
+    args = parser.parse_args()
+
+    print(f"Loading CSV from: {args.csv}")
+    df = pd.read_csv(args.csv).dropna(subset=["review_text"])
+    analyzer = ThemeAnalyzerLDA(n_topics=args.n_topics)
+    print("Preprocessing (not timed) ...")
+    df["clean_text"] = analyzer.preprocess_texts(df["review_text"])
+    df = df[df["clean_text"].str.len() > 0]
+    print(f"  → {len(df):,} reviews")
+
+    rows = []
+    for bank, bank_texts in df.groupby("bank_name")["clean_text"]:
+        vectorizer, dtm = analyzer._vectorize(bank_texts)
+        feature_names = vectorizer.get_feature_names_out()
+        scorer = CoherenceScorer(text.split() for text in bank_texts)
+
+        for engine in ENGINES:
+            start = time.perf_counter()
+            model, weights = fit_and_assign(dtm, args.n_topics, engine)
+            seconds = time.perf_counter() - start
+
+            tracemalloc.start()
+            fit_and_assign(dtm, args.n_topics, engine)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            rows.append({
+                "bank": bank,
+                "engine": engine,
+                "fit_s": seconds,
+                "peak_mib": peak / 2 ** 20,
+                "c_v": scorer.score(_top_words(model, feature_names)),
+                "mean_confidence": weights.max(axis=1).mean(),
+            })
+
+    results = pd.DataFrame(rows)
+    print(f"\n{'Bank':<12}{'Engine':<8}{'Fit s':>8}{'Peak MiB':>10}{'c_v':>8}{'Confidence':>12}")
+    for row in results.itertuples():
+        print(f"{row.bank:<12}{row.engine:<8}{row.fit_s:>8.2f}{row.peak_mib:>10.1f}"
+              f"{row.c_v:>8.3f}{row.mean_confidence:>12.3f}")
+
+    print("\nMean over banks:")
+    print(results.groupby("engine", sort=False)[["fit_s", "peak_mib", "c_v", "mean_confidence"]]
+          .mean().round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
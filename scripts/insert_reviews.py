@@ -12,11 +12,30 @@ Usage:
        pip install psycopg2-binary
 
     4. Run this script:
-       python scripts/insert_reviews.py
+       python scripts/insert_reviews.py [--mode copy|insert|sync] [--csv path]
+
+Modes:
+    copy    (default) stream the rows with COPY FROM STDIN into a temporary
+            staging table, then merge into reviews with INSERT ... ON CONFLICT
+    insert  multi-row INSERTs with execute_values (the original path)
+    sync    diff the CSV against the database by review_id + row_hash and
+            upsert only new and changed rows (re-scored sentiment, new themes)
+
+copy and insert never modify existing reviews; use sync after re-running the
+sentiment or theme pipelines. --jobs N stages copy/sync rows over N parallel
+connections into UNLOGGED tables before the merge. Every mode refreshes the
+review_summary materialized view (read by the dashboard) when rows changed.
+The search_vector full-text column is generated by PostgreSQL from
+review_text and clean_text on every insert and update.
 """
 
+import io
 import os
 import sys
+import time
+import uuid
+import argparse
+import numpy as np
 import pandas as pd
 import psycopg2
 from psycopg2.extras import execute_values
@@ -39,110 +58,424 @@ CSV_PATH = os.path.join(
     "data", "processed", "reviews_with_themes_lda.csv"
 )
 
+# reviews columns written by the loader, in row-tuple order
+REVIEW_COLUMNS = [
+    "review_id", "bank_id", "review_text", "rating",
+    "review_date", "review_year", "review_month",
+    "user_name", "thumbs_up", "text_length", "source",
+    "sentiment_score", "sentiment_label", "clean_text",
+    "topic_id", "topic_confidence", "identified_topic", "theme",
+]
 
-def main():
-    # ── 1. Load CSV ───────────────────────────────────────────
-    print(f"Loading CSV from: {CSV_PATH}")
-    df = pd.read_csv(CSV_PATH)
-    print(f"  → {len(df):,} reviews loaded")
-    print(f"  → Columns: {list(df.columns)}")
+# Column types of the prepared frame
+TEXT_COLUMNS = ["review_id", "review_text", "review_date", "user_name", "source",
+                "sentiment_label", "clean_text", "identified_topic", "theme"]
+INT_COLUMNS = ["bank_id", "rating", "review_year", "review_month", "thumbs_up", "text_length", "topic_id"]
+FLOAT_COLUMNS = ["sentiment_score", "topic_confidence"]
 
-    # ── 2. Connect to PostgreSQL ──────────────────────────────
+# Columns whose values make up row_hash (everything the pipeline can change)
+HASHED_COLUMNS = REVIEW_COLUMNS[1:]
+
+# Rows per COPY chunk (bounds the in-memory CSV buffer)
+COPY_CHUNK_SIZE = 50_000
+
+# Rows per upsert statement in sync mode
+SYNC_BATCH_SIZE = 10_000
+
+
+def connect():
     print(f"\nConnecting to PostgreSQL ({DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}) ...")
     conn = psycopg2.connect(**DB_CONFIG)
     conn.autocommit = False
-    cur = conn.cursor()
     print("  → Connected!")
+    return conn
 
-    try:
-        # ── 3. Get bank_id mapping ───────────────────────────
-        cur.execute("SELECT bank_id, bank_code FROM banks")
-        bank_map = {code: bid for bid, code in cur.fetchall()}
-        print(f"\nBank mapping: {bank_map}")
 
-        if not bank_map:
-            print("ERROR: No banks found! Did you run schema.sql first?")
-            print("  → psql -U postgres -d bank_reviews -f scripts/schema.sql")
-            sys.exit(1)
+def fetch_bank_map(cur):
+    """bank_code -> bank_id; exits if the banks table is empty."""
+    cur.execute("SELECT bank_id, bank_code FROM banks")
+    bank_map = {code: bid for bid, code in cur.fetchall()}
+    print(f"\nBank mapping: {bank_map}")
 
-        # ── 4. Prepare rows for bulk insert ──────────────────
-        print(f"\nPreparing {len(df):,} rows for insertion ...")
-
-        rows = []
-        skipped = 0
-        for _, r in df.iterrows():
-            bank_id = bank_map.get(r['bank_code'])
-            if bank_id is None:
-                skipped += 1
-                continue
-
-            rows.append((
-                r['review_id'],
-                bank_id,
-                r['review_text'],
-                int(r['rating']),
-                r['review_date'],
-                int(r['review_year']),
-                int(r['review_month']),
-                r['user_name'],
-                int(r['thumbs_up']),
-                int(r['text_length']),
-                r['source'],
-                float(r['sentiment_score']),
-                r['sentiment_label'],
-                r['clean_text'],
-                int(r['topic_id']),
-                float(r['topic_confidence']),
-                r['identified_topic'],
-                r['theme'],
-            ))
-
-        if skipped:
-            print(f"  ⚠ Skipped {skipped} rows (unknown bank_code)")
-
-        # ── 5. Bulk insert using execute_values (fast) ───────
-        insert_sql = """
-            INSERT INTO reviews (
-                review_id, bank_id, review_text, rating,
-                review_date, review_year, review_month,
-                user_name, thumbs_up, text_length, source,
-                sentiment_score, sentiment_label, clean_text,
-                topic_id, topic_confidence, identified_topic, theme
-            ) VALUES %s
-            ON CONFLICT (review_id) DO NOTHING
-        """
-
-        print(f"  Inserting {len(rows):,} rows ...")
-        execute_values(cur, insert_sql, rows, page_size=500)
+    if not bank_map:
+        print("ERROR: No banks found! Did you run schema.sql first?")
+        print("  → psql -U postgres -d bank_reviews -f scripts/schema.sql")
+        sys.exit(1)
+    return bank_map
+
+
+def prepare_rows(df, bank_map):
+    """
+    Typed DataFrame of the rows to load, in REVIEW_COLUMNS order, built with
+    vectorized column operations; rows with an unknown bank_code are skipped.
+    """
+    print(f"\nPreparing {len(df):,} rows for insertion ...")
+
+    bank_id = df['bank_code'].map(bank_map)
+    known = bank_id.notna().to_numpy()
+    skipped = int((~known).sum())
+    if skipped:
+        print(f"  ⚠ Skipped {skipped} rows (unknown bank_code)")
+
+    frame = df.loc[known].assign(bank_id=bank_id[known])[REVIEW_COLUMNS]
+    frame = frame.astype({
+        **{col: object for col in TEXT_COLUMNS},
+        **{col: np.int64 for col in INT_COLUMNS},
+        **{col: np.float64 for col in FLOAT_COLUMNS},
+    })
+    return frame.reset_index(drop=True)
+
+
+def to_frame(rows):
+    """
+    DataFrame of the prepared rows in REVIEW_COLUMNS order plus row_hash,
+    a 64-bit hash of the HASHED_COLUMNS values (signed, for a BIGINT column).
+    """
+    frame = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows, columns=REVIEW_COLUMNS)
+    hashes = pd.util.hash_pandas_object(frame[HASHED_COLUMNS], index=False).to_numpy()
+    frame['row_hash'] = hashes.view(np.int64)
+    return frame
+
+
+def insert_rows(cur, rows, table="reviews"):
+    """Multi-row INSERTs with execute_values; returns rows inserted."""
+    frame = to_frame(rows)
+    insert_sql = f"""
+        INSERT INTO {table} ({', '.join(frame.columns)}) VALUES %s
+        ON CONFLICT (review_id, bank_id) DO NOTHING
+    """
+    values = list(frame.itertuples(index=False, name=None))
+    inserted = 0
+    for start in range(0, len(values), 500):
+        execute_values(cur, insert_sql, values[start:start + 500], page_size=500)
+        inserted += cur.rowcount
+    return inserted
+
+
+# ── Staging ──────────────────────────────────────────────────
+
+def _copy_frame(cur, frame, staging="reviews_staging", chunk_size=COPY_CHUNK_SIZE):
+    """COPY FROM STDIN of frame into a staging table, one in-memory CSV buffer per chunk."""
+    copy_sql = f"COPY {staging} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)"
+    for start in range(0, len(frame), chunk_size):
+        buffer = io.StringIO()
+        frame.iloc[start:start + chunk_size].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cur.copy_expert(copy_sql, buffer)
+
+
+def _create_temp_staging(cur):
+    cur.execute("""
+        CREATE TEMP TABLE reviews_staging
+            (LIKE reviews INCLUDING DEFAULTS) ON COMMIT DROP
+    """)
+
+
+def _stage_chunk(staging, chunk):
+    """
+    Worker: loads one chunk into its own UNLOGGED staging table over a new
+    connection (committed, so the merging connection can read it).
+    Returns (rows, seconds).
+    """
+    start = time.perf_counter()
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {staging}")
+            cur.execute(f"CREATE UNLOGGED TABLE {staging} (LIKE reviews INCLUDING DEFAULTS)")
+            _copy_frame(cur, chunk, staging)
         conn.commit()
-        print(f"  → Insert complete!")
+    finally:
+        conn.close()
+    return len(chunk), time.perf_counter() - start
+
+
+def staging_prefix(run_id):
+    """Name prefix of a run's UNLOGGED staging tables (reviews_load_<run_id>_<chunk>)."""
+    return f"reviews_load_{run_id}_"
+
+
+def stage_rows(cur, frame, n_jobs=1, chunk_size=COPY_CHUNK_SIZE, run_id=None):
+    """
+    Loads frame into staging table(s) with COPY.
+
+    n_jobs == 1: one temporary table on this connection.
+    n_jobs > 1: chunks of chunk_size rows are COPYed in parallel, each over
+    its own connection into its own UNLOGGED table (no WAL), with progress
+    and throughput reporting. Table names carry run_id (random by default),
+    so concurrent loads never share tables; if staging fails, the
+    transaction is rolled back and the run's tables are dropped.
+
+    Returns:
+        list of staging table names, one per chunk (call drop_staging after
+        merging, or discard_staging if the merge fails)
+    """
+    start = time.perf_counter()
+    if n_jobs == 1:
+        _create_temp_staging(cur)
+        _copy_frame(cur, frame, chunk_size=chunk_size)
+        tables = ["reviews_staging"]
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        starts = range(0, len(frame), chunk_size)
+        prefix = staging_prefix(run_id or uuid.uuid4().hex[:12])
+        tables = [f"{prefix}{i}" for i in range(len(starts))]
+        done = 0
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                futures = [pool.submit(_stage_chunk, staging, frame.iloc[i:i + chunk_size])
+                           for staging, i in zip(tables, starts)]
+                for k, future in enumerate(as_completed(futures), 1):
+                    rows, seconds = future.result()
+                    done += rows
+                    elapsed = time.perf_counter() - start
+                    print(f"    chunk {k}/{len(tables)}: {rows:,} rows in {seconds:.2f}s "
+                          f"— {done:,}/{len(frame):,} staged ({done / elapsed:,.0f} rows/s)")
+        except BaseException:
+            discard_staging(cur, tables)
+            raise
+    elapsed = time.perf_counter() - start
+    print(f"  Staged {len(frame):,} rows in {elapsed:.2f}s "
+          f"({len(frame) / max(elapsed, 1e-9):,.0f} rows/s, {n_jobs} connection(s))")
+    return tables
+
+
+def drop_staging(cur, tables):
+    for staging in tables:
+        cur.execute(f"DROP TABLE IF EXISTS {staging}")
 
-        # ── 6. Verify ────────────────────────────────────────
-        print("\n── Verification ──")
 
-        cur.execute("""
-            SELECT b.bank_name, COUNT(*) AS review_count
-            FROM reviews r JOIN banks b ON r.bank_id = b.bank_id
-            GROUP BY b.bank_name ORDER BY review_count DESC
+def discard_staging(cur, tables):
+    """
+    Failure path: rolls back the current transaction (which may hold locks
+    on the staging tables), then drops the tables the workers committed.
+    """
+    try:
+        cur.connection.rollback()
+        drop_staging(cur, tables)
+        cur.connection.commit()
+    except psycopg2.Error as e:
+        print(f"  ⚠ Could not drop staging tables {', '.join(tables)}: {e}")
+
+
+def copy_rows(cur, rows, table="reviews", chunk_size=COPY_CHUNK_SIZE, n_jobs=1, run_id=None):
+    """
+    Streams rows into staging with COPY FROM STDIN (in parallel with
+    n_jobs > 1), then merges them into `table` with a single
+    INSERT ... SELECT ... ON CONFLICT. Returns rows inserted.
+    """
+    frame = to_frame(rows)
+    columns = ', '.join(frame.columns)
+    tables = stage_rows(cur, frame, n_jobs, chunk_size, run_id)
+    source = " UNION ALL ".join(f"SELECT {columns} FROM {staging}" for staging in tables)
+
+    # DISTINCT ON keeps one row per key (ON CONFLICT cannot touch a row twice)
+    start = time.perf_counter()
+    try:
+        cur.execute(f"""
+            INSERT INTO {table} ({columns})
+            SELECT DISTINCT ON (review_id, bank_id) {columns} FROM ({source}) AS staged
+            ON CONFLICT (review_id, bank_id) DO NOTHING
         """)
-        print("\nReview counts per bank:")
-        for bank_name, count in cur.fetchall():
-            print(f"  {bank_name}: {count:,}")
-
-        cur.execute("""
-            SELECT b.bank_name,
-                   ROUND(AVG(r.rating), 2) AS avg_rating,
-                   ROUND(AVG(r.sentiment_score)::numeric, 3) AS avg_sentiment
-            FROM reviews r JOIN banks b ON r.bank_id = b.bank_id
-            GROUP BY b.bank_name ORDER BY avg_rating DESC
+    except BaseException:
+        discard_staging(cur, tables)
+        raise
+    inserted = cur.rowcount
+    print(f"  Merged into {table} in {time.perf_counter() - start:.2f}s")
+    drop_staging(cur, tables)
+    return inserted
+
+
+def diff_rows(cur, frame, table="reviews"):
+    """
+    Splits frame (with row_hash) against the stored row_hash of each
+    (review_id, bank_id) key.
+
+    Only the frame's keys and hashes are sent (COPY into a temporary table)
+    and the comparison runs server-side; just the keys of new or changed
+    rows come back, so the cost follows the frame and the delta, not the
+    size of `table`.
+
+    Returns:
+        (changed, n_unchanged): rows that are new or whose hash differs
+        (rows loaded before row_hash existed count as changed), and the
+        number of rows already up to date
+    """
+    frame = frame.drop_duplicates(['review_id', 'bank_id'], keep='last')
+    cur.execute(f"""
+        CREATE TEMP TABLE reviews_sync_keys ON COMMIT DROP AS
+        SELECT review_id, bank_id, row_hash FROM {table} WITH NO DATA
+    """)
+    _copy_frame(cur, frame[['review_id', 'bank_id', 'row_hash']], "reviews_sync_keys")
+    cur.execute("ANALYZE reviews_sync_keys")
+    cur.execute(f"""
+        SELECT k.review_id, k.bank_id
+        FROM reviews_sync_keys k
+        LEFT JOIN {table} t ON t.review_id = k.review_id AND t.bank_id = k.bank_id
+        WHERE t.row_hash IS DISTINCT FROM k.row_hash
+    """)
+    changed_keys = pd.DataFrame(cur.fetchall(), columns=['review_id', 'bank_id'])
+    drop_staging(cur, ["reviews_sync_keys"])
+
+    key_types = {'review_id': str, 'bank_id': np.int64}
+    keys = pd.MultiIndex.from_frame(frame[['review_id', 'bank_id']].astype(key_types))
+    is_changed = keys.isin(pd.MultiIndex.from_frame(changed_keys.astype(key_types)))
+    return frame[is_changed], int((~is_changed).sum())
+
+
+def sync_rows(cur, rows, table="reviews", batch_size=SYNC_BATCH_SIZE, n_jobs=1, run_id=None):
+    """
+    Incremental sync: upserts only new and changed rows, in batches of
+    batch_size rows (COPY into staging + INSERT ... ON CONFLICT DO UPDATE).
+    With n_jobs > 1 the batches are staged in parallel first.
+
+    Returns:
+        dict with inserted, updated, unchanged counts
+    """
+    frame = to_frame(rows)
+    changed, unchanged = diff_rows(cur, frame, table)
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': unchanged}
+    if changed.empty:
+        return counts
+
+    columns = ', '.join(changed.columns)
+    # The key columns are never updated (bank_id is also the partition key)
+    updates = ',\n            '.join(f"{c} = EXCLUDED.{c}" for c in changed.columns
+                                    if c not in ('review_id', 'bank_id'))
+
+    def upsert(staging):
+        cur.execute(f"""
+            INSERT INTO {table} ({columns})
+            SELECT {columns} FROM {staging}
+            ON CONFLICT (review_id, bank_id) DO UPDATE SET
+                {updates},
+                updated_at = CURRENT_TIMESTAMP
+            WHERE {table}.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+            RETURNING (xmax = 0) AS inserted
         """)
-        print("\nAverage rating & sentiment per bank:")
-        for bank_name, avg_rating, avg_sentiment in cur.fetchall():
-            print(f"  {bank_name}: rating={avg_rating}, sentiment={avg_sentiment}")
+        flags = [inserted for inserted, in cur.fetchall()]
+        counts['inserted'] += sum(flags)
+        counts['updated'] += len(flags) - sum(flags)
+        return len(flags)
+
+    if n_jobs > 1:
+        tables = stage_rows(cur, changed, n_jobs, batch_size, run_id)
+        try:
+            for k, staging in enumerate(tables, 1):
+                print(f"    batch {k}/{len(tables)}: {upsert(staging):,} rows upserted")
+        except BaseException:
+            discard_staging(cur, tables)
+            raise
+        drop_staging(cur, tables)
+        return counts
+
+    _create_temp_staging(cur)
+    n_batches = -(-len(changed) // batch_size)
+    for k, start in enumerate(range(0, len(changed), batch_size), 1):
+        cur.execute("TRUNCATE reviews_staging")
+        _copy_frame(cur, changed.iloc[start:start + batch_size])
+        print(f"    batch {k}/{n_batches}: {upsert('reviews_staging'):,} rows upserted")
+    drop_staging(cur, ["reviews_staging"])
+    return counts
+
+
+def refresh_summary(cur, view="review_summary"):
+    """
+    Recomputes the materialized review summary. CONCURRENTLY keeps it
+    readable by the dashboard during the refresh; a view that was never
+    populated needs one plain refresh first.
+    """
+    cur.execute("SELECT relispopulated FROM pg_class WHERE oid = %s::regclass", (view,))
+    populated, = cur.fetchone()
+    start = time.perf_counter()
+    cur.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if populated else ''}{view}")
+    print(f"  → Refreshed {view} in {time.perf_counter() - start:.2f}s")
+
+
+def verify(cur):
+    print("\n── Verification ──")
+
+    cur.execute("""
+        SELECT b.bank_name, COUNT(*) AS review_count
+        FROM reviews r JOIN banks b ON r.bank_id = b.bank_id
+        GROUP BY b.bank_name ORDER BY review_count DESC
+    """)
+    print("\nReview counts per bank:")
+    for bank_name, count in cur.fetchall():
+        print(f"  {bank_name}: {count:,}")
+
+    cur.execute("""
+        SELECT b.bank_name,
+               ROUND(AVG(r.rating), 2) AS avg_rating,
+               ROUND(AVG(r.sentiment_score)::numeric, 3) AS avg_sentiment
+        FROM reviews r JOIN banks b ON r.bank_id = b.bank_id
+        GROUP BY b.bank_name ORDER BY avg_rating DESC
+    """)
+    print("\nAverage rating & sentiment per bank:")
+    for bank_name, avg_rating, avg_sentiment in cur.fetchall():
+        print(f"  {bank_name}: rating={avg_rating}, sentiment={avg_sentiment}")
+
+    cur.execute("SELECT COUNT(*) FROM reviews")
+    total = cur.fetchone()[0]
+    print(f"\nTotal reviews in database: {total:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Insert cleaned review data into PostgreSQL")
+    parser.add_argument("--csv", default=CSV_PATH, help="Reviews CSV (reviews_with_themes_lda.csv)")
+    parser.add_argument("--mode", choices=["copy", "insert", "sync"], default="copy",
+                        help="copy: COPY into a staging table + merge; insert: execute_values; "
+                             "sync: upsert new and changed rows only")
+    parser.add_argument("--chunk-size", type=int, default=COPY_CHUNK_SIZE, help="Rows per COPY chunk")
+    parser.add_argument("--batch-size", type=int, default=SYNC_BATCH_SIZE, help="Rows per upsert (sync)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Parallel COPY connections into UNLOGGED staging tables (copy/sync)")
+    args = parser.parse_args(argv)
+
+    # ── 1. Load CSV ───────────────────────────────────────────
+    print(f"Loading CSV from: {args.csv}")
+    df = pd.read_csv(args.csv)
+    print(f"  → {len(df):,} reviews loaded")
+    print(f"  → Columns: {list(df.columns)}")
+
+    # ── 2. Connect to PostgreSQL ──────────────────────────────
+    conn = connect()
+    cur = conn.cursor()
+
+    try:
+        # ── 3. Get bank_id mapping ───────────────────────────
+        bank_map = fetch_bank_map(cur)
+
+        # ── 4. Prepare rows for bulk insert ──────────────────
+        rows = prepare_rows(df, bank_map)
+
+        # ── 5. Bulk load ─────────────────────────────────────
+        print(f"  Loading {len(rows):,} rows ({args.mode}) ...")
+        start = time.perf_counter()
+        if args.mode == "sync":
+            counts = sync_rows(cur, rows, batch_size=args.batch_size, n_jobs=args.jobs)
+            conn.commit()
+            print(f"  → Sync complete! {counts['inserted']:,} inserted, "
+                  f"{counts['updated']:,} updated, {counts['unchanged']:,} unchanged")
+            modified = counts['inserted'] + counts['updated']
+        else:
+            if args.mode == "copy":
+                inserted = copy_rows(cur, rows, chunk_size=args.chunk_size, n_jobs=args.jobs)
+            else:
+                inserted = insert_rows(cur, rows)
+            conn.commit()
+            print(f"  → Load complete! {inserted:,} new, {len(rows) - inserted:,} already present")
+            modified = inserted
+        seconds = time.perf_counter() - start
+        print(f"  → {len(rows) / max(seconds, 1e-9):,.0f} rows/s overall ({seconds:.2f}s)")
+
+        # ── 6. Refresh the dashboard summary ─────────────────
+        if modified:
+            refresh_summary(cur)
+            conn.commit()
 
-        cur.execute("SELECT COUNT(*) FROM reviews")
-        total = cur.fetchone()[0]
-        print(f"\nTotal reviews in database: {total:,}")
+        # ── 7. Verify ────────────────────────────────────────
+        verify(cur)
         print("\n✓ Done! Database is ready.")
 
     except Exception as e:
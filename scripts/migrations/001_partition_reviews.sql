@@ -0,0 +1,65 @@
+-- ============================================================
+-- Migration 001: partition reviews by bank
+-- Converts a reviews heap table (PRIMARY KEY (review_id)) created by an
+-- earlier schema.sql into the list-partitioned layout of the current one:
+-- one partition per bank, PRIMARY KEY (review_id, bank_id) and the
+-- dashboard indexes.
+-- ============================================================
+
+-- Run from the repository root, in one transaction:
+--   psql -U postgres -d bank_reviews -v ON_ERROR_STOP=1 -1 -f scripts/migrations/001_partition_reviews.sql
+-- Then update any loader still using ON CONFLICT (review_id).
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'reviews'::regclass) = 'p' THEN
+        RAISE EXCEPTION 'reviews is already partitioned';
+    END IF;
+END;
+$$;
+
+-- Tables created before incremental sync lack these columns
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS row_hash   BIGINT;
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+
+-- Re-running the current schema.sql on the old table may have created the
+-- summary view on it; it is rebuilt on the partitioned table below
+DROP MATERIALIZED VIEW IF EXISTS review_summary;
+
+-- Keep the old table until the rows are copied; free the names schema.sql
+-- uses (primary key and every secondary index of the old table)
+ALTER TABLE reviews RENAME TO reviews_unpartitioned;
+ALTER TABLE reviews_unpartitioned RENAME CONSTRAINT reviews_pkey TO reviews_unpartitioned_pkey;
+DO $$
+DECLARE
+    idx regclass;
+BEGIN
+    FOR idx IN SELECT indexrelid::regclass FROM pg_index
+               WHERE indrelid = 'reviews_unpartitioned'::regclass AND NOT indisprimary LOOP
+        EXECUTE format('DROP INDEX %s', idx);
+    END LOOP;
+END;
+$$;
+
+-- Partitioned reviews table, partitions and indexes
+\ir ../schema.sql
+
+INSERT INTO reviews (
+    review_id, bank_id, review_text, rating, review_date, review_year, review_month,
+    user_name, thumbs_up, text_length, source, sentiment_score, sentiment_label,
+    clean_text, topic_id, topic_confidence, identified_topic, theme,
+    row_hash, created_at, updated_at
+)
+SELECT
+    review_id, bank_id, review_text, rating, review_date, review_year, review_month,
+    user_name, thumbs_up, text_length, source, sentiment_score, sentiment_label,
+    clean_text, topic_id, topic_confidence, identified_topic, theme,
+    row_hash, created_at, updated_at
+FROM reviews_unpartitioned;
+
+DROP TABLE reviews_unpartitioned;
+REFRESH MATERIALIZED VIEW review_summary;
+
+-- Fresh statistics for the planner. After the commit, run VACUUM reviews
+-- so the visibility map allows index-only scans.
+ANALYZE reviews;
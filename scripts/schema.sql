@@ -25,8 +25,15 @@ ON CONFLICT (bank_code) DO NOTHING;
 
 
 -- ── Reviews table ────────────────────────────────────────────
+-- List-partitioned by bank: every dashboard query is per bank (or a
+-- union of the three), so bank filters prune to one partition and each
+-- partition's indexes stay small. The partition key must be part of the
+-- primary key, hence (review_id, bank_id): review_id alone is no longer
+-- unique, and the loader and API consumers identify a review by both.
+-- A database created by the pre-partitioning schema keeps its heap table
+-- here; convert it with scripts/migrations/001_partition_reviews.sql.
 CREATE TABLE IF NOT EXISTS reviews (
-    review_id        VARCHAR(50)   PRIMARY KEY,
+    review_id        VARCHAR(50)   NOT NULL,
     bank_id          INTEGER       NOT NULL REFERENCES banks(bank_id),
     review_text      TEXT          NOT NULL,
     rating           SMALLINT      NOT NULL CHECK (rating BETWEEN 1 AND 5),
@@ -44,15 +51,102 @@ CREATE TABLE IF NOT EXISTS reviews (
     topic_confidence REAL,
     identified_topic VARCHAR(200),
     theme            VARCHAR(200),
-    created_at       TIMESTAMP     DEFAULT CURRENT_TIMESTAMP
-);
+    row_hash         BIGINT,       -- hash of the pipeline columns (insert_reviews.py --mode sync)
+    -- Full-text search document, maintained by PostgreSQL on every insert /
+    -- update (review text weighted above the cleaned text)
+    search_vector    TSVECTOR GENERATED ALWAYS AS (
+                         setweight(to_tsvector('english', coalesce(review_text, '')), 'A') ||
+                         setweight(to_tsvector('english', coalesce(clean_text, '')), 'B')
+                     ) STORED,
+    created_at       TIMESTAMP     DEFAULT CURRENT_TIMESTAMP,
+    updated_at       TIMESTAMP,
+    PRIMARY KEY (review_id, bank_id)
+) PARTITION BY LIST (bank_id);
+
+-- Databases created before incremental sync
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS row_hash   BIGINT;
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+
+-- Databases created before full-text search (rewrites the table once)
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(review_text, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(clean_text, '')), 'B')
+) STORED;
+
+-- One partition per bank (reviews_cbe, ...); re-run after adding a bank.
+-- Reviews of banks without a partition land in reviews_default.
+CREATE OR REPLACE FUNCTION create_review_partitions() RETURNS void AS $$
+DECLARE
+    b RECORD;
+BEGIN
+    FOR b IN SELECT bank_id, bank_code FROM banks ORDER BY bank_id LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF reviews FOR VALUES IN (%s)',
+            'reviews_' || lower(b.bank_code), b.bank_id
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
 
--- ── Indexes for common query patterns ────────────────────────
-CREATE INDEX IF NOT EXISTS idx_reviews_bank_id       ON reviews (bank_id);
-CREATE INDEX IF NOT EXISTS idx_reviews_rating        ON reviews (rating);
-CREATE INDEX IF NOT EXISTS idx_reviews_sentiment     ON reviews (sentiment_label);
-CREATE INDEX IF NOT EXISTS idx_reviews_theme         ON reviews (theme);
+-- Skipped (with a warning) when reviews is an unmigrated heap table, so the
+-- rest of this file still applies
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'reviews'::regclass) = 'p' THEN
+        PERFORM create_review_partitions();
+        CREATE TABLE IF NOT EXISTS reviews_default PARTITION OF reviews DEFAULT;
+    ELSE
+        RAISE WARNING 'reviews is not partitioned: run scripts/migrations/001_partition_reviews.sql';
+    END IF;
+END;
+$$;
+
+-- ── Indexes matching the dashboard API ───────────────────────
+-- Created on the parent, so every partition gets them. bank_id is not an
+-- index column: the bank filter is answered by partition pruning.
+-- /api/reviews lists by topic_confidence DESC under each filter combination
+CREATE INDEX IF NOT EXISTS idx_reviews_theme_sentiment_conf
+    ON reviews (theme, sentiment_label, topic_confidence DESC);
+CREATE INDEX IF NOT EXISTS idx_reviews_theme_conf
+    ON reviews (theme, topic_confidence DESC);
+CREATE INDEX IF NOT EXISTS idx_reviews_sentiment_conf
+    ON reviews (sentiment_label, topic_confidence DESC);
+CREATE INDEX IF NOT EXISTS idx_reviews_conf
+    ON reviews (topic_confidence DESC);
+-- The aggregate endpoints read review_summary (below) and the /api/reviews
+-- count uses idx_reviews_theme_sentiment_conf, so the former covering index
+-- is only write overhead
+DROP INDEX IF EXISTS idx_reviews_theme_sentiment_cover;
 CREATE INDEX IF NOT EXISTS idx_reviews_review_date   ON reviews (review_date);
+-- /api/reviews?q=... full-text search (websearch_to_tsquery, ranked)
+CREATE INDEX IF NOT EXISTS idx_reviews_search
+    ON reviews USING GIN (search_vector);
+
+
+-- ── Review summary (materialized) ───────────────────────────
+-- One row per bank × theme × sentiment_label × month with counts, sums and
+-- extremes, so the aggregate endpoints (summary, themes, sentiment,
+-- theme-sentiment) read a few hundred rows instead of scanning reviews.
+-- Averages are rebuilt as SUM(..._sum) / SUM(..._count) over any roll-up.
+-- insert_reviews.py refreshes it after every load; the unique index is
+-- required by REFRESH MATERIALIZED VIEW CONCURRENTLY.
+CREATE MATERIALIZED VIEW IF NOT EXISTS review_summary AS
+SELECT
+    bank_id,
+    theme,
+    sentiment_label,
+    date_trunc('month', review_date)::date AS month,
+    COUNT(*)                               AS review_count,
+    SUM(rating)                            AS rating_sum,
+    COUNT(sentiment_score)                 AS sentiment_count,
+    SUM(sentiment_score::float8)           AS sentiment_sum,
+    MIN(sentiment_score)                   AS sentiment_min,
+    MAX(sentiment_score)                   AS sentiment_max
+FROM reviews
+GROUP BY bank_id, theme, sentiment_label, date_trunc('month', review_date)::date;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_review_summary_cell
+    ON review_summary (bank_id, theme, sentiment_label, month);
 
 
 -- ── Verification queries (run after inserting data) ──────────
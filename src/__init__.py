@@ -1,8 +1,25 @@
-from .preprocessing import ReviewPreprocessor
-from .scraper import main
+from importlib import import_module
+
 from .config import APP_IDS, BANK_NAMES, SCRAPING_CONFIG, DATA_PATHS
-from .sentiment_vader import SentimentAnalysis
-from .sentiment_bert import BertSentimentAnalysis
-from .sentiment_twitter import TwitterSentimentAnalysis
-from .sentiment_evaluation import evaluate_sentiment
-from .theme_analysis import ThemeAnalyzer
\ No newline at end of file
+
+# Re-exports are imported on first access, so importing one module of the
+# package (e.g. src.topic_inference in the dashboard backend) does not pull
+# in the scraper or the torch / transformers sentiment models
+_EXPORTS = {
+    'ReviewPreprocessor': '.preprocessing',
+    'main': '.scraper',
+    'SentimentAnalysis': '.sentiment_vader',
+    'BertSentimentAnalysis': '.sentiment_bert',
+    'TwitterSentimentAnalysis': '.sentiment_twitter',
+    'evaluate_sentiment': '.sentiment_evaluation',
+    'compare_models': '.sentiment_evaluation',
+    'ThemeAnalyzer': '.theme_analysis',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
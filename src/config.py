@@ -48,10 +48,30 @@ DATA_PATHS = {
     'sentiment_results_vader': '../data/processed/reviews_with_vader_sentiment.csv',
     'sentiment_results_twitter': '../data/processed/reviews_with_twitter_sentiment.csv',
     'sentiment_results_bert': '../data/processed/reviews_with_sentiment_bert.csv',
+    # Calibrated neutral-band thresholds per model/bank (see sentiment_calibration.py)
+    'sentiment_thresholds': '../data/processed/sentiment_thresholds.json',
     'theme_results': '../data/processed/reviews_with_themes.csv',
     'theme_results_lda': '../data/processed/reviews_with_themes_lda.csv',
+    # Per-bank mixtures of the corpus-wide (global) LDA topics
+    'lda_topic_mixtures': '../data/processed/lda_bank_topic_mixtures.csv',
+    # Automatic topic -> theme mapping with similarity scores (see ThemeAnalyzerLDA.map_topics_to_themes)
+    'topic_theme_mapping': '../data/processed/lda_topic_theme_mapping.csv',
     'final_results': '../data/processed/reviews_final.csv',
-    "theme_analysis": "../data/processed/theme_analysis.csv"
+    # Pre-aggregated bank x theme x sentiment_label x month cube for the insight charts
+    'insight_cube': '../data/processed/insight_cube.npz',
+    # Lemma counts per bank x sentiment_label for the word clouds
+    'insight_term_counts': '../data/processed/insight_term_counts.npz',
+    # KLL sketches of sentiment_score per bank x theme x sentiment_label x month
+    'sentiment_sketches': '../data/processed/sentiment_sketches.npz',
+    # Rendered Task 4 report figures + cache manifest (see report_builder.py)
+    'insight_report': '../reports/figures',
+    "theme_analysis": "../data/processed/theme_analysis.csv",
+    # Persisted token -> lemma table (see text_preprocessing.LemmaCache)
+    'lemma_cache': '../data/processed/lemma_cache.json',
+    # Shared tokens/POS/lemmas per review (see text_preprocessing.PreprocessingStage)
+    'preprocessed_tokens': '../data/processed/preprocessed_tokens.npz',
+    # Persisted per-bank vectorizer + LDA models for incremental updates (see theme_analysis_lda.py)
+    'lda_models': '../data/models/lda',
 }
 
 # Visualization Style
@@ -0,0 +1,428 @@
+"""
+Insight Cube Module
+Task 4: Insights & Recommendations — pre-aggregated review summary
+
+Aggregates the review table once into a (bank_name × theme × sentiment_label
+× month) cube. Every cell keeps the review count, the sentiment sum / sum of
+squares / min / max and a fixed-bin histogram of sentiment_score, so means,
+spreads and quantiles of any roll-up (per bank, per theme, ...) come from the
+small cube instead of another scan of the review table.
+
+TermCounts holds lemma counts per (bank_name × sentiment_label), summed
+from the preprocessing stage's token ids (or any document-term matrix), for
+word clouds drawn with WordCloud.generate_from_frequencies.
+
+The chart functions in insight_visualizations render from these
+aggregates; build them once with `build_cube(df)` / `build_term_counts(df)`
+(or load saved ones) and pass them to every plot.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import DATA_PATHS
+
+CUBE_DIMENSIONS = ('bank_name', 'theme', 'sentiment_label', 'month')
+
+# sentiment_score range and histogram resolution (bin width 0.01)
+SCORE_RANGE = (-1.0, 1.0)
+HIST_BINS = 200
+
+# Placeholder for missing sentiment labels / review dates
+MISSING = 'unknown'
+
+
+def _dimension(df, dim):
+    """Cube coordinate of every review along one dimension."""
+    if dim == 'month':
+        if 'review_date' not in df.columns:
+            return pd.Series(MISSING, index=df.index)
+        months = pd.to_datetime(df['review_date'], errors='coerce').dt.to_period('M')
+        codes, uniques = pd.factorize(months)
+        labels = np.append(uniques.astype(str).to_numpy(dtype=object), MISSING)
+        return pd.Series(labels[codes], index=df.index)
+    if dim not in df.columns:
+        return pd.Series(MISSING, index=df.index)
+    codes, uniques = pd.factorize(df[dim])
+    labels = np.append(uniques.astype(str).to_numpy(dtype=object), MISSING)
+    return pd.Series(labels[codes], index=df.index)
+
+
+def box_stats_from_quantiles(labels, quartiles, mins, maxs):
+    """
+    Axes.bxp statistics from (n × 3) quartiles and exact min / max, with
+    whiskers at 1.5 IQR clamped to the data range (no individual fliers).
+    """
+    q1, med, q3 = np.asarray(quartiles).T
+    iqr = q3 - q1
+    whislo = np.maximum(mins, q1 - 1.5 * iqr)
+    whishi = np.minimum(maxs, q3 + 1.5 * iqr)
+    return [
+        {'label': lbl, 'q1': a, 'med': m, 'q3': b, 'whislo': lo, 'whishi': hi, 'fliers': []}
+        for lbl, a, m, b, lo, hi in zip(labels, q1, med, q3, whislo, whishi)
+    ]
+
+
+class InsightCube:
+    """
+    Review aggregates over a set of dimensions.
+
+    `cells` holds one row per non-empty cell with the dimension values and
+    the aggregates count, n_scored, score_sum, score_sq_sum, score_min and
+    score_max; `hist` is the aligned (n_cells × bins) histogram of
+    sentiment_score over score_range.
+    """
+
+    def __init__(self, cells, hist, score_range=SCORE_RANGE):
+        self.cells = cells.reset_index(drop=True)
+        self.hist = hist
+        self.score_range = tuple(score_range)
+
+    @property
+    def dimensions(self):
+        return [c for c in CUBE_DIMENSIONS if c in self.cells.columns]
+
+    @property
+    def edges(self):
+        return np.linspace(*self.score_range, self.hist.shape[1] + 1)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def values(self, dim):
+        """Sorted distinct values of a dimension."""
+        return sorted(self.cells[dim].unique())
+
+    def filter(self, **selection):
+        """Sub-cube of the cells matching dim=value (or dim=[values])."""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, value in selection.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.cells[dim].isin(values).to_numpy()
+        return InsightCube(self.cells[mask], self.hist[mask], self.score_range)
+
+    def rollup(self, by):
+        """
+        Merges cells over the dimensions not in `by`.
+
+        Returns:
+            InsightCube with the `by` dimensions only
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if not by:
+            codes, keys = np.zeros(len(self.cells), dtype=np.int64), pd.DataFrame(index=[0])
+        else:
+            grouped = self.cells.groupby(by, sort=True)
+            codes = grouped.ngroup().to_numpy()
+            keys = grouped.size().index.to_frame(index=False)
+        n = len(keys)
+
+        cells = keys.copy()
+        for col in ('count', 'n_scored', 'score_sum', 'score_sq_sum'):
+            cells[col] = np.bincount(codes, weights=self.cells[col].to_numpy(), minlength=n)
+        cells[['count', 'n_scored']] = cells[['count', 'n_scored']].astype(np.int64)
+        score_min = np.full(n, np.inf)
+        score_max = np.full(n, -np.inf)
+        np.minimum.at(score_min, codes, self.cells['score_min'].to_numpy())
+        np.maximum.at(score_max, codes, self.cells['score_max'].to_numpy())
+        cells['score_min'] = score_min
+        cells['score_max'] = score_max
+
+        hist = np.zeros((n, self.hist.shape[1]), dtype=self.hist.dtype)
+        np.add.at(hist, codes, self.hist)
+        return InsightCube(cells, hist, self.score_range)
+
+    def quantiles(self, qs):
+        """
+        Sentiment quantiles of every cell, interpolated within histogram bins
+        and clamped to the cell's exact min / max.
+
+        Returns:
+            (n_cells × len(qs)) array, NaN for cells without scores
+        """
+        edges = self.edges
+        width = edges[1] - edges[0]
+        cum = self.hist.cumsum(axis=1)
+        n_scored = self.cells['n_scored'].to_numpy()
+        rows = np.arange(len(self.cells))
+        out = np.empty((len(self.cells), len(qs)))
+        for j, q in enumerate(qs):
+            target = q * n_scored
+            idx = np.minimum((cum < target[:, None]).sum(axis=1), self.hist.shape[1] - 1)
+            before = np.where(idx > 0, cum[rows, idx - 1], 0)
+            in_bin = self.hist[rows, idx]
+            frac = np.divide(target - before, in_bin, out=np.full(len(rows), 0.5), where=in_bin > 0)
+            out[:, j] = edges[idx] + np.clip(frac, 0, 1) * width
+        out = np.clip(out, self.cells['score_min'].to_numpy()[:, None], self.cells['score_max'].to_numpy()[:, None])
+        out[n_scored == 0] = np.nan
+        return out
+
+    def summary(self, by=None):
+        """
+        Per-cell statistics (after rolling up to `by` if given).
+
+        Returns:
+            DataFrame with the dimension columns + count, mean_sentiment,
+            std_sentiment, min_sentiment, median_sentiment, max_sentiment
+        """
+        cube = self if by is None else self.rollup(by)
+        cells = cube.cells
+        n_scored = cells['n_scored'].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = cells['score_sum'].to_numpy() / n_scored
+            var = cells['score_sq_sum'].to_numpy() / n_scored - mean ** 2
+            std = np.sqrt(np.maximum(var, 0) * n_scored / (n_scored - 1))
+        summary = cells[cube.dimensions].copy()
+        summary['count'] = cells['count']
+        summary['mean_sentiment'] = mean
+        summary['std_sentiment'] = np.where(n_scored > 1, std, np.nan)
+        summary['min_sentiment'] = np.where(n_scored > 0, cells['score_min'], np.nan)
+        summary['median_sentiment'] = cube.quantiles([0.5])[:, 0]
+        summary['max_sentiment'] = np.where(n_scored > 0, cells['score_max'], np.nan)
+        return summary
+
+    def box_stats(self, label):
+        """
+        Box-and-whisker statistics of every cell in the format of
+        matplotlib's Axes.bxp (whiskers at 1.5 IQR, clamped to min / max).
+        """
+        return box_stats_from_quantiles(
+            self.cells[label], self.quantiles([0.25, 0.5, 0.75]),
+            self.cells['score_min'].to_numpy(), self.cells['score_max'].to_numpy(),
+        )
+
+    # ── Persistence ──────────────────────────────
+
+    def save(self, path=None):
+        path = path or DATA_PATHS['insight_cube']
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            hist=self.hist,
+            score_range=np.array(self.score_range),
+            **{f"cell_{col}": self.cells[col].to_numpy(dtype=str if col in CUBE_DIMENSIONS else None)
+               for col in self.cells.columns},
+        )
+
+    @classmethod
+    def load(cls, path=None):
+        """Load a saved cube; returns None if the file does not exist."""
+        path = path or DATA_PATHS['insight_cube']
+        try:
+            data = np.load(path)
+        except (FileNotFoundError, OSError):
+            return None
+        with data:
+            cells = pd.DataFrame({key[len('cell_'):]: data[key] for key in data.files if key.startswith('cell_')})
+            return cls(cells, data['hist'], data['score_range'])
+
+
+def build_cube(df, bins=HIST_BINS, score_range=SCORE_RANGE):
+    """
+    Aggregates reviews into the (bank_name × theme × sentiment_label × month)
+    cube in one vectorized pass.
+
+    Args:
+        df: DataFrame with bank_name, theme and sentiment_score (+ optional
+            sentiment_label and review_date)
+        bins: histogram bins over score_range
+        score_range: (low, high) of sentiment_score; outliers go to the edge bins
+
+    Returns:
+        InsightCube
+    """
+    df = df.dropna(subset=['bank_name', 'theme'])
+    keys = pd.DataFrame({dim: _dimension(df, dim) for dim in CUBE_DIMENSIONS})
+    grouped = keys.groupby(list(CUBE_DIMENSIONS), sort=True)
+    codes = grouped.ngroup().to_numpy()
+    cells = grouped.size().rename('count').reset_index()
+    n = len(cells)
+
+    scores = df['sentiment_score'].to_numpy(dtype=float)
+    scored = ~np.isnan(scores)
+    codes_s, scores_s = codes[scored], scores[scored]
+    cells['n_scored'] = np.bincount(codes_s, minlength=n)
+    cells['score_sum'] = np.bincount(codes_s, weights=scores_s, minlength=n)
+    cells['score_sq_sum'] = np.bincount(codes_s, weights=scores_s ** 2, minlength=n)
+    score_min = np.full(n, np.inf)
+    score_max = np.full(n, -np.inf)
+    np.minimum.at(score_min, codes_s, scores_s)
+    np.maximum.at(score_max, codes_s, scores_s)
+    cells['score_min'] = score_min
+    cells['score_max'] = score_max
+
+    low, high = score_range
+    bin_idx = np.clip(((scores_s - low) / (high - low) * bins).astype(np.int64), 0, bins - 1)
+    hist = np.bincount(codes_s * bins + bin_idx, minlength=n * bins).reshape(n, bins)
+    return InsightCube(cells, hist, score_range)
+
+
+# ──────────────────────────────────────────────
+# Term frequencies (word clouds)
+# ──────────────────────────────────────────────
+
+TERM_DIMENSIONS = ('bank_name', 'sentiment_label')
+
+
+class TermCounts:
+    """
+    Lemma counts per (bank_name, sentiment_label) cell.
+
+    `cells` holds the dimension values (plus n_reviews) of each cell and
+    `counts` the aligned sparse (n_cells × vocab) count matrix. Counts of
+    disjoint review sets add up, so new reviews are folded in with `merge`.
+    """
+
+    def __init__(self, cells, counts, vocab):
+        self.cells = cells.reset_index(drop=True)
+        self.counts = counts.tocsr()
+        self.vocab = np.asarray(vocab, dtype=object)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def values(self, dim):
+        """Sorted distinct values of a dimension."""
+        return sorted(self.cells[dim].unique())
+
+    @classmethod
+    def from_matrix(cls, keys, matrix, vocab, n_reviews=None):
+        """
+        Sums the rows of a (rows × vocab) count matrix — e.g. a
+        CountVectorizer DTM or PreprocessingStage.term_matrix — per cell.
+
+        Args:
+            keys: DataFrame of the TERM_DIMENSIONS values of every matrix row
+            matrix: sparse count matrix aligned with keys
+            vocab: term of every matrix column
+            n_reviews: reviews per matrix row (default 1)
+        """
+        from scipy.sparse import csr_matrix
+
+        dims = [d for d in TERM_DIMENSIONS if d in keys.columns]
+        grouped = keys.reset_index(drop=True).groupby(dims, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        cells = grouped.size().index.to_frame(index=False)
+        weights = np.ones(len(codes), dtype=np.int64) if n_reviews is None else np.asarray(n_reviews)
+        cells['n_reviews'] = np.bincount(codes, weights=weights, minlength=len(cells)).astype(np.int64)
+        indicator = csr_matrix((np.ones(len(codes), dtype=np.int64), (codes, np.arange(len(codes)))),
+                               shape=(len(cells), len(codes)))
+        return cls(cells, indicator @ matrix, vocab)
+
+    def merge(self, other):
+        """Counts of both (e.g. the saved counts + new reviews) on a shared vocabulary."""
+        from scipy.sparse import vstack
+
+        vocab, inverse = np.unique(np.concatenate([self.vocab, other.vocab]).astype(str), return_inverse=True)
+        remapped = []
+        for part, columns in ((self, inverse[:len(self.vocab)]), (other, inverse[len(self.vocab):])):
+            coo = part.counts.tocoo()
+            remapped.append(type(coo)((coo.data, (coo.row, columns[coo.col])), shape=(len(part), len(vocab))))
+        keys = pd.concat([self.cells, other.cells], ignore_index=True)
+        return TermCounts.from_matrix(keys.drop(columns='n_reviews'), vstack(remapped), vocab,
+                                      n_reviews=keys['n_reviews'].to_numpy())
+
+    def frequencies(self, stop_words=(), max_words=None, **selection):
+        """
+        Term -> count over the cells matching dim=value (None = all values).
+
+        Args:
+            stop_words: terms to leave out
+            max_words: keep only the most frequent terms
+
+        Returns:
+            dict ordered by descending count (input for
+            WordCloud.generate_from_frequencies)
+        """
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, value in selection.items():
+            if value is not None:
+                mask &= (self.cells[dim] == value).to_numpy()
+        totals = np.asarray(self.counts[mask].sum(axis=0)).ravel()
+        if stop_words:
+            totals[np.isin(self.vocab.astype(str), list(stop_words))] = 0
+        order = np.argsort(-totals, kind='stable')
+        order = order[totals[order] > 0][:max_words]
+        return dict(zip(self.vocab[order].tolist(), totals[order].tolist()))
+
+    # ── Persistence ──────────────────────────────
+
+    def save(self, path=None):
+        path = path or DATA_PATHS['insight_term_counts']
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            data=self.counts.data, indices=self.counts.indices, indptr=self.counts.indptr,
+            shape=np.array(self.counts.shape), vocab=self.vocab.astype(str),
+            **{f"cell_{col}": self.cells[col].to_numpy(dtype=str if col in TERM_DIMENSIONS else None)
+               for col in self.cells.columns},
+        )
+
+    @classmethod
+    def load(cls, path=None):
+        """Load saved term counts; returns None if the file does not exist."""
+        from scipy.sparse import csr_matrix
+
+        path = path or DATA_PATHS['insight_term_counts']
+        try:
+            data = np.load(path)
+        except (FileNotFoundError, OSError):
+            return None
+        with data:
+            cells = pd.DataFrame({key[len('cell_'):]: data[key] for key in data.files if key.startswith('cell_')})
+            counts = csr_matrix((data['data'], data['indices'], data['indptr']), shape=tuple(data['shape']))
+            return cls(cells, counts, data['vocab'])
+
+
+def build_term_counts(df, stage=None, variant='lda'):
+    """
+    Lemma counts per (bank_name, sentiment_label) of df's reviews.
+
+    Counts come from the persisted preprocessing stage's term matrix
+    (reviews matched by review_id + text hash) without touching the review
+    text. Only reviews missing from the stage are counted from their
+    clean_text column, if df has one.
+
+    Args:
+        df: DataFrame with bank_name (+ optional sentiment_label) and
+            review_id + review_text and/or clean_text
+        stage: loaded PreprocessingStage (default: the saved stage)
+        variant: clean_text variant counted from the stage ('lda' or 'theme')
+
+    Returns:
+        TermCounts
+    """
+    def keys(rows):
+        return pd.DataFrame({dim: _dimension(rows, dim) for dim in TERM_DIMENSIONS})
+
+    df = df.dropna(subset=['bank_name'])
+    found = np.zeros(len(df), dtype=bool)
+    counts = None
+    if {'review_id', 'review_text'} <= set(df.columns):
+        from src.text_preprocessing import PreprocessingStage
+        if stage is None:
+            stage = PreprocessingStage()
+            stage.load()
+        position = stage.positions(df)
+        found = position >= 0
+        counts = TermCounts.from_matrix(keys(df[found]), stage.term_matrix(variant)[position[found]],
+                                        np.array(stage.lemma_vocab, dtype=str))
+
+    rest = df[~found]
+    if 'clean_text' in rest.columns and len(rest):
+        from sklearn.feature_extraction.text import CountVectorizer
+        rest = rest.dropna(subset=['clean_text'])
+        vectorizer = CountVectorizer(token_pattern=r'\S+', lowercase=False)
+        matrix = vectorizer.fit_transform(rest['clean_text'])
+        vectorized = TermCounts.from_matrix(keys(rest), matrix, vectorizer.get_feature_names_out())
+        counts = vectorized if counts is None else counts.merge(vectorized)
+    elif len(rest):
+        print(f"  ⚠ {len(rest):,} reviews not in the preprocessing stage (or edited) — not counted")
+
+    if counts is None:
+        raise ValueError("df needs review_id + review_text (preprocessing stage) or clean_text")
+    return counts
@@ -4,14 +4,28 @@ Reusable chart functions for Task 4: Insights & Recommendations.
 
 All functions accept a DataFrame (from reviews_with_themes_lda.csv)
 and return the matplotlib Figure so callers can show or save it.
+The theme / sentiment charts render from an insight_cube.InsightCube and
+the word clouds from insight_cube.TermCounts: pass aggregates built once
+with `build_cube(df)` / `build_term_counts(df)` to avoid re-aggregating the
+review table for every chart (a DataFrame is aggregated on the fly).
+clean_text can be loaded from the shared preprocessing stage with
+`attach_clean_text` instead of being recomputed.
 """
 
+import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from wordcloud import WordCloud
 from nltk.corpus import stopwords
 
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.text_preprocessing import PreprocessingStage
+from src.insight_cube import InsightCube, TermCounts, build_cube, build_term_counts
+from src.quantile_sketch import SketchTable
+
 
 # ──────────────────────────────────────────────
 # Palette & style helpers
@@ -40,19 +54,46 @@ def _sentiment_color(val):
 
 def _bank_list(df):
     """Return sorted unique bank names."""
+    if isinstance(df, (InsightCube, TermCounts, SketchTable)):
+        return df.values('bank_name')
     return sorted(df['bank_name'].dropna().unique())
 
 
+def _as_cube(data):
+    """Return data as an InsightCube (or SketchTable), aggregating a review DataFrame once."""
+    return data if isinstance(data, (InsightCube, SketchTable)) else build_cube(data)
+
+
+def _bank_axes(banks, figsize, **kwargs):
+    """One subplot per bank (always a list of axes)."""
+    fig, axes = plt.subplots(1, len(banks), figsize=figsize, **kwargs)
+    return fig, [axes] if len(banks) == 1 else list(axes)
+
+
+def attach_clean_text(df, variant='lda', path=None):
+    """
+    Add/replace clean_text from the persisted preprocessing stage
+    (text_preprocessing.PreprocessingStage) instead of re-lemmatizing.
+    Needs review_id and review_text columns; returns df unchanged if
+    the stage has not been built yet.
+    """
+    stage = PreprocessingStage(path)
+    if not stage.load():
+        print("Preprocessing stage not found — run the theme analysis first.")
+        return df
+    return stage.attach(df, variant=variant)
+
+
 # ──────────────────────────────────────────────
 # 1. Theme Distribution by Bank
 # ──────────────────────────────────────────────
 
 def plot_theme_distribution(df, figsize=(13, 6)):
     """Horizontal stacked bar chart showing theme share (%) per bank."""
-    theme_counts = df.groupby(['bank_name', 'theme']).size().reset_index(name='count')
-    total_by_bank = df.groupby('bank_name').size().reset_index(name='total')
-    theme_counts = theme_counts.merge(total_by_bank, on='bank_name')
-    theme_counts['percentage'] = (theme_counts['count'] / theme_counts['total']) * 100
+    cube = _as_cube(df)
+    theme_counts = cube.summary(['bank_name', 'theme'])[['bank_name', 'theme', 'count']]
+    total_by_bank = theme_counts.groupby('bank_name')['count'].transform('sum')
+    theme_counts['percentage'] = (theme_counts['count'] / total_by_bank) * 100
 
     fig, ax = plt.subplots(figsize=figsize)
     sns.barplot(
@@ -76,21 +117,16 @@ def plot_theme_sentiment_bars(df, figsize=(14, 5)):
     One subplot per bank: sorted horizontal bar chart of mean sentiment
     per theme. Green = driver, red = pain point.
     """
-    banks = _bank_list(df)
-    fig, axes = plt.subplots(1, len(banks), figsize=(figsize[0], figsize[1]),
-                             sharey=False)
-    if len(banks) == 1:
-        axes = [axes]
+    cube = _as_cube(df)
+    summary = cube.summary(['bank_name', 'theme'])
+    banks = _bank_list(cube)
+    fig, axes = _bank_axes(banks, figsize, sharey=False)
 
     for ax, bank in zip(axes, banks):
-        bdf = df[df['bank_name'] == bank]
         theme_sent = (
-            bdf.groupby('theme')['sentiment_score']
-            .mean()
-            .sort_values()
-            .reset_index()
+            summary[summary['bank_name'] == bank]
+            .sort_values('mean_sentiment')
         )
-        theme_sent.columns = ['theme', 'mean_sentiment']
         colors = [_sentiment_color(v) for v in theme_sent['mean_sentiment']]
         ax.barh(theme_sent['theme'], theme_sent['mean_sentiment'], color=colors)
         ax.axvline(0, color='grey', linewidth=0.8, linestyle='--')
@@ -113,17 +149,15 @@ def plot_sentiment_heatmap(df, figsize=(16, 5)):
     Uses a single-bank pivot so each bank's themes are visible even
     when they don't overlap with other banks.
     """
-    banks = _bank_list(df)
-    fig, axes = plt.subplots(1, len(banks), figsize=(figsize[0], figsize[1]))
-    if len(banks) == 1:
-        axes = [axes]
+    cube = _as_cube(df)
+    summary = cube.summary(['bank_name', 'theme'])
+    banks = _bank_list(cube)
+    fig, axes = _bank_axes(banks, figsize)
 
     for ax, bank in zip(axes, banks):
-        bdf = df[df['bank_name'] == bank]
         pivot = (
-            bdf.groupby('theme')['sentiment_score']
-            .mean()
-            .to_frame()
+            summary[summary['bank_name'] == bank]
+            .set_index('theme')[['mean_sentiment']]
         )
         pivot.columns = ['Mean Sentiment']
         sns.heatmap(
@@ -142,27 +176,40 @@ def plot_sentiment_heatmap(df, figsize=(16, 5)):
 # 4. Word Clouds per Bank (stop words removed)
 # ──────────────────────────────────────────────
 
-def plot_wordclouds(df, figsize=(18, 5)):
-    """One word cloud per bank from clean_text, with stop words removed."""
-    banks = _bank_list(df)
-    fig, axes = plt.subplots(1, len(banks), figsize=figsize)
-    if len(banks) == 1:
-        axes = [axes]
+def plot_wordclouds(df, figsize=(18, 5), sentiment=None):
+    """
+    One word cloud per bank from lemma frequencies, with stop words removed.
+
+    Accepts a TermCounts aggregate (insight_cube.build_term_counts) or a
+    review DataFrame, which is counted from its clean_text or from the
+    preprocessing stage. `sentiment` restricts the clouds to one
+    sentiment_label.
+    """
+    counts = df if isinstance(df, TermCounts) else build_term_counts(df)
+    banks = _bank_list(counts)
+    fig, axes = _bank_axes(banks, figsize)
 
     for ax, bank in zip(axes, banks):
-        text = ' '.join(df.loc[df['bank_name'] == bank, 'clean_text'].dropna())
+        frequencies = counts.frequencies(
+            stop_words=_STOP_WORDS, max_words=80,
+            bank_name=bank, sentiment_label=sentiment,
+        )
+        ax.set_title(bank, fontsize=13, fontweight='bold')
+        ax.axis('off')
+        if not frequencies:
+            continue
         wc = WordCloud(
             width=600, height=400,
             background_color='white',
             colormap='viridis',
             max_words=80,
-            stopwords=_STOP_WORDS,
-        ).generate(text)
+        ).generate_from_frequencies(frequencies)
         ax.imshow(wc, interpolation='bilinear')
-        ax.set_title(bank, fontsize=13, fontweight='bold')
-        ax.axis('off')
 
-    fig.suptitle('Most Frequent Words per Bank', fontsize=15, fontweight='bold', y=1.02)
+    title = 'Most Frequent Words per Bank'
+    if sentiment:
+        title += f' ({sentiment} reviews)'
+    fig.suptitle(title, fontsize=15, fontweight='bold', y=1.02)
     fig.tight_layout()
     return fig
 
@@ -176,20 +223,13 @@ def plot_priority_scatter(df, figsize=(16, 5)):
     One subplot per bank: x = mean sentiment, y = review count per theme.
     Top-left quadrant = highest-priority pain points.
     """
-    banks = _bank_list(df)
-    fig, axes = plt.subplots(1, len(banks), figsize=(figsize[0], figsize[1]),
-                             sharey=False)
-    if len(banks) == 1:
-        axes = [axes]
+    cube = _as_cube(df)
+    summaries = cube.summary(['bank_name', 'theme'])
+    banks = _bank_list(cube)
+    fig, axes = _bank_axes(banks, figsize, sharey=False)
 
     for ax, bank in zip(axes, banks):
-        bdf = df[df['bank_name'] == bank]
-        summary = (
-            bdf.groupby('theme')
-            .agg(count=('theme', 'size'),
-                 mean_sentiment=('sentiment_score', 'mean'))
-            .reset_index()
-        )
+        summary = summaries[summaries['bank_name'] == bank]
         color = BANK_PALETTE.get(bank, '#333')
         ax.scatter(
             summary['mean_sentiment'], summary['count'],
@@ -222,37 +262,29 @@ def plot_priority_scatter(df, figsize=(16, 5)):
 def plot_sentiment_boxplot(df, figsize=(18, 6)):
     """
     One subplot per bank: box-and-whisker plot of sentiment_score
-    distribution grouped by theme. Reveals spread, outliers, and
-    median shifts that summary statistics (mean bars) can hide.
+    distribution grouped by theme. Reveals spread and median shifts
+    that summary statistics (mean bars) can hide.
+
+    Boxes are drawn with Axes.bxp from the cube's histogram quantiles,
+    or from a quantile_sketch.SketchTable of KLL sketches (whiskers at
+    1.5 IQR); individual outliers are not kept in either aggregate.
     """
-    banks = _bank_list(df)
-    fig, axes = plt.subplots(1, len(banks), figsize=(figsize[0], figsize[1]),
-                             sharey=True)
-    if len(banks) == 1:
-        axes = [axes]
+    cube = _as_cube(df)
+    banks = _bank_list(cube)
+    fig, axes = _bank_axes(banks, figsize, sharex=True)
 
     for ax, bank in zip(axes, banks):
-        bdf = df[df['bank_name'] == bank].copy()
-
         # Order themes by median sentiment (lowest first → pain points on top)
-        theme_order = (
-            bdf.groupby('theme')['sentiment_score']
-            .median()
-            .sort_values()
-            .index
-            .tolist()
-        )
+        stats = cube.filter(bank_name=bank).rollup(['theme']).box_stats('theme')
+        stats = sorted(stats, key=lambda s: s['med'], reverse=True)
 
         color = BANK_PALETTE.get(bank, '#333')
-        sns.boxplot(
-            data=bdf,
-            y='theme',
-            x='sentiment_score',
-            order=theme_order,
-            color=color,
-            fliersize=2,
-            linewidth=0.8,
-            ax=ax,
+        # orientation= needs matplotlib >= 3.10 (pinned in requirements.txt)
+        ax.bxp(
+            stats, orientation='horizontal', showfliers=False, patch_artist=True,
+            boxprops={'facecolor': color, 'linewidth': 0.8},
+            whiskerprops={'linewidth': 0.8}, capprops={'linewidth': 0.8},
+            medianprops={'color': 'black', 'linewidth': 0.8},
         )
         ax.axvline(x=0, color='gray', linestyle='--', alpha=0.5)
         ax.set_title(bank, fontsize=11, fontweight='bold')
@@ -0,0 +1,275 @@
+"""
+Quantile Sketch Module
+Task 4: Insights & Recommendations — streaming sentiment distributions
+
+KLL quantile sketches (Karnin, Lang & Liberty) of sentiment_score: a
+sketch keeps O(k log n) of the scores it has seen, answers any quantile
+with rank error ~1.7/k and merges with sketches of other partitions, so
+box plots of arbitrarily many reviews are drawn from sketches built per
+partition (bank, theme, month, ...) and updated as new reviews arrive.
+
+SketchTable holds one sketch per (bank_name × theme × sentiment_label ×
+month) cell, mirroring insight_cube.InsightCube, and can be passed to
+insight_visualizations.plot_sentiment_boxplot in place of the cube.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import DATA_PATHS
+from src.insight_cube import CUBE_DIMENSIONS, _dimension, box_stats_from_quantiles
+
+# Sketch size (top compactor capacity) and per-level capacity decay
+DEFAULT_K = 200
+_DECAY = 2 / 3
+_MIN_CAPACITY = 8
+
+
+class KLLSketch:
+    """
+    Mergeable KLL quantile sketch over floats.
+
+    Level h stores items of weight 2**h; a level over capacity is sorted and
+    every other item (random offset) is promoted to the next level. The exact
+    count, min and max are tracked alongside.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(_MIN_CAPACITY, int(np.ceil(self.k * _DECAY ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) <= self._capacity(h):
+                h += 1
+                continue
+            grown = h + 1 == len(self.levels)
+            if grown:
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            odd = len(items) % 2
+            self.levels[h] = items[:odd]
+            promoted = items[odd + self._rng.integers(2)::2]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            # A new top level shrinks the lower capacities; re-check from the bottom
+            h = 0 if grown else h + 1
+
+    def update(self, values):
+        """Adds a batch of values (NaN ignored); returns self."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            # Feed large batches in compactor-sized chunks: compacting one
+            # huge level at once would keep far fewer items than k
+            for start in range(0, len(values), self.k):
+                self.levels[0] = np.concatenate([self.levels[0], values[start:start + self.k]])
+                self._compress()
+        return self
+
+    def merge(self, other):
+        """Folds another sketch into this one; returns self."""
+        self.k = min(self.k, other.k)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def copy(self):
+        sketch = KLLSketch(self.k)
+        sketch.levels = [items.copy() for items in self.levels]
+        sketch.n, sketch.min, sketch.max = self.n, self.min, self.max
+        sketch._rng = np.random.default_rng(self._rng.integers(2 ** 32))
+        return sketch
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Approximate quantiles (exact at 0 and 1); NaN for an empty sketch."""
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items, cum = self._weighted()
+        idx = np.minimum(np.searchsorted(cum, qs * cum[-1], side='left'), len(items) - 1)
+        values = items[idx]
+        values[qs <= 0] = self.min
+        values[qs >= 1] = self.max
+        return values
+
+    def rank(self, value):
+        """Approximate fraction of values <= value."""
+        if self.n == 0:
+            return np.nan
+        items, cum = self._weighted()
+        position = np.searchsorted(items, value, side='right')
+        return cum[position - 1] / cum[-1] if position else 0.0
+
+
+class SketchTable:
+    """
+    One KLLSketch of sentiment_score per cell. `cells` holds the dimension
+    values and the count of every cell, aligned with `sketches`.
+    """
+
+    def __init__(self, cells, sketches):
+        self.cells = cells.reset_index(drop=True)
+        self.sketches = list(sketches)
+
+    @property
+    def dimensions(self):
+        return [c for c in CUBE_DIMENSIONS if c in self.cells.columns]
+
+    def __len__(self):
+        return len(self.cells)
+
+    def values(self, dim):
+        """Sorted distinct values of a dimension."""
+        return sorted(self.cells[dim].unique())
+
+    def filter(self, **selection):
+        """Sub-table of the cells matching dim=value (or dim=[values])."""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, value in selection.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.cells[dim].isin(values).to_numpy()
+        return SketchTable(self.cells[mask], [s for s, m in zip(self.sketches, mask) if m])
+
+    def rollup(self, by):
+        """Merges the sketches of cells that agree on the `by` dimensions."""
+        by = [by] if isinstance(by, str) else list(by)
+        return self._group(self.cells, self.sketches, by)
+
+    def merge(self, other):
+        """Cell-wise merge with another table (e.g. a new partition)."""
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        return self._group(cells, self.sketches + other.sketches, self.dimensions)
+
+    def update(self, df, k=DEFAULT_K):
+        """Adds the sentiment scores of new reviews; returns the merged table."""
+        return self.merge(build_sketches(df, by=self.dimensions, k=k))
+
+    @staticmethod
+    def _group(cells, sketches, by):
+        if by:
+            grouped = cells.groupby(by, sort=True)
+            codes = grouped.ngroup().to_numpy()
+            keys = grouped.size().index.to_frame(index=False)
+        else:
+            codes = np.zeros(len(cells), dtype=np.int64)
+            keys = pd.DataFrame(index=[0])
+        merged = [None] * len(keys)
+        for code, sketch in zip(codes, sketches):
+            merged[code] = sketch.copy() if merged[code] is None else merged[code].merge(sketch)
+        keys['count'] = [s.n for s in merged]
+        return SketchTable(keys, merged)
+
+    def quantiles(self, qs):
+        """(n_cells × len(qs)) array of approximate quantiles."""
+        return np.array([s.quantiles(qs) for s in self.sketches]).reshape(len(self.sketches), len(qs))
+
+    def box_stats(self, label):
+        """Box-and-whisker statistics of every cell for Axes.bxp."""
+        return box_stats_from_quantiles(
+            self.cells[label], self.quantiles([0.25, 0.5, 0.75]),
+            np.array([s.min for s in self.sketches]), np.array([s.max for s in self.sketches]),
+        )
+
+    # ── Persistence ──────────────────────────────
+
+    def save(self, path=None):
+        path = path or DATA_PATHS['sentiment_sketches']
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        level_sizes = [[len(level) for level in s.levels] for s in self.sketches]
+        np.savez_compressed(
+            path,
+            items=np.concatenate([np.concatenate(s.levels) for s in self.sketches]) if self.sketches else np.empty(0),
+            n_levels=np.array([len(sizes) for sizes in level_sizes], dtype=np.int64),
+            level_sizes=np.array([n for sizes in level_sizes for n in sizes], dtype=np.int64),
+            header=np.array([[s.k, s.n, s.min, s.max] for s in self.sketches], dtype=float).reshape(-1, 4),
+            **{f"cell_{col}": self.cells[col].to_numpy(dtype=str if col in CUBE_DIMENSIONS else None)
+               for col in self.cells.columns},
+        )
+
+    @classmethod
+    def load(cls, path=None):
+        """Load a saved table; returns None if the file does not exist."""
+        path = path or DATA_PATHS['sentiment_sketches']
+        try:
+            data = np.load(path)
+        except (FileNotFoundError, OSError):
+            return None
+        with data:
+            cells = pd.DataFrame({key[len('cell_'):]: data[key] for key in data.files if key.startswith('cell_')})
+            items = data['items']
+            level_sizes = iter(data['level_sizes'])
+            offset = 0
+            sketches = []
+            for (k, n, lo, hi), n_levels in zip(data['header'], data['n_levels']):
+                sketch = KLLSketch(int(k))
+                sketch.n, sketch.min, sketch.max = int(n), lo, hi
+                sketch.levels = []
+                for _ in range(n_levels):
+                    size = next(level_sizes)
+                    sketch.levels.append(items[offset:offset + size])
+                    offset += size
+                sketches.append(sketch)
+        return cls(cells, sketches)
+
+
+def build_sketches(df, by=CUBE_DIMENSIONS, k=DEFAULT_K, score_col='sentiment_score'):
+    """
+    Sketches sentiment scores per cell in one pass over df.
+
+    Args:
+        df: DataFrame with the `by` columns (month is derived from
+            review_date) and the score column
+        by: cell dimensions
+        k: sketch size
+
+    Returns:
+        SketchTable (reviews without a score are left out, so every cell
+        has count > 0)
+    """
+    by = list(by)
+    df = df.dropna(subset=[score_col] + [dim for dim in ('bank_name', 'theme') if dim in by])
+    keys = pd.DataFrame({dim: _dimension(df, dim) for dim in by})
+    grouped = keys.groupby(by, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    cells = grouped.size().index.to_frame(index=False)
+
+    # Sort scores by cell once and sketch each contiguous run
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(cells) + 1))
+    scores = df[score_col].to_numpy(dtype=float)[order]
+    sketches = [KLLSketch(k, seed=i).update(scores[start:stop])
+                for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]))]
+    cells['count'] = [s.n for s in sketches]
+    return SketchTable(cells, sketches)
@@ -0,0 +1,254 @@
+"""
+Report Builder Module
+Task 4: Insights & Recommendations — headless batch rendering
+
+Renders every insight_visualizations chart of the Task 4 report to PNG /
+SVG files without a notebook. Figures are rendered in a process pool with
+the Agg backend; each figure is keyed by a hash of its inputs (the
+aggregate cube, term counts or sketches it is drawn from, the plotting and
+aggregation code and the output settings), so re-runs skip charts whose
+inputs did not change.
+
+Output layout (output_dir defaults to DATA_PATHS['insight_report']):
+    <output_dir>/<figure>.png, <figure>.svg, ...
+    <output_dir>/manifest.json   (input hash + files per figure)
+"""
+
+import sys
+import os
+import json
+import time
+import hashlib
+import inspect
+from importlib import import_module
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import DATA_PATHS
+from src.insight_cube import InsightCube, TermCounts, build_cube, build_term_counts
+from src.quantile_sketch import SketchTable, build_sketches
+
+# (figure name, insight_visualizations function, input) in report order;
+# 'cube' figures render from the InsightCube, 'terms' from the TermCounts and
+# 'sketches' from the SketchTable of KLL sentiment sketches
+REPORT_FIGURES = (
+    ('theme_distribution', 'plot_theme_distribution', 'cube'),
+    ('theme_sentiment_bars', 'plot_theme_sentiment_bars', 'cube'),
+    ('sentiment_heatmap', 'plot_sentiment_heatmap', 'cube'),
+    ('wordclouds', 'plot_wordclouds', 'terms'),
+    ('priority_scatter', 'plot_priority_scatter', 'cube'),
+    ('sentiment_boxplot', 'plot_sentiment_boxplot', 'sketches'),
+)
+
+FORMATS = ('png', 'svg')
+DPI = 150
+
+# Modules whose code shapes the figures (plot functions and their helpers,
+# the aggregates' summaries and box statistics); part of every figure hash
+PLOTTING_MODULES = ('src.insight_visualizations', 'src.insight_cube', 'src.quantile_sketch')
+
+
+def _use_agg():
+    """Switch the current process to the non-interactive Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _render_figure(func_name, data, paths, dpi):
+    """Draw one chart and save it to every path; returns seconds taken."""
+    import matplotlib.pyplot as plt
+    from src import insight_visualizations
+
+    start = time.perf_counter()
+    fig = getattr(insight_visualizations, func_name)(data)
+    for path in paths:
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+def _plotting_source():
+    """Source code of PLOTTING_MODULES."""
+    return '\0'.join(inspect.getsource(import_module(name)) for name in PLOTTING_MODULES)
+
+
+def _digest(*parts):
+    """md5 over strings, arrays, DataFrames and the insight aggregates."""
+    h = hashlib.md5()
+    for part in parts:
+        if isinstance(part, InsightCube):
+            h.update(pd.util.hash_pandas_object(part.cells, index=False).to_numpy().tobytes())
+            h.update(np.ascontiguousarray(part.hist).tobytes())
+            h.update(repr(part.score_range).encode())
+        elif isinstance(part, TermCounts):
+            h.update(pd.util.hash_pandas_object(part.cells, index=False).to_numpy().tobytes())
+            for array in (part.counts.data, part.counts.indices, part.counts.indptr):
+                h.update(np.ascontiguousarray(array).tobytes())
+            h.update('\0'.join(part.vocab.astype(str)).encode())
+        elif isinstance(part, SketchTable):
+            h.update(pd.util.hash_pandas_object(part.cells, index=False).to_numpy().tobytes())
+            for sketch in part.sketches:
+                h.update(np.concatenate(sketch.levels).tobytes())
+        elif isinstance(part, pd.DataFrame):
+            h.update(repr(list(part.columns)).encode())
+            h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            h.update(str(part).encode())
+    return h.hexdigest()
+
+
+class ReportBuilder:
+    """
+    Renders the insight report figures, skipping figures whose input hash
+    matches the manifest entry of the previous run.
+    """
+
+    def __init__(self, output_dir=None, formats=FORMATS, n_jobs=None, dpi=DPI):
+        """
+        Args:
+            output_dir: Directory for the figures and manifest.json
+            formats: File formats written per figure (matplotlib extensions)
+            n_jobs: Worker processes (1 = render in this process with Agg,
+                    None = all cores)
+            dpi: Resolution of raster formats
+        """
+        self.output_dir = output_dir or DATA_PATHS['insight_report']
+        self.formats = tuple(formats)
+        self.n_jobs = n_jobs
+        self.dpi = dpi
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.output_dir, 'manifest.json')
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _inputs(self, df, cube, terms, sketches, kinds):
+        """
+        Chart inputs by kind, each computed once for the whole report
+        (from df if given, else the saved aggregates; None if unavailable).
+        """
+        inputs = {}
+        if 'cube' in kinds:
+            if cube is None:
+                cube = build_cube(df) if df is not None else InsightCube.load()
+            inputs['cube'] = cube
+        if 'terms' in kinds:
+            if terms is None:
+                terms = build_term_counts(df) if df is not None else TermCounts.load()
+            inputs['terms'] = terms
+        if 'sketches' in kinds:
+            if sketches is None:
+                sketches = build_sketches(df) if df is not None else SketchTable.load()
+            inputs['sketches'] = sketches
+        return inputs
+
+    def figure_hash(self, func_name, data):
+        """Hash of everything a figure's files depend on."""
+        return _digest(func_name, _plotting_source(), self.formats, self.dpi, data)
+
+    def build(self, df=None, cube=None, terms=None, sketches=None, figures=None, force=False):
+        """
+        Renders the report figures.
+
+        Args:
+            df: Review DataFrame (reviews_with_themes_lda.csv) the aggregates
+                are built from when not given
+            cube: Pre-built InsightCube for the theme / sentiment charts
+            terms: Pre-built TermCounts for the word clouds
+            sketches: Pre-built SketchTable for the sentiment boxplot
+            (without df, missing aggregates are loaded from DATA_PATHS)
+            figures: Figure names to render (default: all of REPORT_FIGURES)
+            force: Re-render even if the input hash is unchanged
+
+        Returns:
+            DataFrame with one row per figure: figure, status
+            (rendered / cached / skipped), seconds, files
+        """
+        selected = [f for f in REPORT_FIGURES if figures is None or f[0] in figures]
+        inputs = self._inputs(df, cube, terms, sketches, {kind for _, _, kind in selected})
+        skipped = [name for name, _, kind in selected if inputs[kind] is None]
+        selected = [f for f in selected if inputs[f[2]] is not None]
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = self._read_manifest()
+        results = {name: {'figure': name, 'status': 'skipped', 'seconds': 0.0, 'files': []} for name in skipped}
+
+        tasks = []
+        for name, func_name, kind in selected:
+            digest = self.figure_hash(func_name, inputs[kind])
+            paths = [os.path.join(self.output_dir, f"{name}.{fmt}") for fmt in self.formats]
+            entry = manifest.get(name, {})
+            if not force and entry.get('hash') == digest and all(os.path.exists(p) for p in paths):
+                results[name] = {'figure': name, 'status': 'cached', 'seconds': 0.0, 'files': paths}
+            else:
+                tasks.append((name, func_name, kind, digest, paths))
+
+        print(f"Rendering {len(tasks)} figure(s), {len(selected) - len(tasks)} unchanged"
+              + (f", {len(skipped)} skipped (no input)" if skipped else ""))
+
+        n_jobs = min(self.n_jobs or os.cpu_count(), len(tasks))
+        if n_jobs <= 1:
+            _use_agg()
+            timings = {name: _render_figure(func_name, inputs[kind], paths, self.dpi)
+                       for name, func_name, kind, _, paths in tasks}
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_use_agg) as pool:
+                futures = {
+                    name: pool.submit(_render_figure, func_name, inputs[kind], paths, self.dpi)
+                    for name, func_name, kind, _, paths in tasks
+                }
+                timings = {name: future.result() for name, future in futures.items()}
+
+        rendered_at = datetime.now().isoformat(timespec='seconds')
+        for name, _, _, digest, paths in tasks:
+            manifest[name] = {'hash': digest, 'files': [os.path.basename(p) for p in paths],
+                              'rendered_at': rendered_at}
+            results[name] = {'figure': name, 'status': 'rendered', 'seconds': timings[name], 'files': paths}
+            print(f"  ✓ {name} ({timings[name]:.2f}s)")
+        self._write_manifest(manifest)
+
+        order = [name for name, _, _ in REPORT_FIGURES if name in results]
+        return pd.DataFrame([results[name] for name in order])
+
+
+def build_report(input_path=None, output_dir=None, n_jobs=None, force=False):
+    """Builds the insight cube and all report figures from the LDA theme results
+    (ThemeAnalyzerLDA.run_analysis(map_themes=True), which adds the theme column)."""
+    input_path = input_path or DATA_PATHS['theme_results_lda']
+    print(f"Loading reviews from: {input_path}")
+    df = pd.read_csv(input_path)
+
+    cube = build_cube(df)
+    cube.save()
+    terms = build_term_counts(df)
+    terms.save()
+    sketches = build_sketches(df)
+    sketches.save()
+    print(f"  → {len(df):,} reviews aggregated into {len(cube):,} cube cells, "
+          f"{terms.counts.shape[1]:,}-term counts and {len(sketches):,} sentiment sketches")
+
+    report = ReportBuilder(output_dir, n_jobs=n_jobs).build(df, cube, terms, sketches, force=force)
+    print(f"\n✅ Report figures saved to: {output_dir or DATA_PATHS['insight_report']}")
+    return report
+
+
+if __name__ == "__main__":
+    build_report()
@@ -20,13 +20,21 @@ from datasets import load_dataset
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import DATA_PATHS
+from src.sentiment_calibration import load_thresholds, assign_labels
 
 class BertSentimentAnalysis:
     """Pipeline for sentiment analysis using Hugging Face Transformers (DistilBERT)"""
 
-    def __init__(self):
+    def __init__(self, thresholds_path=None):
+        """
+        Args:
+            thresholds_path (str): Calibrated thresholds JSON (defaults to
+                                   DATA_PATHS['sentiment_thresholds']; ±0.2 if missing)
+        """
         self.input_path = DATA_PATHS['processed_reviews']
         self.output_path = DATA_PATHS['sentiment_results_bert']
+        # Neutral band: calibrated thresholds if available, else ±0.2
+        self.thresholds = load_thresholds('BERT', thresholds_path)
         # Check for GPU
         self.device = 0 if torch.cuda.is_available() else -1
         print(f"🚀 Using device: {'GPU (cuda:0)' if self.device == 0 else 'CPU'}")
@@ -87,7 +95,6 @@ class BertSentimentAnalysis:
         df = pd.read_csv(self.input_path)
         
         sentiment_scores = []
-        sentiment_labels = []
         
         for res in results:
             # res looks like {'label': 'POSITIVE', 'score': 0.998}
@@ -100,19 +107,10 @@ class BertSentimentAnalysis:
             final_score = score if label == 'POSITIVE' else -score
             
             sentiment_scores.append(final_score)
-            
-            # Assign Label based on Thresholds (Wider than VADER)
-            if final_score > 0.2:
-                final_label = 'positive'
-            elif final_score < -0.2:
-                final_label = 'negative'
-            else:
-                final_label = 'neutral'
-            
-            sentiment_labels.append(final_label)
 
         df['sentiment_score'] = sentiment_scores
-        df['sentiment_label'] = sentiment_labels
+        # Assign Label based on Thresholds (Wider than VADER, strict comparison)
+        df['sentiment_label'] = assign_labels(df, self.thresholds, inclusive=False)
         
         # 4. Save Results
         print(f"Saving results to: {self.output_path}")
@@ -0,0 +1,260 @@
+"""
+Sentiment Threshold Calibration Module
+Task 2: Sentiment Analysis — neutral band tuning
+
+Sweeps (negative, positive) cut-off pairs over a stored `sentiment_score`
+column against the star-rating ground truth (`star_to_sentiment`) and saves
+the best pair per model and per bank as a JSON config that the VADER and
+BERT engines load instead of their hardcoded neutral bands.
+
+Scores are sorted once and per-class cumulative counts are built, so the
+confusion counts of any threshold pair are a couple of array lookups and the
+whole grid is evaluated with NumPy broadcasting.
+"""
+
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import DATA_PATHS
+from src.sentiment_evaluation import star_to_sentiment
+
+# Neutral bands the engines used before calibration (negative, positive)
+DEFAULT_THRESHOLDS = {
+    'VADER': (-0.05, 0.05),
+    'BERT': (-0.2, 0.2),
+    'Twitter-RoBERTa': (-0.05, 0.05),
+}
+
+# Stored score columns per model (Twitter-RoBERTa labels by argmax and does
+# not load thresholds; it is calibrated for comparison only)
+MODEL_RESULTS = {
+    'VADER': 'sentiment_results_vader',
+    'BERT': 'sentiment_results_bert',
+    'Twitter-RoBERTa': 'sentiment_results_twitter',
+}
+
+METRICS = ('macro_f1', 'accuracy', 'neutral_recall', 'negative_recall')
+
+
+def sweep_thresholds(scores, ratings, candidates=None, inclusive=True):
+    """
+    Evaluate every (negative, positive) threshold pair from `candidates`.
+
+    A review is negative if score <= negative, positive if score >= positive
+    and neutral otherwise (strict < / > when inclusive=False).
+
+    Args:
+        scores: array-like of sentiment scores
+        ratings: array-like of star ratings (same length)
+        candidates: threshold grid; defaults to -1.00..1.00 in 0.01 steps
+        inclusive: whether the cut-offs themselves belong to the outer classes
+
+    Returns:
+        DataFrame with one row per valid pair (negative < positive) and
+        columns negative, positive + every metric in METRICS
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    truth = pd.Series(ratings).apply(star_to_sentiment).to_numpy()
+    if candidates is None:
+        candidates = np.round(np.linspace(-1, 1, 201), 2)
+    candidates = np.unique(np.asarray(candidates, dtype=np.float64))
+
+    order = np.argsort(scores, kind='stable')
+    sorted_scores = scores[order]
+    sorted_truth = truth[order]
+    n = len(scores)
+
+    # cum[k][i] = number of class-k reviews among the i lowest scores
+    cum = {
+        label: np.concatenate([[0], np.cumsum(sorted_truth == label)])
+        for label in ('negative', 'neutral', 'positive')
+    }
+    actual = {label: c[-1] for label, c in cum.items()}
+
+    # a = #predicted negative, b = #reviews below the positive cut-off
+    a = np.searchsorted(sorted_scores, candidates, side='right' if inclusive else 'left')
+    b = np.searchsorted(sorted_scores, candidates, side='left' if inclusive else 'right')
+    a, b = a[:, None], b[None, :]
+    valid = candidates[:, None] < candidates[None, :]
+    a, b = np.broadcast_arrays(a, b)
+    a, b = a[valid], b[valid]
+
+    tp = {
+        'negative': cum['negative'][a],
+        'neutral': cum['neutral'][b] - cum['neutral'][a],
+        'positive': actual['positive'] - cum['positive'][b],
+    }
+    predicted = {'negative': a, 'neutral': b - a, 'positive': n - b}
+
+    f1 = {
+        label: np.divide(2 * tp[label], predicted[label] + actual[label],
+                         out=np.zeros(len(a)), where=(predicted[label] + actual[label]) > 0)
+        for label in tp
+    }
+
+    neg_grid, pos_grid = np.meshgrid(candidates, candidates, indexing='ij')
+    return pd.DataFrame({
+        'negative': neg_grid[valid],
+        'positive': pos_grid[valid],
+        'macro_f1': (f1['negative'] + f1['neutral'] + f1['positive']) / 3,
+        'accuracy': (tp['negative'] + tp['neutral'] + tp['positive']) / max(n, 1),
+        'neutral_recall': tp['neutral'] / max(actual['neutral'], 1),
+        'negative_recall': tp['negative'] / max(actual['negative'], 1),
+    })
+
+
+def _best_pair(scores, ratings, metric, candidates, inclusive):
+    """Return the best row of the sweep as a plain dict."""
+    sweep = sweep_thresholds(scores, ratings, candidates, inclusive)
+    # Ties go to the narrowest neutral band, then the lowest negative cut-off
+    sweep['width'] = sweep['positive'] - sweep['negative']
+    best = sweep.sort_values([metric, 'width', 'negative'],
+                             ascending=[False, True, True], kind='stable').iloc[0]
+    result = {'negative': float(best['negative']), 'positive': float(best['positive'])}
+    result.update({m: round(float(best[m]), 4) for m in METRICS})
+    result['n_reviews'] = int(len(scores))
+    return result
+
+
+def calibrate_thresholds(df, metric='macro_f1', candidates=None, inclusive=True,
+                         min_bank_reviews=100):
+    """
+    Find the best thresholds for one model, overall and per bank.
+
+    Args:
+        df: DataFrame with 'rating', 'sentiment_score' and optionally 'bank_name'
+        metric: Metric to maximise (one of METRICS)
+        candidates: Threshold grid passed to `sweep_thresholds`
+        inclusive: Cut-off convention of the engine being calibrated
+        min_bank_reviews: Banks with fewer reviews fall back to the overall pair
+
+    Returns:
+        dict with the overall pair, its metrics and a 'per_bank' dict
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+    eval_df = df.dropna(subset=['rating', 'sentiment_score'])
+
+    config = _best_pair(eval_df['sentiment_score'], eval_df['rating'],
+                        metric, candidates, inclusive)
+    config['metric'] = metric
+    config['per_bank'] = {}
+
+    if 'bank_name' in eval_df.columns:
+        for bank, bank_df in eval_df.groupby('bank_name'):
+            if len(bank_df) < min_bank_reviews:
+                continue
+            config['per_bank'][bank] = _best_pair(
+                bank_df['sentiment_score'], bank_df['rating'], metric, candidates, inclusive
+            )
+
+    return config
+
+
+def run_calibration(models=None, metric='macro_f1', output_path=None):
+    """
+    Calibrate every model whose results CSV exists and write the config.
+
+    Args:
+        models: Model names to calibrate (keys of MODEL_RESULTS); default all
+        metric: Metric to maximise
+        output_path: JSON destination; defaults to DATA_PATHS['sentiment_thresholds']
+
+    Returns:
+        dict {model_name: config}
+    """
+    output_path = output_path or DATA_PATHS['sentiment_thresholds']
+    configs = {}
+
+    for model_name in (models or MODEL_RESULTS):
+        path = DATA_PATHS[MODEL_RESULTS[model_name]]
+        try:
+            df = pd.read_csv(path)
+        except FileNotFoundError:
+            print(f"  {model_name}: results not found ({path}) — skipping")
+            continue
+
+        # BERT labels with strict comparisons, the others inclusively
+        config = calibrate_thresholds(df, metric=metric, inclusive=model_name != 'BERT')
+        configs[model_name] = config
+
+        default_neg, default_pos = DEFAULT_THRESHOLDS[model_name]
+        print(f"\n{'='*60}")
+        print(f"THRESHOLD CALIBRATION: {model_name}  ({metric})")
+        print(f"{'='*60}")
+        print(f"  Current:  ({default_neg:+.2f}, {default_pos:+.2f})")
+        print(f"  Best:     ({config['negative']:+.2f}, {config['positive']:+.2f})  "
+              f"{metric}={config[metric]:.3f}  neutral recall={config['neutral_recall']:.1%}")
+        for bank, bank_config in config['per_bank'].items():
+            print(f"    {bank}: ({bank_config['negative']:+.2f}, {bank_config['positive']:+.2f})  "
+                  f"{metric}={bank_config[metric]:.3f}")
+
+    if configs:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(configs, f, indent=2)
+        print(f"\n✅ Thresholds saved to: {output_path}")
+
+    return configs
+
+
+def load_thresholds(model_name, path=None):
+    """
+    Load a model's calibrated thresholds, falling back to DEFAULT_THRESHOLDS.
+
+    Returns:
+        dict with 'negative', 'positive' and 'per_bank'
+        ({bank_name: {'negative': ..., 'positive': ...}})
+    """
+    path = path or DATA_PATHS['sentiment_thresholds']
+    default_neg, default_pos = DEFAULT_THRESHOLDS[model_name]
+    thresholds = {'negative': default_neg, 'positive': default_pos, 'per_bank': {}}
+
+    try:
+        with open(path) as f:
+            config = json.load(f).get(model_name)
+    except (FileNotFoundError, json.JSONDecodeError):
+        config = None
+
+    if config:
+        thresholds.update(
+            negative=config['negative'],
+            positive=config['positive'],
+            per_bank=config.get('per_bank', {}),
+        )
+    return thresholds
+
+
+def assign_labels(df, thresholds, score_col='sentiment_score', inclusive=True):
+    """
+    Label scores with the (per-bank) thresholds returned by `load_thresholds`.
+
+    Returns:
+        Series of 'negative' / 'neutral' / 'positive' aligned with df
+    """
+    negative = pd.Series(thresholds['negative'], index=df.index, dtype=np.float64)
+    positive = pd.Series(thresholds['positive'], index=df.index, dtype=np.float64)
+    if thresholds['per_bank'] and 'bank_name' in df.columns:
+        per_bank = thresholds['per_bank']
+        negative = df['bank_name'].map({b: c['negative'] for b, c in per_bank.items()}).fillna(negative)
+        positive = df['bank_name'].map({b: c['positive'] for b, c in per_bank.items()}).fillna(positive)
+
+    scores = df[score_col]
+    if inclusive:
+        is_neg, is_pos = scores <= negative, scores >= positive
+    else:
+        is_neg, is_pos = scores < negative, scores > positive
+
+    return pd.Series(
+        np.select([is_pos, is_neg], ['positive', 'negative'], default='neutral'),
+        index=df.index,
+    )
+
+
+if __name__ == "__main__":
+    run_calibration()
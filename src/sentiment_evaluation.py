@@ -1,6 +1,7 @@
 """
 Sentiment Evaluation Module
-Shared evaluation function for comparing predicted sentiment labels against star ratings.
+Shared evaluation function for comparing predicted sentiment labels against star ratings,
+plus a paired bootstrap comparison of several models (`compare_models`).
 
 Ground truth mapping:
   1-2 stars → negative
@@ -87,3 +88,178 @@ def evaluate_sentiment(df, model_name="Model"):
         'report_str': report_str,
         'n_evaluated': len(eval_df)
     }
+
+
+# ──────────────────────────────────────────────
+# Bootstrap model comparison
+# ──────────────────────────────────────────────
+
+_LABEL_CODES = {'negative': 0, 'neutral': 1, 'positive': 2}
+
+
+def _bootstrap_chunk(seed, n_draws, features):
+    """
+    Run `n_draws` bootstrap resamples in one vectorized pass.
+
+    Draws an (n_draws, n) index matrix, turns it into per-row resample counts
+    and multiplies by the (n, k) feature matrix, so every metric sum for every
+    resample comes out of a single matrix product.
+    Returns an (n_draws, k) array of resampled feature sums.
+    """
+    rng = np.random.default_rng(seed)
+    n = features.shape[0]
+    idx = rng.integers(0, n, size=(n_draws, n), dtype=np.int64)
+    idx += np.arange(n_draws)[:, None] * n
+    weights = np.bincount(idx.ravel(), minlength=n_draws * n).reshape(n_draws, n)
+    return weights.astype(np.float64) @ features
+
+
+def compare_models(df, label_columns, score_columns=None, n_resamples=2000,
+                   confidence=0.95, chunk_size=200, n_jobs=1, random_state=42):
+    """
+    Compare several sentiment models with paired bootstrap confidence intervals.
+
+    All models are resampled with the same index matrix, so the differences
+    against the baseline (first model) are paired and the CI on a difference
+    tells whether one model is really better than the other.
+
+    Args:
+        df: DataFrame with 'rating' plus one predicted-label column per model
+        label_columns: dict {model_name: label_column} or list of column names.
+                       The first model is the baseline for differences.
+        score_columns: Optional dict {model_name: score_column} (same keys as
+                       label_columns) to bootstrap the score-rating correlation
+        n_resamples: Number of bootstrap resamples
+        confidence: Confidence level of the intervals (e.g. 0.95)
+        chunk_size: Resamples drawn per index matrix (bounds memory to a
+                    chunk_size x n_reviews matrix per worker)
+        n_jobs: Number of worker processes for the chunks (1 = in-process)
+        random_state: Seed; results do not depend on n_jobs or chunk order
+
+    Returns:
+        dict with 'metrics' (per-model estimates + CIs), 'differences'
+        (each model minus the baseline + CIs) and 'n_evaluated'
+    """
+    if not isinstance(label_columns, dict):
+        label_columns = {col: col for col in label_columns}
+    models = list(label_columns)
+    if score_columns is not None and set(score_columns) != set(models):
+        raise ValueError("score_columns must have the same model names as label_columns")
+
+    needed = ['rating'] + list(label_columns.values()) + list((score_columns or {}).values())
+    eval_df = df.dropna(subset=needed)
+
+    truth = eval_df['rating'].apply(star_to_sentiment).map(_LABEL_CODES).to_numpy(np.int8)
+    # Unknown labels become -1 so they always count as misses
+    preds = np.vstack([
+        eval_df[label_columns[m]].map(_LABEL_CODES).fillna(-1).to_numpy(np.int8)
+        for m in models
+    ])
+    scores = ratings = None
+    if score_columns is not None:
+        scores = np.vstack([eval_df[score_columns[m]].to_numpy(np.float64) for m in models])
+        ratings = eval_df['rating'].to_numpy(np.float64)
+
+    # Point estimates on the full sample
+    point = {
+        'accuracy': (preds == truth).mean(axis=1),
+        'negative_recall': (
+            ((preds == _LABEL_CODES['negative']) & (truth == _LABEL_CODES['negative'])).sum(axis=1)
+            / max((truth == _LABEL_CODES['negative']).sum(), 1)
+        ),
+    }
+    if scores is not None:
+        point['correlation'] = np.array([np.corrcoef(s, ratings)[0, 1] for s in scores])
+
+    # Per-review feature columns whose resampled sums give every metric:
+    # [is_neg, (correct, neg_hit) per model, y, y^2, (x, x^2, xy) per model]
+    n_models = len(models)
+    is_neg = truth == _LABEL_CODES['negative']
+    columns = [is_neg]
+    for pred in preds:
+        columns += [pred == truth, is_neg & (pred == _LABEL_CODES['negative'])]
+    if scores is not None:
+        # Centre first so the moment sums do not lose precision
+        y = ratings - ratings.mean()
+        columns += [y, y * y]
+        for score in scores:
+            x = score - score.mean()
+            columns += [x, x * x, x * y]
+    features = np.column_stack(columns).astype(np.float64)
+
+    # One independent seed per chunk keeps results reproducible for any n_jobs
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+
+    if n_jobs == 1:
+        chunks = [_bootstrap_chunk(seed, size, features) for seed, size in zip(seeds, sizes)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, seeds, sizes, [features] * len(sizes)))
+
+    sums = np.vstack(chunks) / len(truth)
+    neg_share = sums[:, [0]]
+    draws = {
+        'accuracy': sums[:, 1:1 + 2 * n_models:2],
+        'negative_recall': np.divide(
+            sums[:, 2:2 + 2 * n_models:2], neg_share,
+            out=np.zeros((len(sums), n_models)), where=neg_share > 0,
+        ),
+    }
+    if scores is not None:
+        base = 1 + 2 * n_models
+        y_mean, y_var = sums[:, [base]], sums[:, [base + 1]] - sums[:, [base]] ** 2
+        x_mean = sums[:, base + 2::3]
+        x_var = sums[:, base + 3::3] - x_mean ** 2
+        cov = sums[:, base + 4::3] - x_mean * y_mean
+        denom = np.sqrt(np.clip(x_var * y_var, 0, None))
+        draws['correlation'] = np.divide(
+            cov, denom, out=np.full_like(cov, np.nan), where=denom > 0,
+        )
+
+    alpha = (1 - confidence) / 2
+    metric_rows = []
+    diff_rows = []
+    for metric, values in draws.items():
+        low, high = np.nanquantile(values, [alpha, 1 - alpha], axis=0)
+        for m, name in enumerate(models):
+            metric_rows.append({
+                'model': name, 'metric': metric, 'estimate': point[metric][m],
+                'ci_low': low[m], 'ci_high': high[m],
+            })
+
+        diffs = values[:, 1:] - values[:, [0]]
+        d_low, d_high = np.nanquantile(diffs, [alpha, 1 - alpha], axis=0) if diffs.size else ([], [])
+        for m, name in enumerate(models[1:]):
+            diff_rows.append({
+                'model': name, 'baseline': models[0], 'metric': metric,
+                'difference': point[metric][m + 1] - point[metric][0],
+                'ci_low': d_low[m], 'ci_high': d_high[m],
+                # Share of resamples where the model does not beat the baseline
+                'p_not_better': np.mean(diffs[:, m] <= 0),
+            })
+
+    metrics = pd.DataFrame(metric_rows)
+    differences = pd.DataFrame(diff_rows)
+
+    # --- Print Summary ---
+    print(f"\n{'='*60}")
+    print(f"BOOTSTRAP MODEL COMPARISON ({n_resamples} resamples, {confidence:.0%} CI)")
+    print(f"{'='*60}")
+    print(f"Reviews evaluated: {len(eval_df)}")
+    for row in metric_rows:
+        print(f"  {row['model']:<20} {row['metric']:<16} "
+              f"{row['estimate']:.3f}  [{row['ci_low']:.3f}, {row['ci_high']:.3f}]")
+    if diff_rows:
+        print(f"\n--- Differences vs {models[0]} ---")
+        for row in diff_rows:
+            significant = '*' if row['ci_low'] > 0 or row['ci_high'] < 0 else ' '
+            print(f"  {row['model']:<20} {row['metric']:<16} "
+                  f"{row['difference']:+.3f}  [{row['ci_low']:+.3f}, {row['ci_high']:+.3f}] {significant}")
+
+    return {
+        'metrics': metrics,
+        'differences': differences,
+        'n_evaluated': len(eval_df),
+    }
@@ -16,21 +16,25 @@ from nltk.sentiment import SentimentIntensityAnalyzer
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import DATA_PATHS
 from src.sentiment_evaluation import evaluate_sentiment
+from src.sentiment_calibration import load_thresholds, assign_labels
 
 
 class SentimentAnalysis:
     """Pipeline for sentiment analysis using NLTK VADER"""
 
-    def __init__(self, input_path=None, output_path=None):
+    def __init__(self, input_path=None, output_path=None, thresholds_path=None):
         """
         Initialize the sentiment analysis pipeline
         
         Args:
             input_path (str): Path to processed reviews CSV
             output_path (str): Path to save final sentiment results
+            thresholds_path (str): Calibrated thresholds JSON (defaults to
+                                   DATA_PATHS['sentiment_thresholds']; ±0.05 if missing)
         """
         self.input_path = input_path or DATA_PATHS['processed_reviews']
         self.output_path = output_path or DATA_PATHS['sentiment_results_vader']
+        self.thresholds = load_thresholds('VADER', thresholds_path)
         self.df = None
         self.sia = None
 
@@ -68,20 +72,15 @@ class SentimentAnalysis:
             # VADER works best on raw text (handles emojis, caps, etc.)
             return self.sia.polarity_scores(str(text))['compound']
 
-        def get_sentiment_label(score):
-            if score >= 0.05:
-                return 'positive'
-            elif score <= -0.05:
-                return 'negative'
-            else:
-                return 'neutral'
-
         # Calculate scores
         print("Calculating sentiment scores...")
         self.df['sentiment_score'] = self.df['review_text'].apply(get_vader_score)
         
-        # Assign labels
-        self.df['sentiment_label'] = self.df['sentiment_score'].apply(get_sentiment_label)
+        # Assign labels (calibrated per-bank thresholds when available)
+        print(f"Thresholds: negative <= {self.thresholds['negative']}, "
+              f"positive >= {self.thresholds['positive']}"
+              f"{' (per-bank overrides loaded)' if self.thresholds['per_bank'] else ''}")
+        self.df['sentiment_label'] = assign_labels(self.df, self.thresholds)
         
         # Print distribution
         print("\nSentiment Distribution:")
@@ -0,0 +1,507 @@
+"""
+Text Preprocessing Engine
+Shared by the rule-based (ThemeAnalyzer) and LDA (ThemeAnalyzerLDA) theme
+analyses and by insight_visualizations (Task 3/4).
+
+- Fast regex tokenizer for text already reduced to [a-zA-Z\\s]
+- Bounded (LRU), persistable token -> lemma cache in front of WordNetLemmatizer
+- Batch API that processes each distinct review text only once
+- PreprocessingStage: tokens, POS tags and lemmas computed once per review
+  and persisted as compact token-id arrays keyed by review_id + text hash;
+  also serves per-review lemma count matrices for frequency aggregates
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from nltk.stem import WordNetLemmatizer
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import DATA_PATHS
+
+# Domain-specific stopwords (bank/app generic terms), used by both analyzers
+DOMAIN_STOP_WORDS = ['app', 'bank', 'mobile', 'banking', 'ethiopia', 'please', 'thank', 'thanks']
+# Conservative set of high-frequency but semantically empty words (LDA only)
+LDA_STOP_WORDS = ['use', 'get', 'one', 'even', 'also', 'would', 'much', 'really', 'still', 'thing']
+
+_NON_ALPHA = re.compile(r'[^a-zA-Z\s]')
+
+# nltk.word_tokenize splits these fused forms (Treebank contractions); the
+# regex tokenizer mirrors it so both paths produce the same tokens
+_TREEBANK_SPLITS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+
+def tokenize(text):
+    """
+    Lowercase, replace non-letters with spaces and split on whitespace.
+    Equivalent to nltk.word_tokenize on this alphabet-only text, without
+    the Punkt/Treebank regex machinery.
+    """
+    tokens = _NON_ALPHA.sub(' ', text.lower()).split()
+    if any(token in _TREEBANK_SPLITS for token in tokens):
+        tokens = [part for token in tokens for part in _TREEBANK_SPLITS.get(token, (token,))]
+    return tokens
+
+
+def filter_tokens(tokens, stop_words, min_length=3):
+    """Drop stopwords and tokens shorter than min_length."""
+    return [w for w in tokens if len(w) >= min_length and w not in stop_words]
+
+
+class LemmaCache:
+    """
+    Memoized (word, POS) -> lemma table in front of a WordNetLemmatizer.
+
+    Review vocabulary is small and very repetitive, so after warm-up almost
+    every lookup is a dict hit. The table is bounded (least recently used
+    entries are evicted first) and can be saved to / loaded from a JSON
+    file so the next run starts warm.
+    """
+
+    def __init__(self, lemmatizer=None, max_size=200_000, path=None):
+        """
+        Args:
+            lemmatizer: WordNetLemmatizer (or compatible) used on cache misses
+            max_size: Maximum number of cached (word, POS) entries
+            path: Optional JSON file to load the table from (ignored if missing)
+        """
+        self.lemmatizer = lemmatizer or WordNetLemmatizer()
+        self.max_size = max_size
+        self._table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load(path)
+
+    def __len__(self):
+        return len(self._table)
+
+    def lemmatize(self, word, pos='n'):
+        """Return the lemma of word for a WordNet POS ('n', 'v', 'a', 'r')."""
+        key = (word, pos)
+        lemma = self._table.get(key)
+        if lemma is not None:
+            self.hits += 1
+            self._table.move_to_end(key)
+            return lemma
+
+        self.misses += 1
+        lemma = self.lemmatizer.lemmatize(word, pos)
+        self._store(key, lemma)
+        return lemma
+
+    def _store(self, key, lemma):
+        """Adds an entry as the most recently used, evicting the least recently used."""
+        self._table[key] = lemma
+        self._table.move_to_end(key)
+        if len(self._table) > self.max_size:
+            self._table.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def save(self, path):
+        """Persist the table as {pos: {word: lemma}} JSON, in LRU order."""
+        by_pos = {}
+        for (word, pos), lemma in self._table.items():
+            by_pos.setdefault(pos, {})[word] = lemma
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'max_size': self.max_size, 'lemmas': by_pos}, f)
+
+    def load(self, path):
+        """Merge a table saved with `save`; returns False if the file is missing or unreadable."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        # Saved entries run from least to most recently used (per POS)
+        for pos, words in data.get('lemmas', {}).items():
+            for word, lemma in words.items():
+                self._store((word, pos), lemma)
+        return True
+
+
+def _tag_chunk(token_lists):
+    """Worker: POS-tag a chunk of token lists with one tagger instance."""
+    from nltk import pos_tag_sents
+    return pos_tag_sents(token_lists)
+
+
+def pos_tag_batch(token_lists, n_jobs=1, chunk_size=5000):
+    """
+    POS-tag many token lists in bulk, optionally across processes.
+
+    Each worker tags whole chunks with nltk.pos_tag_sents, so the perceptron
+    tagger is loaded once per chunk instead of once per review. Sentences
+    are tagged independently, so the output is identical to calling
+    nltk.pos_tag on each list, for any n_jobs.
+
+    Args:
+        token_lists: list of token lists
+        n_jobs: worker processes (1 = in-process, None = all cores)
+        chunk_size: token lists per task
+
+    Returns:
+        list of [(word, tag), ...] lists, same order as token_lists
+    """
+    token_lists = list(token_lists)
+    chunks = [token_lists[i:i + chunk_size] for i in range(0, len(token_lists), chunk_size)]
+    n_jobs = n_jobs or os.cpu_count()
+    if n_jobs == 1 or len(chunks) <= 1:
+        tagged_chunks = [_tag_chunk(chunk) for chunk in chunks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as pool:
+            tagged_chunks = list(pool.map(_tag_chunk, chunks))
+    return [tagged for chunk in tagged_chunks for tagged in chunk]
+
+
+def preprocess_batch(texts, preprocess):
+    """
+    Apply a single-text preprocess function to a batch of texts.
+
+    Identical review texts ("good app", "nice") are common, so each distinct
+    text is processed once and the results are broadcast back.
+    Non-string entries (NaN) map to "".
+
+    Returns:
+        list of processed strings, same length and order as texts
+    """
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    processed = np.array([preprocess(text) for text in uniques] + [""], dtype=object)
+    # factorize marks NaN/None with -1, which indexes the trailing ""
+    return processed[codes].tolist()
+
+
+# ──────────────────────────────────────────────
+# Shared, persisted preprocessing stage
+# ──────────────────────────────────────────────
+
+# POS codes stored per token: 0 = not kept for LDA, 1..4 = WordNet POS below
+WORDNET_POS = ('n', 'v', 'a', 'r')
+
+
+def wordnet_pos(tag):
+    """Map an NLTK (Penn Treebank) POS tag to a WordNet POS letter."""
+    if tag.startswith('J'):
+        return 'a'
+    elif tag.startswith('V'):
+        return 'v'
+    elif tag.startswith('R'):
+        return 'r'
+    else:
+        return 'n'
+
+
+def text_hashes(texts):
+    """Vectorized 64-bit hash of each text (NaN hashes like "")."""
+    series = pd.Series(texts, dtype=object).fillna('').astype(str)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(np.uint64)
+
+
+class PreprocessingStage:
+    """
+    Tokenize, POS-tag and lemmatize every review once, for every consumer.
+
+    Per review it stores the tokens left after the ThemeAnalyzer filter
+    (stopwords, length > 2) as ids into a shared vocabulary, plus one POS
+    code per token: 0 for tokens the LDA filter drops, otherwise the WordNet
+    POS from tagging the LDA token sequence. Lemmas live in a small
+    (vocabulary x POS) table, so both clean_text variants are rebuilt
+    without touching NLTK:
+
+    - 'theme': noun lemmas of all tokens   (== ThemeAnalyzer.preprocess_text)
+    - 'lda':   POS-aware lemmas of LDA tokens (== ThemeAnalyzerLDA.preprocess_text)
+
+    Results are saved to an .npz file keyed by review_id and a text hash;
+    re-running only processes new or edited reviews and merges them in, so
+    runs over different datasets share one stage.
+    """
+
+    def __init__(self, path=None, n_jobs=1):
+        """
+        Args:
+            path: .npz file of the stage (defaults to DATA_PATHS['preprocessed_tokens'])
+            n_jobs: worker processes for POS tagging new reviews (None = all cores)
+        """
+        from nltk.corpus import stopwords
+
+        self.path = path or DATA_PATHS['preprocessed_tokens']
+        self.n_jobs = n_jobs
+        self.lemmatizer = WordNetLemmatizer()
+        self.theme_stop_words = set(stopwords.words('english')) | set(DOMAIN_STOP_WORDS)
+        self.lda_stop_words = self.theme_stop_words | set(LDA_STOP_WORDS)
+        # Cached tokens are only valid for the stopword sets they were built with
+        stop_key = ' '.join(sorted(self.theme_stop_words)) + '|' + ' '.join(sorted(self.lda_stop_words))
+        self.fingerprint = hashlib.md5(stop_key.encode()).hexdigest()
+        self._reset()
+
+    def _reset(self):
+        self.review_ids = np.array([], dtype=str)
+        self.hashes = np.array([], dtype=np.uint64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.token_ids = np.array([], dtype=np.int32)
+        self.pos_codes = np.array([], dtype=np.uint8)
+        self.vocab = []
+        self.lemma_vocab = []
+        self.lemma_table = np.full((0, len(WORDNET_POS)), -1, dtype=np.int32)
+        self._word_index = {}
+        self._lemma_index = {}
+
+    def __len__(self):
+        return len(self.review_ids)
+
+    def _positions(self, ids, hashes):
+        """Stage row of each (id, text hash) pair (last occurrence wins), -1 if not in the stage."""
+        if len(self) == 0:
+            return np.full(len(ids), -1)
+        index = pd.MultiIndex.from_arrays([self.review_ids, self.hashes])
+        last = np.flatnonzero(~index.duplicated(keep='last'))
+        position = index[last].get_indexer(pd.MultiIndex.from_arrays([ids, hashes]))
+        return np.where(position >= 0, last[position], -1)
+
+    # ── Persistence ──────────────────────────────
+
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            review_ids=self.review_ids.astype(str),
+            hashes=self.hashes,
+            offsets=self.offsets,
+            token_ids=self.token_ids,
+            pos_codes=self.pos_codes,
+            vocab=np.array(self.vocab, dtype=str),
+            lemma_vocab=np.array(self.lemma_vocab, dtype=str),
+            lemma_table=self.lemma_table,
+            fingerprint=np.array(self.fingerprint),
+        )
+
+    def load(self, path=None):
+        """Load a saved stage; returns False if missing or built with other stopwords."""
+        path = path or self.path
+        try:
+            data = np.load(path)
+        except (FileNotFoundError, OSError, ValueError):
+            return False
+        with data:
+            if str(data['fingerprint']) != self.fingerprint:
+                return False
+            self.review_ids = data['review_ids']
+            self.hashes = data['hashes']
+            self.offsets = data['offsets']
+            self.token_ids = data['token_ids']
+            self.pos_codes = data['pos_codes']
+            self.vocab = data['vocab'].tolist()
+            self.lemma_vocab = data['lemma_vocab'].tolist()
+            self.lemma_table = data['lemma_table']
+        self._word_index = {w: i for i, w in enumerate(self.vocab)}
+        self._lemma_index = {w: i for i, w in enumerate(self.lemma_vocab)}
+        return True
+
+    # ── Building ─────────────────────────────────
+
+    def _word_id(self, word):
+        word_id = self._word_index.get(word)
+        if word_id is None:
+            word_id = self._word_index[word] = len(self.vocab)
+            self.vocab.append(word)
+        return word_id
+
+    def _lemma_id(self, lemma):
+        lemma_id = self._lemma_index.get(lemma)
+        if lemma_id is None:
+            lemma_id = self._lemma_index[lemma] = len(self.lemma_vocab)
+            self.lemma_vocab.append(lemma)
+        return lemma_id
+
+    def _process(self, texts):
+        """
+        Tokenize and POS-tag new texts.
+        Returns (lengths, token_ids, pos_codes) for the batch.
+        """
+        kept_lists, lda_lists = [], []
+        for text in texts:
+            kept = filter_tokens(tokenize(text), self.theme_stop_words) if isinstance(text, str) else []
+            kept_lists.append(kept)
+            lda_lists.append([w for w in kept if w not in self.lda_stop_words])
+
+        # Tag all LDA sequences in bulk (chunks spread over worker processes)
+        tagged_lists = pos_tag_batch(lda_lists, n_jobs=self.n_jobs)
+
+        lengths, token_ids, pos_codes = [], [], []
+        for kept, tagged in zip(kept_lists, tagged_lists):
+            tags = iter(tagged)
+            lengths.append(len(kept))
+            for word in kept:
+                token_ids.append(self._word_id(word))
+                if word in self.lda_stop_words:
+                    pos_codes.append(0)
+                else:
+                    pos_codes.append(1 + WORDNET_POS.index(wordnet_pos(next(tags)[1])))
+
+        return (np.array(lengths, dtype=np.int64),
+                np.array(token_ids, dtype=np.int32),
+                np.array(pos_codes, dtype=np.uint8))
+
+    def _fill_lemmas(self):
+        """Lemmatize every (word, POS) pair in use that has no lemma yet."""
+        n_vocab = len(self.vocab)
+        if len(self.lemma_table) < n_vocab:
+            grow = np.full((n_vocab - len(self.lemma_table), len(WORDNET_POS)), -1, dtype=np.int32)
+            self.lemma_table = np.vstack([self.lemma_table, grow])
+
+        # Noun lemmas for every token (theme variant) + POS lemmas for LDA tokens
+        cols = np.where(self.pos_codes > 0, self.pos_codes.astype(np.int64) - 1, 0)
+        pairs = np.unique(np.concatenate([
+            np.stack([self.token_ids, np.zeros_like(self.token_ids)], axis=1),
+            np.stack([self.token_ids, cols.astype(np.int32)], axis=1),
+        ]), axis=0) if len(self.token_ids) else np.empty((0, 2), dtype=np.int32)
+
+        missing = pairs[self.lemma_table[pairs[:, 0], pairs[:, 1]] < 0]
+        for word_id, col in missing:
+            lemma = self.lemmatizer.lemmatize(self.vocab[word_id], WORDNET_POS[col])
+            self.lemma_table[word_id, col] = self._lemma_id(lemma)
+
+    def run(self, df, text_col='review_text', id_col='review_id', save=True):
+        """
+        Bring the stage up to date with df, reusing cached reviews.
+
+        Reviews whose (review_id, text hash) is not in the stage are
+        processed and merged in; an edited review replaces its old version,
+        and reviews missing from df are kept.
+
+        Returns:
+            self, so `stage.run(df).attach(df, 'lda')` reads naturally
+        """
+        if len(self) == 0:
+            self.load()
+
+        ids = df[id_col].astype(str).to_numpy()
+        hashes = text_hashes(df[text_col])
+
+        # Distinct (review_id, text hash) pairs not cached yet
+        missing = np.flatnonzero(self._positions(ids, hashes) < 0)
+        new_rows = missing[~pd.MultiIndex.from_arrays([ids[missing], hashes[missing]]).duplicated()]
+
+        print(f"Preprocessing stage: {len(ids) - len(missing):,} cached, {len(new_rows):,} to process")
+        if len(new_rows) == 0:
+            return self
+        new_lengths, new_tokens, new_codes = self._process(df[text_col].to_numpy()[new_rows])
+
+        # Drop the old versions of edited reviews (unless df still holds them)
+        old_lengths = np.diff(self.offsets)
+        in_df = pd.MultiIndex.from_arrays([self.review_ids, self.hashes]).isin(
+            pd.MultiIndex.from_arrays([ids, hashes])) if len(self) else np.zeros(0, dtype=bool)
+        keep = ~np.isin(self.review_ids, ids[new_rows]) | in_df
+        keep_tokens = np.repeat(keep, old_lengths)
+
+        self.review_ids = np.concatenate([self.review_ids[keep], ids[new_rows]]).astype(str)
+        self.hashes = np.concatenate([self.hashes[keep], hashes[new_rows]])
+        self.offsets = np.concatenate([[0], np.cumsum(np.concatenate([old_lengths[keep], new_lengths]))])
+        self.token_ids = np.concatenate([self.token_ids[keep_tokens], new_tokens])
+        self.pos_codes = np.concatenate([self.pos_codes[keep_tokens], new_codes])
+        self._fill_lemmas()
+
+        if save:
+            self.save()
+        return self
+
+    # ── Reading ──────────────────────────────────
+
+    def clean_texts(self, variant='theme', rows=None):
+        """
+        Rebuild clean_text for reviews in the stage.
+
+        Args:
+            variant: 'theme' (ThemeAnalyzer) or 'lda' (ThemeAnalyzerLDA)
+            rows: stage rows to rebuild (default: all, in stage order)
+
+        Returns:
+            list of strings aligned with rows (or self.review_ids)
+        """
+        keep, lemma_ids = self._variant_lemmas(variant)
+        lemma_vocab = np.array(self.lemma_vocab + [''], dtype=object)
+        words = lemma_vocab[lemma_ids].tolist()
+        bounds = np.concatenate([[0], np.cumsum(keep)])[self.offsets]
+        rows = range(len(self)) if rows is None else rows
+        return [' '.join(words[bounds[row]:bounds[row + 1]]) for row in rows]
+
+    def _variant_lemmas(self, variant):
+        """Mask of the tokens a variant keeps and their lemma ids."""
+        if variant == 'theme':
+            keep = np.ones(len(self.token_ids), dtype=bool)
+            cols = np.zeros(len(self.token_ids), dtype=np.int64)
+        elif variant == 'lda':
+            keep = self.pos_codes > 0
+            cols = self.pos_codes.astype(np.int64) - 1
+        else:
+            raise ValueError("variant must be 'theme' or 'lda'")
+        return keep, self.lemma_table[self.token_ids[keep], cols[keep]]
+
+    def term_matrix(self, variant='lda'):
+        """
+        Lemma counts of every review's clean_text, built from the token ids
+        (no text is rebuilt or re-tokenized).
+
+        Returns:
+            sparse (reviews × lemma_vocab) CSR matrix aligned with
+            self.review_ids; column j counts self.lemma_vocab[j]
+        """
+        from scipy.sparse import csr_matrix
+
+        keep, lemma_ids = self._variant_lemmas(variant)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.offsets))[keep]
+        found = lemma_ids >= 0
+        return csr_matrix(
+            (np.ones(found.sum(), dtype=np.int64), (rows[found], lemma_ids[found])),
+            shape=(len(self), len(self.lemma_vocab)),
+        )
+
+    def positions(self, df, text_col='review_text', id_col='review_id'):
+        """
+        Stage row of each of df's reviews; -1 for reviews missing from the
+        stage or whose text changed since it was built.
+        """
+        return self._positions(df[id_col].astype(str).to_numpy(), text_hashes(df[text_col]))
+
+    def attach(self, df, variant='theme', text_col='review_text', id_col='review_id', column='clean_text'):
+        """
+        Load clean_text for df's reviews from the stage without recomputing.
+
+        Reviews missing from the stage, or whose text changed since it was
+        built, get NaN in `column`.
+
+        Returns:
+            copy of df with `column` added
+        """
+        out = df.copy()
+        position = self.positions(out, text_col, id_col)
+        fresh = position >= 0
+
+        cleaned = np.full(len(out), np.nan, dtype=object)
+        cleaned[fresh] = np.array(self.clean_texts(variant, rows=position[fresh]), dtype=object)
+        out[column] = cleaned
+
+        stale = (~fresh).sum()
+        if stale:
+            print(f"  ⚠ {stale:,} reviews not in the preprocessing stage (or edited) — clean_text is NaN")
+        return out
@@ -3,35 +3,165 @@ Theme Analysis Module
 Task 3: Thematic Analysis
 
 This script performs thematic analysis on the reviews.
-- Preprocessing: Lemmatization & Stopword Removal (NLTK)
+- Preprocessing: Lemmatization & Stopword Removal (NLTK, cached lemmas)
 - Keyword Extraction (TF-IDF)
-- Rule-Based Theme Classification
+- Rule-Based Theme Classification (compiled word-boundary keyword matcher)
 """
 import pandas as pd
 import numpy as np
 import sys
 import os
-import re
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import DATA_PATHS
+from src.text_preprocessing import (
+    tokenize, filter_tokens, LemmaCache, preprocess_batch, PreprocessingStage, DOMAIN_STOP_WORDS,
+)
 
 # Download NLTK resources (if not present)
 nltk.download('wordnet', quiet=True)
 nltk.download('stopwords', quiet=True)
 nltk.download('omw-1.4', quiet=True)
 
+class KeywordMatcher:
+    """
+    Compiled keyword matcher for rule-based theme scoring.
+
+    Keywords (single words or phrases) are normalized once and stored in a
+    token-level trie, so a review is scanned in a single left-to-right pass
+    over its tokens and every theme is scored at the same time. Matching is
+    on whole tokens: 'pin' no longer matches inside 'opinion'.
+    """
+
+    _END = object()
+
+    def __init__(self, theme_keywords, normalize=None):
+        """
+        Args:
+            theme_keywords: dict {theme: [keyword or phrase, ...]}
+            normalize: callable keyword -> list of tokens. Should match the
+                       preprocessing applied to the texts being scored;
+                       keywords that normalize to nothing are dropped.
+        """
+        normalize = normalize or (lambda keyword: keyword.lower().split())
+        self.themes = list(theme_keywords)
+        self.keywords = []        # keyword id -> tuple of tokens
+        self.keyword_themes = []  # keyword id -> list of theme indices
+        self._trie = {}
+
+        keyword_ids = {}
+        for theme_idx, keywords in enumerate(theme_keywords.values()):
+            for keyword in keywords:
+                phrase = tuple(normalize(keyword))
+                if not phrase:
+                    continue
+                if phrase not in keyword_ids:
+                    keyword_ids[phrase] = len(self.keywords)
+                    self.keywords.append(phrase)
+                    self.keyword_themes.append([])
+                    node = self._trie
+                    for token in phrase:
+                        node = node.setdefault(token, {})
+                    node[self._END] = keyword_ids[phrase]
+                # The same phrase counts once per theme
+                themes = self.keyword_themes[keyword_ids[phrase]]
+                if theme_idx not in themes:
+                    themes.append(theme_idx)
+
+        self.max_phrase_length = max((len(k) for k in self.keywords), default=1)
+        self._phrase_starts = {k[0] for k in self.keywords if len(k) > 1}
+
+    def match(self, tokens):
+        """Return the set of keyword ids found in a list of tokens."""
+        found = set()
+        trie = self._trie
+        n = len(tokens)
+        for i in range(n):
+            node = trie.get(tokens[i])
+            j = i + 1
+            while node is not None:
+                keyword_id = node.get(self._END)
+                if keyword_id is not None:
+                    found.add(keyword_id)
+                if j == n:
+                    break
+                node = node.get(tokens[j])
+                j += 1
+        return found
+
+    def score(self, text):
+        """Return a list of per-theme scores (distinct keywords matched)."""
+        scores = [0] * len(self.themes)
+        for keyword_id in self.match(str(text).split()):
+            for theme_idx in self.keyword_themes[keyword_id]:
+                scores[theme_idx] += 1
+        return scores
+
+    def indicator_matrix(self):
+        """Sparse (n_keywords x n_themes) matrix with 1 where a keyword belongs to a theme."""
+        rows = [k for k, themes in enumerate(self.keyword_themes) for _ in themes]
+        cols = [t for themes in self.keyword_themes for t in themes]
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(self.keywords), len(self.themes)),
+        )
+
+    def _analyze(self, text):
+        """
+        Tokens of a text plus the n-grams that could be phrase keywords.
+        Only n-grams starting with the first token of a phrase are built,
+        which keeps vectorization close to unigram cost.
+        """
+        tokens = text.split()
+        max_len = self.max_phrase_length
+        if max_len == 1:
+            return tokens
+        starts = self._phrase_starts
+        grams = list(tokens)
+        for i, token in enumerate(tokens):
+            if token in starts:
+                for length in range(2, min(max_len, len(tokens) - i) + 1):
+                    grams.append(' '.join(tokens[i:i + length]))
+        return grams
+
+    def score_matrix(self, texts):
+        """
+        Score a whole batch of space-separated token strings at once.
+
+        Builds a binary document x keyword matrix with a fixed vocabulary
+        (keywords and phrases, tokens split on whitespace) and multiplies it by
+        the keyword x theme indicator matrix. Returns a dense
+        (n_texts x n_themes) int array equal to `score` applied row by row.
+        """
+        vectorizer = CountVectorizer(
+            vocabulary={' '.join(phrase): k for k, phrase in enumerate(self.keywords)},
+            analyzer=self._analyze,
+            binary=True,
+            dtype=np.int32,
+        )
+        dtm = vectorizer.transform(pd.Series(texts, dtype=object).fillna('').astype(str))
+        return (dtm @ self.indicator_matrix()).toarray()
+
+
 class ThemeAnalyzer:
-    def __init__(self):
+    def __init__(self, lemma_cache_path=None):
+        """
+        Args:
+            lemma_cache_path: JSON file for the persisted lemma cache
+                              (defaults to DATA_PATHS['lemma_cache'])
+        """
         self.lemmatizer = WordNetLemmatizer()
+        self.lemma_cache_path = lemma_cache_path or DATA_PATHS['lemma_cache']
+        self.lemma_cache = LemmaCache(self.lemmatizer, path=self.lemma_cache_path)
         self.stop_words = set(stopwords.words('english'))
         # Add domain specific stopwords
-        self.stop_words.update(['app', 'bank', 'mobile', 'banking', 'ethiopia', 'please', 'thank', 'thanks'])
+        self.stop_words.update(DOMAIN_STOP_WORDS)
         
         # Define Rule-Based Themes (Keywords mapped to Themes)
         # We use stems/lemmas here (e.g., 'login' covers 'logins', 'logging')
@@ -69,6 +199,19 @@ class ThemeAnalyzer:
                 'garbage', 'fake', 'scam', 'poor', 'disappointed', 'annoying', 'stupid'
             ]
         }
+        self.compile_keywords()
+
+    def compile_keywords(self):
+        """
+        (Re)build the keyword matcher from self.theme_keywords.
+        Keywords go through preprocess_text so they match the lemmatized text
+        (e.g. 'log in' -> 'log' once the stopword 'in' is removed).
+        Call again after editing theme_keywords.
+        """
+        self.matcher = KeywordMatcher(
+            self.theme_keywords,
+            normalize=lambda keyword: self.preprocess_text(keyword).split(),
+        )
 
     def preprocess_text(self, text):
         """
@@ -81,44 +224,100 @@ class ThemeAnalyzer:
         if not isinstance(text, str):
             return ""
         
-        # 1. Lowercase & Remove special chars
-        #updated the regex  to replace special characters with space
-        text = re.sub(r'[^a-zA-Z\s]', ' ', text.lower())
+        # 1-2. Lowercase, replace special chars with space & tokenize
+        # (regex tokenizer: the text is already reduced to [a-zA-Z\s])
+        tokens = tokenize(text)
         
-        # 2. Tokenize
-        tokens = nltk.word_tokenize(text)
-        
-        # 3. Remove Stopwords & Lemmatize
-        clean_tokens = [
-            self.lemmatizer.lemmatize(word) 
-            for word in tokens 
-            if word.isalpha() and word not in self.stop_words and len(word) > 2
-        ]
-        
-        return " ".join(clean_tokens)
+        # 3-4. Remove Stopwords & Lemmatize (memoized token -> lemma)
+        lemmatize = self.lemma_cache.lemmatize
+        return " ".join(lemmatize(word) for word in filter_tokens(tokens, self.stop_words))
+
+    def preprocess_texts(self, texts):
+        """
+        Batch version of preprocess_text for a list/Series of raw texts.
+        Each distinct text is processed once. Returns a list of strings.
+        """
+        return preprocess_batch(texts, self.preprocess_text)
+
+    def clean_texts(self, df):
+        """
+        clean_text for df's reviews. Reviews already in the shared
+        PreprocessingStage (e.g. from an LDA run) are read from it; the rest
+        go through the lemma cache, which needs no POS tagging.
+        Returns a list of strings aligned with df.
+        """
+        cleaned = np.empty(len(df), dtype=object)
+        cached = np.zeros(len(df), dtype=bool)
+        if 'review_id' in df.columns:
+            stage = PreprocessingStage()
+            if stage.load():
+                position = stage.positions(df)
+                cached = position >= 0
+                cleaned[cached] = np.array(stage.clean_texts('theme', rows=position[cached]), dtype=object)
+            print(f"Preprocessing stage: {cached.sum():,} cached, {(~cached).sum():,} to lemmatize")
+
+        if not cached.all():
+            cleaned[~cached] = np.array(self.preprocess_texts(df['review_text'][~cached]), dtype=object)
+            self.lemma_cache.save(self.lemma_cache_path)
+            print(f"Lemma cache: {len(self.lemma_cache)} entries, hit rate {self.lemma_cache.hit_rate():.1%}")
+        return cleaned.tolist()
 
     def assign_theme(self, text):
         """
         Assigns a theme based on keyword matching count.
-        Returns the theme with the highest overlap.
+        Returns the theme with the highest overlap (first theme wins ties).
         """
-        text = str(text) # Ensure string
-        scores = {theme: 0 for theme in self.theme_keywords}
-        
-        # Simple keyword matching
-        for theme, keywords in self.theme_keywords.items():
-            for keyword in keywords:
-                if keyword in text: # 'text' is already lemmatized
-                    scores[theme] += 1
-        
-        # Find max score
-        max_theme = max(scores, key=scores.get)
-        
+        # One pass over the (already lemmatized) tokens scores every theme
+        scores = self.matcher.score(text)
+        best = max(range(len(scores)), key=scores.__getitem__)
+
         # If no keywords matched (score 0), return Unclassified
-        if scores[max_theme] == 0:
+        if scores[best] == 0:
             return "General/Unclassified"
-        
-        return max_theme
+
+        return self.matcher.themes[best]
+
+    def assign_themes(self, texts, min_score=1):
+        """
+        Batch version of assign_theme for a whole column of clean text.
+
+        Scores every review against every theme with one sparse matrix
+        product, then derives the top theme (same result as assign_theme)
+        and multi-label assignments.
+
+        Args:
+            texts: iterable of lemmatized texts (e.g. df['clean_text'])
+            min_score: minimum keyword matches for a theme to be in theme_labels
+
+        Returns:
+            DataFrame (aligned with texts if it is a Series) with one score
+            column per theme, 'identified_theme' and 'theme_labels'
+            ('; '-separated, best theme first)
+        """
+        index = texts.index if isinstance(texts, pd.Series) else None
+        scores = self.matcher.score_matrix(texts)
+        themes = np.array(self.matcher.themes, dtype=object)
+
+        best = scores.argmax(axis=1)
+        has_match = scores[np.arange(len(scores)), best] > 0
+        identified = np.where(has_match, themes[best], "General/Unclassified")
+
+        # Multi-label: qualifying themes ordered by score (stable on ties)
+        order = np.argsort(-scores, axis=1, kind='stable')
+        qualifies = np.take_along_axis(scores, order, axis=1) >= max(min_score, 1)
+        # Few distinct label combinations exist, so join strings once per combination
+        ranked = np.where(qualifies, order, -1)
+        combos, inverse = np.unique(ranked, axis=0, return_inverse=True)
+        combo_labels = np.array([
+            '; '.join(themes[combo[combo >= 0]]) or "General/Unclassified"
+            for combo in combos
+        ], dtype=object)
+        labels = combo_labels[inverse.ravel()]
+
+        result = pd.DataFrame(scores, columns=self.matcher.themes, index=index)
+        result['identified_theme'] = identified
+        result['theme_labels'] = labels
+        return result
 
     def run_analysis(self):
         print("Loading data...")
@@ -131,7 +330,7 @@ class ThemeAnalyzer:
 
         print(f"Preprocessing {len(df)} reviews (Lemmatization)...")
         # Create a temporary column for clean text to use in analysis
-        df['clean_text'] = df['review_text'].apply(self.preprocess_text)
+        df['clean_text'] = self.clean_texts(df)
         
         print("Extracting Keywords (TF-IDF) for validation...")
         # We run TF-IDF just to print top words to console (sanity check)
@@ -142,8 +341,10 @@ class ThemeAnalyzer:
         except ValueError:
             print("Not enough text data for TF-IDF.")
 
-        print("Assigning Themes...")
-        df['identified_theme'] = df['clean_text'].apply(self.assign_theme)
+        print("Assigning Themes (batch keyword scoring)...")
+        themes = self.assign_themes(df['clean_text'])
+        df['identified_theme'] = themes['identified_theme']
+        df['theme_labels'] = themes['theme_labels']
         
         # Drop the temporary clean_text column if you don't want to save it
         df.drop(columns=['clean_text'], inplace=True)
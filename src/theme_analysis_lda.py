@@ -4,28 +4,52 @@ Task 3: Thematic Analysis using Latent Dirichlet Allocation (LDA)
 
 Runs LDA separately for each bank to extract bank-specific topics.
 - Preprocessing: Lemmatization & Stopword Removal
-- Vectorization: CountVectorizer (unigrams + bigrams)
-- Topic Modeling: LDA (scikit-learn), one model per bank
-- Coherence Scoring: gensim CoherenceModel (c_v) for n_topics tuning
+- Vectorization: CountVectorizer (unigrams + bigrams), or feature hashing
+  with a top-term sketch for a memory-bounded DTM
+- Topic Modeling: LDA (scikit-learn), one model per bank, optionally over a
+  shared corpus vocabulary plus one global model for cross-bank comparison;
+  NMF on TF-IDF and MiniBatchKMeans are pluggable alternatives (TopicEngine)
+- Coherence Scoring: c_v (gensim-equivalent, shared co-occurrence structure) for n_topics tuning
+- Hyperparameter Search: successive halving over LDA + vectorizer settings
+- Incremental Mode: persisted per-bank models updated with partial_fit,
+  refitted on demand or when drift is detected (topic ids kept stable)
+- Theme Mapping: topics mapped to ThemeAnalyzer themes by cosine similarity
+  of their top terms to the theme keywords (fallback 'Other')
 """
 import pandas as pd
 import numpy as np
 import sys
 import os
 import re
+import math
+import time
+import hashlib
+import numbers
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 import nltk
-from nltk.corpus import stopwords, wordnet
+from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk import pos_tag
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-from gensim.corpora import Dictionary
-from gensim.models import CoherenceModel
-from tqdm import tqdm
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.utils import murmurhash3_32
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.decomposition import LatentDirichletAllocation, NMF
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.model_selection import ParameterSampler
+from threadpoolctl import threadpool_limits
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment
+from datetime import datetime
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import DATA_PATHS
+from src.topic_inference import TopicModelRegistry, TopicInference
+from src.text_preprocessing import (
+    PreprocessingStage, LemmaCache, wordnet_pos, tokenize, filter_tokens, pos_tag_batch,
+    preprocess_batch, text_hashes, DOMAIN_STOP_WORDS, LDA_STOP_WORDS,
+)
 
 # Download NLTK resources
 nltk.download('wordnet', quiet=True)
@@ -33,27 +57,551 @@ nltk.download('stopwords', quiet=True)
 nltk.download('omw-1.4', quiet=True)
 nltk.download('averaged_perceptron_tagger_eng', quiet=True)
 
+# Successive-halving search space. min_df / max_df / ngram_range configure the
+# per-bank CountVectorizer; the remaining keys go to LatentDirichletAllocation.
+SEARCH_SPACE = {
+    'n_topics': list(range(2, 11)),
+    'learning_decay': [0.5, 0.7, 0.9],
+    'doc_topic_prior': [None, 0.1, 0.5],
+    'topic_word_prior': [None, 0.01, 0.1],
+    'min_df': [2, 5],
+    'max_df': [0.95],
+    'ngram_range': [(1, 1), (1, 2)],
+}
+VECTORIZER_PARAMS = ('min_df', 'max_df', 'ngram_range')
+
+# Incremental mode: a batch of new reviews counts as drift (and triggers a
+# full refit) if its perplexity exceeds the held-out perplexity measured at
+# fit time by this factor, or its vocabulary coverage falls below this share
+# of the held-out coverage. Smaller batches are too noisy to judge and are
+# always absorbed.
+DRIFT_PERPLEXITY_RATIO = 1.5
+DRIFT_COVERAGE_RATIO = 0.85
+DRIFT_MIN_REVIEWS = 50
+DRIFT_HOLDOUT = 0.1
+
+# Theme assigned to topics whose top terms match no theme closely enough
+FALLBACK_THEME = 'Other'
+
+# Document-term matrices kept for reuse per bank (least recently used
+# vectorizer settings dropped first). A bank's DTMs cover only its own
+# reviews, so the cache holds about DTM_CACHE_SIZE corpus-sized DTMs
+DTM_CACHE_SIZE = 2
+
+
+def _split_params(params):
+    """Splits a search configuration into (n_topics, vectorizer_params, lda_params)."""
+    params = dict(params or {})
+    n_topics = params.pop('n_topics', None)
+    vectorizer_params = {k: params.pop(k) for k in VECTORIZER_PARAMS if k in params}
+    return n_topics, vectorizer_params, params
+
+
+class TopicEngine(ABC):
+    """
+    Interface of the pluggable topic backends (ThemeAnalyzerLDA(engine=...)).
+
+    An engine is built with n_topics, n_jobs and engine-specific keyword
+    parameters (those of its scikit-learn estimator, see accepted_params),
+    is fitted on a bank's count DTM and exposes:
+        fit(dtm) -> self
+        transform(dtm) -> (n_docs, n_topics) topic weights, rows summing to 1
+        components_ -> (n_topics, n_terms) term weights, for top words
+        n_components -> number of topics
+        reorder_topics(order) -> self, topics permuted (stable topic ids)
+    so every engine yields the same topic_id / topic_confidence /
+    identified_topic columns. Incremental updates, drift detection and
+    successive halving rely on LDA's partial_fit / perplexity and are
+    LDA-only.
+    """
+
+    # scikit-learn estimator wrapped by the engine, and the estimator
+    # parameters the engine sets itself
+    estimator = None
+    managed_params = ()
+
+    def __init__(self, n_topics, n_jobs=-1, random_state=42):
+        self.n_topics = n_topics
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    @classmethod
+    def accepted_params(cls):
+        """Engine-specific keyword parameters (estimator parameters not managed by the engine)."""
+        return sorted(set(cls.estimator().get_params()) - set(cls.managed_params))
+
+    @property
+    def n_components(self):
+        return self.n_topics
+
+    @abstractmethod
+    def fit(self, dtm):
+        """Fits the engine on a count DTM; returns self."""
+
+    @abstractmethod
+    def transform(self, dtm):
+        """(n_docs, n_topics) topic weights of a count DTM, rows summing to 1."""
+
+    @abstractmethod
+    def reorder_topics(self, order):
+        """Permutes the fitted topics (topic k becomes old topic order[k]); returns self."""
+
+    def _threads(self):
+        """Limits BLAS / OpenMP threads to n_jobs (None or -1 = no limit)."""
+        return threadpool_limits(limits=self.n_jobs if self.n_jobs and self.n_jobs > 0 else None)
+
+    @staticmethod
+    def _normalize_rows(weights):
+        """Rows scaled to sum to 1; rows without any weight become uniform."""
+        totals = weights.sum(axis=1, keepdims=True)
+        return np.divide(weights, totals, out=np.full_like(weights, 1 / weights.shape[1]),
+                         where=totals > 0)
+
+
+class LDATopicEngine(TopicEngine):
+    """
+    The project's online LDA configuration. Topic weights are LDA's
+    document-topic distributions; components_ are its topic-word weights.
+    Also exposes the LDA-only partial_fit, perplexity and total_samples
+    used by incremental mode and drift detection.
+    """
+
+    estimator = LatentDirichletAllocation
+    managed_params = ('n_components', 'learning_method', 'n_jobs')
+
+    def __init__(self, n_topics, n_jobs=-1, random_state=42, max_iter=10, **lda_params):
+        super().__init__(n_topics, n_jobs, random_state)
+        self.lda = LatentDirichletAllocation(n_components=n_topics, max_iter=max_iter, learning_method='online',
+                                             random_state=random_state, n_jobs=n_jobs, **lda_params)
+
+    @property
+    def components_(self):
+        return self.lda.components_
+
+    @property
+    def total_samples(self):
+        return self.lda.total_samples
+
+    @total_samples.setter
+    def total_samples(self, value):
+        self.lda.total_samples = value
+
+    def fit(self, dtm):
+        self.lda.fit(dtm)
+        return self
+
+    def partial_fit(self, dtm):
+        self.lda.partial_fit(dtm)
+        return self
+
+    def transform(self, dtm):
+        return self.lda.transform(dtm)
+
+    def perplexity(self, dtm):
+        return self.lda.perplexity(dtm)
+
+    def reorder_topics(self, order):
+        self.lda.components_ = self.lda.components_[order]
+        self.lda.exp_dirichlet_component_ = self.lda.exp_dirichlet_component_[order]
+        return self
+
+
+class NMFTopicEngine(TopicEngine):
+    """
+    NMF on sublinear TF-IDF. Topic weights are the rows of W normalized to
+    sum to 1; components_ is H.
+    """
+
+    estimator = NMF
+    managed_params = ('n_components',)
+
+    def __init__(self, n_topics, n_jobs=-1, random_state=42, max_iter=400, init='nndsvda', **nmf_params):
+        super().__init__(n_topics, n_jobs, random_state)
+        self.tfidf = TfidfTransformer(sublinear_tf=True)
+        self.nmf = NMF(n_components=n_topics, init=init, max_iter=max_iter,
+                       random_state=random_state, **nmf_params)
+
+    def fit(self, dtm):
+        with self._threads():
+            self.nmf.fit(self.tfidf.fit_transform(dtm))
+        self.components_ = self.nmf.components_
+        return self
+
+    def transform(self, dtm):
+        with self._threads():
+            return self._normalize_rows(self.nmf.transform(self.tfidf.transform(dtm)))
+
+    def reorder_topics(self, order):
+        self.nmf.components_ = self.components_ = self.nmf.components_[order]
+        return self
+
+
+class KMeansTopicEngine(TopicEngine):
+    """
+    MiniBatchKMeans on L2-normalized TF-IDF: one cluster per topic.
+    components_ are the centroids. Topic weights are soft assignments
+    softmax(-d^2 / 2s), with s the mean squared distance of the training
+    reviews to their centroid, so the dominant topic is the nearest centroid.
+    """
+
+    estimator = MiniBatchKMeans
+    managed_params = ('n_clusters',)
+
+    def __init__(self, n_topics, n_jobs=-1, random_state=42, batch_size=2048, n_init=3, **kmeans_params):
+        super().__init__(n_topics, n_jobs, random_state)
+        self.tfidf = TfidfTransformer(sublinear_tf=True)
+        self.kmeans = MiniBatchKMeans(n_clusters=n_topics, batch_size=batch_size, n_init=n_init,
+                                      random_state=random_state, **kmeans_params)
+
+    def fit(self, dtm):
+        tfidf = self.tfidf.fit_transform(dtm)
+        with self._threads():
+            self.kmeans.fit(tfidf)
+            self.scale_ = max(float(np.mean(self.kmeans.transform(tfidf).min(axis=1) ** 2)), 1e-12)
+        self.components_ = self.kmeans.cluster_centers_
+        return self
+
+    def transform(self, dtm):
+        with self._threads():
+            sq_distances = self.kmeans.transform(self.tfidf.transform(dtm)) ** 2
+        # Shift by the row minimum before exponentiating for numerical stability
+        logits = -(sq_distances - sq_distances.min(axis=1, keepdims=True)) / (2 * self.scale_)
+        return self._normalize_rows(np.exp(logits))
+
+    def reorder_topics(self, order):
+        self.kmeans.cluster_centers_ = self.components_ = self.kmeans.cluster_centers_[order]
+        return self
+
+
+ENGINES = {
+    'lda': LDATopicEngine,
+    'nmf': NMFTopicEngine,
+    'kmeans': KMeansTopicEngine,
+}
+
+
+def make_engine(engine, n_topics, n_jobs=-1, **params):
+    """
+    Builds an unfitted TopicEngine, rejecting parameters the engine does not
+    take (e.g. LDA's learning_decay with engine='nmf').
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {list(ENGINES)}")
+    accepted = ENGINES[engine].accepted_params()
+    unknown = sorted(set(params) - set(accepted))
+    if unknown:
+        raise ValueError(f"engine '{engine}' does not accept parameter(s) {unknown}; "
+                         f"accepted: {accepted}")
+    return ENGINES[engine](n_topics, n_jobs=n_jobs, **params)
+
+
+def _fit_lda(dtm, n_topics, n_jobs=-1, max_iter=10, **lda_params):
+    """Fits the project's LDA configuration on a document-term matrix."""
+    return make_engine('lda', n_topics, n_jobs=n_jobs, max_iter=max_iter, **lda_params).fit(dtm)
+
+
+def _fit_topic_model(dtm, n_topics, engine='lda', n_jobs=-1, **params):
+    """Fits the chosen TopicEngine on a document-term matrix."""
+    return make_engine(engine, n_topics, n_jobs=n_jobs, **params).fit(dtm)
+
+
+def _top_words(model, feature_names, n_words=10):
+    """Top n_words feature names per topic, as a list of lists."""
+    return [
+        [feature_names[i] for i in topic.argsort()[:-n_words - 1:-1]]
+        for topic in model.components_
+    ]
+
+
+class CoherenceScorer:
+    """
+    c_v topic coherence computed from a co-occurrence structure built once.
+
+    Reproduces gensim's CoherenceModel(coherence='c_v'): boolean sliding
+    windows of 110 tokens, NPMI between top words, indirect cosine
+    similarity with one-set segmentation, averaged over topics. The
+    (window x token) occurrence matrix is built once per corpus, so scoring
+    a candidate model only needs the co-occurrence counts of its top words.
+    Top words that are not single tokens (e.g. bigrams) are ignored, as in
+    gensim.
+    """
+
+    EPSILON = 1e-12
+
+    def __init__(self, tokenized_texts, window_size=110):
+        self.token2id = {}
+        rows, cols = [], []
+        n_windows = 0
+        for tokens in tokenized_texts:
+            ids = [self.token2id.setdefault(token, len(self.token2id)) for token in tokens]
+            # Short documents form a single window; longer ones slide by one token.
+            # Like gensim, sliding drops the token leaving the window from the
+            # word set even if it also occurs elsewhere in the window.
+            window = set(ids[:window_size])
+            for start in range(max(1, len(ids) - window_size + 1)):
+                if start:
+                    window.discard(ids[start - 1])
+                    window.add(ids[start + window_size - 1])
+                rows.extend([n_windows] * len(window))
+                cols.extend(window)
+                n_windows += 1
+
+        self.n_windows = n_windows
+        self.windows = sparse.csc_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(n_windows, len(self.token2id)),
+        )
+
+    def topic_coherence(self, words):
+        """c_v coherence of a single topic (list of top words); NaN if no word is known."""
+        ids = [self.token2id[w] for w in words if w in self.token2id]
+        if not ids:
+            return np.nan
+
+        occurrences = self.windows[:, ids]
+        p = (occurrences.T @ occurrences).toarray() / self.n_windows
+        p_word = np.diag(p)
+
+        # Normalized log ratio (NPMI) between every pair of top words
+        with np.errstate(divide='ignore', invalid='ignore'):
+            npmi = np.log((p + self.EPSILON) / np.outer(p_word, p_word)) / -np.log(p + self.EPSILON)
+
+        # Context vector of each word vs. the whole top-word set (sum of vectors)
+        set_vector = npmi.sum(axis=0)
+        sims = npmi @ set_vector / (np.linalg.norm(npmi, axis=1) * np.linalg.norm(set_vector))
+        return sims.mean()
+
+    def score(self, topics_words):
+        """Mean c_v coherence over topics (list of lists of top words)."""
+        return float(np.nanmean([self.topic_coherence(words) for words in topics_words]))
+
+
+# Per-process data for parallel topic-count tuning: {bank: (dtm, feature_names, scorer)}
+_TUNING_DATA = {}
+
+
+def _init_tuning_worker(bank_data):
+    global _TUNING_DATA
+    _TUNING_DATA = bank_data
+
+
+def _score_topic_count(bank, n_topics, engine='lda'):
+    """Worker: fit one candidate topic model for a bank and return its c_v coherence."""
+    dtm, feature_names, scorer = _TUNING_DATA[bank]
+    # Parallelism is across candidates, so each fit runs single-threaded
+    model = _fit_topic_model(dtm, n_topics, engine, n_jobs=1)
+    return scorer.score(_top_words(model, feature_names))
+
+
+def _advance_candidate(key, model, n_passes):
+    """
+    Worker: train a search candidate for n_passes more epochs and score it.
+
+    Each partial_fit call is one online pass over the bank's DTM, so
+    k passes reproduce fit(max_iter=k) exactly and survivors of a rung
+    resume training instead of starting over.
+    Returns (model, coherence, perplexity).
+    """
+    dtm, feature_names, scorer = _TUNING_DATA[key]
+    for _ in range(n_passes):
+        model.partial_fit(dtm)
+    coherence = scorer.score(_top_words(model, feature_names))
+    return model, coherence, model.perplexity(dtm)
+
+
+class HashedTermVectorizer:
+    """
+    Memory-bounded drop-in for the CountVectorizer used by the LDA pipeline.
+
+    Terms (unigrams + bigrams) are hashed into n_features buckets with
+    HashingVectorizer, so no vocabulary dict grows with the corpus.
+    min_df / max_df are applied per bucket and only surviving buckets
+    become DTM columns. A streaming majority vote per bucket (Boyer-Moore)
+    remembers the bucket's dominant term, which labels its column in
+    get_feature_names_out for topic display. Memory is O(n_features);
+    colliding terms share a column and its label.
+    """
+
+    def __init__(self, n_features=2 ** 18, max_df=0.95, min_df=2, stop_words=None, ngram_range=(1, 2)):
+        self.n_features = n_features
+        self.max_df = max_df
+        self.min_df = min_df
+        self.ngram_range = ngram_range
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            stop_words=stop_words,
+            ngram_range=ngram_range,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.int64,
+        )
+
+    def _bucket(self, term):
+        """Column index HashingVectorizer assigns to term."""
+        h = murmurhash3_32(term, positive=False)
+        if h == -2 ** 31:
+            return (2 ** 31 - 1 - (self.n_features - 1)) % self.n_features
+        return abs(h) % self.n_features
+
+    def fit_transform(self, texts):
+        texts = list(texts)
+        counts = self.hasher.transform(texts)
+
+        # Document frequency per bucket (CSR rows hold each bucket at most once)
+        doc_freq = np.bincount(counts.indices, minlength=self.n_features)
+        # Integer thresholds are document counts, floats proportions (as in CountVectorizer)
+        n_docs = len(texts)
+        max_doc_count = self.max_df if isinstance(self.max_df, numbers.Integral) else self.max_df * n_docs
+        min_doc_count = self.min_df if isinstance(self.min_df, numbers.Integral) else self.min_df * n_docs
+        keep = (doc_freq >= min_doc_count) & (doc_freq <= max_doc_count)
+        if not keep.any():
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+        self.columns_ = np.flatnonzero(keep)
+
+        # Majority term per kept bucket
+        candidates, votes = {}, {}
+        analyzer = self.hasher.build_analyzer()
+        for text in texts:
+            for term in analyzer(text):
+                bucket = self._bucket(term)
+                if not keep[bucket]:
+                    continue
+                if candidates.get(bucket) == term:
+                    votes[bucket] += 1
+                elif not votes.get(bucket):
+                    candidates[bucket] = term
+                    votes[bucket] = 1
+                else:
+                    votes[bucket] -= 1
+        self.feature_names_ = np.array([candidates[b] for b in self.columns_], dtype=object)
+        self.vocabulary_ = {name: i for i, name in enumerate(self.feature_names_)}
+        return counts[:, self.columns_]
+
+    def fit(self, texts):
+        self.fit_transform(texts)
+        return self
+
+    def transform(self, texts):
+        return self.hasher.transform(texts)[:, self.columns_]
+
+    def get_feature_names_out(self):
+        return self.feature_names_
+
+
+def _texts_fingerprint(texts):
+    """Content fingerprint of a sequence of texts (order-sensitive)."""
+    return hashlib.md5(text_hashes(texts).tobytes()).hexdigest()
+
+
+def _row_block(matrix, start, stop):
+    """
+    Rows start:stop of a CSR matrix as a view sharing its data and indices
+    (scipy's row slicing copies them).
+    """
+    lo, hi = matrix.indptr[start], matrix.indptr[stop]
+    block = sparse.csr_matrix((stop - start, matrix.shape[1]), dtype=matrix.dtype)
+    block.data = matrix.data[lo:hi]
+    block.indices = matrix.indices[lo:hi]
+    block.indptr = (matrix.indptr[start:stop + 1] - lo).astype(matrix.indptr.dtype)
+    return block
+
+
+def _vocabulary_coverage(vectorizer, dtm, texts):
+    """Share of the texts' tokens that are unigram features of the vectorizer."""
+    unigrams = np.array([' ' not in f for f in vectorizer.get_feature_names_out()])
+    known = dtm[:, unigrams].sum()
+    total = sum(len(text.split()) for text in texts)
+    return float(known / total) if total else 1.0
+
+
+def _align_topics(old_vectorizer, old_model, vectorizer, model):
+    """
+    Reorders a refitted model's topics in place so each keeps the id of the
+    most similar topic of the previous model.
+
+    Topic-word distributions are compared by cosine similarity over the two
+    vocabularies' shared features and matched one-to-one (Hungarian
+    algorithm); a new topic takes the id of its matched old topic. Topics
+    without a counterpart (more topics than before), or whose match has an
+    id the smaller model does not have (fewer topics), take the remaining
+    ids in ascending order.
+    """
+    old_vocab = old_vectorizer.vocabulary_
+    shared = [f for f in vectorizer.get_feature_names_out() if f in old_vocab]
+    if not shared:
+        return model
+    new_cols = [vectorizer.vocabulary_[f] for f in shared]
+    old_cols = [old_vocab[f] for f in shared]
+
+    def normalized(components, cols):
+        dist = components / components.sum(axis=1, keepdims=True)
+        dist = dist[:, cols]
+        return dist / np.maximum(np.linalg.norm(dist, axis=1, keepdims=True), 1e-12)
+
+    similarity = normalized(old_model.components_, old_cols) @ normalized(model.components_, new_cols).T
+    old_ids, new_ids = linear_sum_assignment(similarity, maximize=True)
+
+    # order[topic_id] = refitted topic that takes the id
+    n_topics = model.n_components
+    order = np.full(n_topics, -1)
+    leftover = []
+    for old_id, new_topic in sorted(zip(old_ids, new_ids)):
+        if old_id < n_topics:
+            order[old_id] = new_topic
+        else:
+            leftover.append(new_topic)
+    leftover += [k for k in range(n_topics) if k not in set(new_ids)]
+    order[order < 0] = leftover
+    return model.reorder_topics(order)
+
+
 class ThemeAnalyzerLDA:
-    def __init__(self, n_topics=5):
+    def __init__(self, n_topics=5, n_jobs=1, model_dir=None, hashing=False, n_features=2 ** 18,
+                 engine='lda'):
+        """
+        Args:
+            n_topics: Default number of topics per bank
+            n_jobs: Worker processes for parallel stages (None = all cores)
+            model_dir: Root of the versioned per-bank model registry
+                       (defaults to DATA_PATHS['lda_models'])
+            hashing: Vectorize with HashedTermVectorizer (memory bounded by
+                     n_features) instead of a CountVectorizer vocabulary
+            n_features: Hash buckets for hashing mode
+            engine: Topic backend, one of ENGINES ('lda', 'nmf', 'kmeans')
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {list(ENGINES)}")
         self.n_topics = n_topics
+        self.engine = engine
+        self.n_jobs = n_jobs
+        self.hashing = hashing
+        self.n_features = n_features
+        self.registry = TopicModelRegistry(model_dir)
+        self._models = {}
+        # bank -> {(vectorizer settings, texts fingerprint) -> (vectorizer, dtm)}, LRU order
+        self._dtm_cache = {}
+        self._stop_list = None
+        self._theme_analyzer = None
+        self._topic_matcher = None
         self.lemmatizer = WordNetLemmatizer()
+        self.lemma_cache = LemmaCache(self.lemmatizer)
         self.stop_words = set(stopwords.words('english'))
         # Domain-specific stopwords (bank/app generic terms)
-        self.stop_words.update(['app', 'bank', 'mobile', 'banking', 'ethiopia', 'please', 'thank', 'thanks'])
+        self.stop_words.update(DOMAIN_STOP_WORDS)
         # Conservative set of high-frequency but semantically empty words
-        self.stop_words.update(['use', 'get', 'one', 'even', 'also', 'would', 'much', 'really', 'still', 'thing'])
+        self.stop_words.update(LDA_STOP_WORDS)
+
+    @property
+    def stop_list(self):
+        """Sorted stop word list passed to the vectorizers, built once."""
+        if self._stop_list is None:
+            self._stop_list = sorted(self.stop_words)
+        return self._stop_list
 
     @staticmethod
     def _get_wordnet_pos(tag):
         """Map NLTK POS tag to WordNet POS for accurate lemmatization."""
-        if tag.startswith('J'):
-            return wordnet.ADJ
-        elif tag.startswith('V'):
-            return wordnet.VERB
-        elif tag.startswith('R'):
-            return wordnet.ADV
-        else:
-            return wordnet.NOUN
+        return wordnet_pos(tag)
 
     def preprocess_text(self, text):
         """
@@ -82,29 +630,110 @@ class ThemeAnalyzerLDA:
 
         return " ".join(clean_tokens)
 
-    def _fit_lda_for_bank(self, bank_texts, n_topics=None):
+    def preprocess_texts(self, texts, n_jobs=None, chunk_size=5000):
         """
-        Fits a CountVectorizer + LDA model on a single bank's texts.
-        Returns (vectorizer, lda_model, dtm).
-        """
-        n = n_topics or self.n_topics
+        Batch version of preprocess_text with identical output.
+
+        Distinct texts are tokenized and filtered once, POS-tagged in bulk
+        (chunks of sentences per worker process) and lemmatized through a
+        (word, POS) -> lemma cache.
+
+        Args:
+            texts: list/Series of raw review texts
+            n_jobs: worker processes for tagging (defaults to self.n_jobs)
+            chunk_size: sentences per tagging task
 
-        vectorizer = CountVectorizer(
-            max_df=0.95,
-            min_df=2,
-            stop_words=list(self.stop_words),
-            ngram_range=(1, 2)
+        Returns:
+            list of clean strings, same order as texts
+        """
+        unique_texts = pd.unique(pd.Series(texts, dtype=object).dropna())
+        filtered = {
+            text: filter_tokens(tokenize(text), self.stop_words)
+            for text in unique_texts if isinstance(text, str)
+        }
+        tagged = pos_tag_batch(
+            filtered.values(),
+            n_jobs=self.n_jobs if n_jobs is None else n_jobs,
+            chunk_size=chunk_size,
         )
+
+        lemmatize = self.lemma_cache.lemmatize
+        cleaned = {
+            text: " ".join(lemmatize(word, wordnet_pos(tag)) for word, tag in tagged_tokens)
+            for text, tagged_tokens in zip(filtered, tagged)
+        }
+        return preprocess_batch(texts, lambda text: cleaned.get(text, ""))
+
+    def _dtm_key(self, bank_texts, max_df=0.95, min_df=2, ngram_range=(1, 2)):
+        """Cache key of a DTM: vectorizer settings plus a fingerprint of the texts."""
+        return (self.hashing, self.n_features if self.hashing else None,
+                max_df, min_df, tuple(ngram_range), _texts_fingerprint(bank_texts))
+
+    def _cache_dtm(self, bank, key, vectorizer, dtm):
+        """Keeps (vectorizer, dtm) for reuse, dropping the bank's least recently used entries."""
+        bank_cache = self._dtm_cache.setdefault(bank, OrderedDict())
+        bank_cache[key] = (vectorizer, dtm)
+        bank_cache.move_to_end(key)
+        while len(bank_cache) > DTM_CACHE_SIZE:
+            bank_cache.popitem(last=False)
+
+    def _vectorize(self, bank_texts, max_df=0.95, min_df=2, ngram_range=(1, 2), cache=True, bank=None):
+        """
+        Fits the vectorizer (CountVectorizer, or HashedTermVectorizer in
+        hashing mode) on a single bank's texts.
+
+        With cache=True the result is kept per bank and (settings, texts), so
+        topic tuning, hyperparameter search and the final fit share one DTM;
+        the DTM_CACHE_SIZE most recently used settings are kept per bank.
+        Returns (vectorizer, dtm).
+        """
+        if cache:
+            key = self._dtm_key(bank_texts, max_df, min_df, ngram_range)
+            bank_cache = self._dtm_cache.get(bank, {})
+            if key in bank_cache:
+                bank_cache.move_to_end(key)
+                return bank_cache[key]
+
+        if self.hashing:
+            vectorizer = HashedTermVectorizer(
+                n_features=self.n_features,
+                max_df=max_df,
+                min_df=min_df,
+                stop_words=self.stop_list,
+                ngram_range=ngram_range
+            )
+        else:
+            vectorizer = CountVectorizer(
+                max_df=max_df,
+                min_df=min_df,
+                stop_words=self.stop_list,
+                ngram_range=ngram_range
+            )
         dtm = vectorizer.fit_transform(bank_texts)
 
-        lda_model = LatentDirichletAllocation(
-            n_components=n,
-            max_iter=10,
-            learning_method='online',
-            random_state=42,
-            n_jobs=-1
-        )
-        lda_model.fit(dtm)
+        if cache:
+            self._cache_dtm(bank, key, vectorizer, dtm)
+        return vectorizer, dtm
+
+    def clear_dtm_cache(self):
+        """Drops the document-term matrices kept for reuse."""
+        self._dtm_cache.clear()
+
+    def _fit_lda_for_bank(self, bank_texts, n_topics=None, vectorizer=None, dtm=None, params=None,
+                          cache=True, bank=None):
+        """
+        Fits a CountVectorizer + LDA model on a single bank's texts.
+        Pass a precomputed (vectorizer, dtm) to skip vectorization, and a
+        configuration from search_hyperparameters as params to override the
+        default vectorizer/LDA settings. bank selects the DTM cache entry.
+        Returns (vectorizer, lda_model, dtm).
+        """
+        params_n_topics, vectorizer_params, lda_params = _split_params(params)
+        n = n_topics or params_n_topics or self.n_topics
+        if dtm is None:
+            vectorizer, dtm = self._vectorize(bank_texts, cache=cache, bank=bank, **vectorizer_params)
+
+        lda_model = _fit_topic_model(dtm, n, self.engine, **lda_params)
 
         return vectorizer, lda_model, dtm
 
@@ -115,54 +744,505 @@ class ThemeAnalyzerLDA:
         Returns the coherence score (float).
         """
         vectorizer, lda_model, dtm = self._fit_lda_for_bank(bank_texts, n_topics)
+        scorer = CoherenceScorer(text.split() for text in bank_texts)
+        return scorer.score(_top_words(lda_model, vectorizer.get_feature_names_out()))
 
-        # Extract top 10 words per topic as a list of lists (gensim format)
-        feature_names = vectorizer.get_feature_names_out()
-        topics_words = []
-        for topic in lda_model.components_:
-            top_indices = topic.argsort()[:-11:-1]
-            topics_words.append([feature_names[i] for i in top_indices])
-
-        # Build gensim Dictionary and corpus from the tokenized texts
-        tokenized = [text.split() for text in bank_texts]
-        dictionary = Dictionary(tokenized)
-
-        # Compute c_v coherence
-        coherence_model = CoherenceModel(
-            topics=topics_words,
-            texts=tokenized,
-            dictionary=dictionary,
-            coherence='c_v'
-        )
-        return coherence_model.get_coherence()
-
-    def find_optimal_topics(self, df, topic_range=range(2, 11)):
+    def find_optimal_topics(self, df, topic_range=range(2, 11), n_jobs=None):
         """
         For each bank, evaluates coherence across a range of n_topics values.
+
+        Each bank is vectorized and its window co-occurrence structure built
+        once; the (bank, n_topics) candidate models are then fitted and
+        scored in a process pool.
+
+        Args:
+            df: DataFrame with 'bank_name' and 'clean_text'
+            topic_range: Candidate n_topics values
+            n_jobs: Worker processes (defaults to self.n_jobs; None = all cores)
+
         Returns a dict: {bank_name: {n_topics: coherence_score, ...}, ...}
         """
+        n_jobs = self.n_jobs if n_jobs is None else n_jobs
+        n_jobs = n_jobs or os.cpu_count()
+
+        # One vectorization + one co-occurrence structure per bank
+        bank_data = {}
+        for bank, bank_texts in df.groupby('bank_name', sort=False)['clean_text']:
+            vectorizer, dtm = self._vectorize(bank_texts, bank=bank)
+            scorer = CoherenceScorer(text.split() for text in bank_texts)
+            bank_data[bank] = (dtm, vectorizer.get_feature_names_out(), scorer)
+
+        tasks = [(bank, n, self.engine) for bank in bank_data for n in topic_range]
+        print(f"Fitting {len(tasks)} candidate models ({len(bank_data)} banks) with {n_jobs} worker(s)...")
+
+        if n_jobs == 1:
+            _init_tuning_worker(bank_data)
+            scores = [_score_topic_count(*task) for task in tasks]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_tuning_worker,
+                                     initargs=(bank_data,)) as pool:
+                scores = list(pool.map(_score_topic_count, *zip(*tasks)))
+
         results = {}
-        banks = df['bank_name'].unique()
+        for (bank, n, _), score in zip(tasks, scores):
+            results.setdefault(bank, {})[n] = score
 
-        for bank in banks:
+        for bank, bank_results in results.items():
             print(f"\n{'='*50}")
             print(f"  Tuning n_topics for: {bank}")
             print(f"{'='*50}")
-            bank_texts = df[df['bank_name'] == bank]['clean_text'].tolist()
-            bank_results = {}
-
-            for n in topic_range:
-                score = self.compute_coherence(bank_texts, n_topics=n)
-                bank_results[n] = score
+            for n, score in bank_results.items():
                 print(f"  n_topics={n:2d}  →  coherence (c_v) = {score:.4f}")
 
             best_n = max(bank_results, key=bank_results.get)
             print(f"  ➤ Best n_topics for {bank}: {best_n} (c_v = {bank_results[best_n]:.4f})")
-            results[bank] = bank_results
 
         return results
 
-    def run_analysis(self, n_topics_per_bank=None):
+    def search_hyperparameters(self, df, search_space=None, n_configs=27, min_iter=1,
+                               max_iter=10, eta=3, metric='coherence', time_budget=None,
+                               n_jobs=None, random_state=42):
+        """
+        Successive-halving search over LDA and vectorizer hyperparameters.
+
+        n_configs configurations are sampled from search_space and every one
+        is trained for min_iter passes on each bank. After each rung only the
+        best 1/eta per bank (by metric) survive and are trained further, with
+        the pass budget multiplied by eta, until one configuration per bank
+        remains or max_iter passes are reached. Each distinct vectorizer
+        setting is applied once per bank, and the c_v window structure is
+        built once per bank and shared by all candidates. The DTM of each
+        bank's winning setting is kept in the DTM cache for the final fit.
+
+        Args:
+            df: DataFrame with 'bank_name' and 'clean_text'
+            search_space: dict of parameter lists (defaults to SEARCH_SPACE)
+            n_configs: Configurations sampled per bank
+            min_iter: Passes given to every configuration in the first rung
+            max_iter: Passes given to the final survivors
+            eta: Halving rate (keep 1/eta of the candidates per rung)
+            metric: 'coherence' (c_v, higher is better) or 'perplexity'
+                    (lower is better; only comparable between configurations
+                    sharing the same vectorizer settings)
+            time_budget: Wall-clock seconds; no new fits start once exceeded
+                         and the best candidate of the deepest rung reached
+                         is returned
+            n_jobs: Worker processes (defaults to self.n_jobs; None = all cores)
+            random_state: Seed for configuration sampling
+
+        Returns a dict: {bank_name: {'params', 'n_iter', 'coherence',
+        'perplexity', 'history'}}, where history is a DataFrame with one
+        row per candidate evaluation. The winner's pass count is also set in
+        its params as max_iter, so run_analysis(params_per_bank=...) refits
+        it with the pass count it was selected at.
+        """
+        if metric not in ('coherence', 'perplexity'):
+            raise ValueError("metric must be 'coherence' or 'perplexity'")
+        if self.engine != 'lda':
+            raise ValueError("successive halving allocates LDA passes; it requires engine='lda'")
+        n_jobs = self.n_jobs if n_jobs is None else n_jobs
+        n_jobs = n_jobs or os.cpu_count()
+        configs = list(ParameterSampler(search_space or SEARCH_SPACE, n_configs,
+                                        random_state=random_state))
+        start = time.perf_counter()
+
+        # One DTM per (bank, vectorizer setting), one window structure per bank.
+        # They bypass the DTM cache, which only receives the winners (below).
+        tuning_data, vectorizers, texts_by_bank, candidates = {}, {}, {}, []
+        for bank, bank_texts in df.groupby('bank_name', sort=False)['clean_text']:
+            texts_by_bank[bank] = bank_texts
+            scorer = CoherenceScorer(text.split() for text in bank_texts)
+            for config_id, config in enumerate(configs):
+                n_topics, vectorizer_params, lda_params = _split_params(config)
+                key = (bank,) + tuple(vectorizer_params.get(k) for k in VECTORIZER_PARAMS)
+                if key not in tuning_data:
+                    vectorizer, dtm = self._vectorize(bank_texts, cache=False, **vectorizer_params)
+                    tuning_data[key] = (dtm, vectorizer.get_feature_names_out(), scorer)
+                    vectorizers[key] = vectorizer
+                model = LatentDirichletAllocation(
+                    n_components=n_topics or self.n_topics,
+                    learning_method='online',
+                    total_samples=tuning_data[key][0].shape[0],
+                    random_state=42,
+                    n_jobs=1,
+                    **lda_params
+                )
+                candidates.append({'bank': bank, 'config_id': config_id, 'params': config,
+                                   'key': key, 'model': model, 'n_iter': 0,
+                                   'coherence': np.nan, 'perplexity': np.nan})
+
+        banks = list(dict.fromkeys(c['bank'] for c in candidates))
+        # Interleave banks so a tight time budget does not starve the last bank
+        candidates.sort(key=lambda c: c['config_id'])
+        print(f"Successive halving: {len(configs)} configurations x {len(banks)} banks, "
+              f"{min_iter}→{max_iter} passes, eta={eta}, {n_jobs} worker(s)"
+              + (f", budget {time_budget:.0f}s" if time_budget else ""))
+
+        if n_jobs == 1:
+            _init_tuning_worker(tuning_data)
+            pool = None
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_tuning_worker,
+                                       initargs=(tuning_data,))
+
+        history, alive = [], candidates
+        n_iter, rung, out_of_time = min(min_iter, max_iter), 0, False
+        try:
+            while alive and not out_of_time:
+                rung_start = time.perf_counter()
+                completed, out_of_time = self._run_rung(alive, n_iter, pool, start, time_budget)
+                for c in completed:
+                    history.append({'bank': c['bank'], 'config_id': c['config_id'], 'rung': rung,
+                                    'n_iter': c['n_iter'], 'coherence': c['coherence'],
+                                    'perplexity': c['perplexity'], **c['params']})
+                print(f"  Rung {rung}: {len(completed)}/{len(alive)} candidates at {n_iter} "
+                      f"pass(es) in {time.perf_counter() - rung_start:.1f}s")
+
+                if n_iter >= max_iter:
+                    break
+                # Keep the best 1/eta of each bank's candidates that finished this
+                # rung; a bank's last survivor is trained on up to max_iter
+                survivors = []
+                for bank in banks:
+                    done = [c for c in completed if c['bank'] == bank]
+                    done.sort(key=lambda c: -c['coherence'] if metric == 'coherence' else c['perplexity'])
+                    survivors.extend(done[:math.ceil(len(done) / eta)])
+                alive = survivors
+                n_iter, rung = min(n_iter * eta, max_iter), rung + 1
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=not out_of_time, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        history = pd.DataFrame(history)
+        passes = int(sum(c['n_iter'] for c in candidates))
+        print(f"\n  Evaluated {len(history)} configurations in {elapsed:.1f}s "
+              f"({len(history) / elapsed:.2f} configs/sec)")
+        print(f"  LDA passes: {passes} (exhaustive search: {len(candidates) * max_iter})"
+              + ("  — time budget exhausted" if out_of_time else ""))
+
+        results = {}
+        for bank in banks:
+            # Best candidate of the deepest rung this bank reached
+            bank_history = history[history['bank'] == bank] if len(history) else history
+            if bank_history.empty:
+                continue
+            deepest = bank_history[bank_history['rung'] == bank_history['rung'].max()]
+            best = deepest.loc[deepest[metric].idxmax() if metric == 'coherence'
+                               else deepest[metric].idxmin()]
+            results[bank] = {
+                'params': {**configs[int(best['config_id'])], 'max_iter': int(best['n_iter'])},
+                'n_iter': int(best['n_iter']),
+                'coherence': float(best['coherence']),
+                'perplexity': float(best['perplexity']),
+                'history': bank_history.reset_index(drop=True),
+            }
+            # Reuse the winner's DTM when run_analysis fits with these params
+            _, vectorizer_params, _ = _split_params(results[bank]['params'])
+            key = (bank,) + tuple(vectorizer_params.get(k) for k in VECTORIZER_PARAMS)
+            self._cache_dtm(bank, self._dtm_key(texts_by_bank[bank], **vectorizer_params),
+                            vectorizers[key], tuning_data[key][0])
+            print(f"  ➤ {bank}: {results[bank]['params']}  "
+                  f"(c_v = {best['coherence']:.4f}, perplexity = {best['perplexity']:.1f}, "
+                  f"{int(best['n_iter'])} passes)")
+
+        return results
+
+    @staticmethod
+    def _run_rung(alive, n_iter, pool, start, time_budget):
+        """
+        Advances every alive candidate to n_iter passes (serially or in the
+        pool), stopping early once time_budget seconds have elapsed since start.
+        Returns (completed candidates, out_of_time).
+        """
+        def remaining():
+            return None if time_budget is None else time_budget - (time.perf_counter() - start)
+
+        def update(candidate, result):
+            candidate['model'], candidate['coherence'], candidate['perplexity'] = result
+            candidate['n_iter'] = n_iter
+
+        completed = []
+        if pool is None:
+            for c in alive:
+                if remaining() is not None and remaining() <= 0:
+                    return completed, True
+                update(c, _advance_candidate(c['key'], c['model'], n_iter - c['n_iter']))
+                completed.append(c)
+            return completed, False
+
+        from concurrent.futures import as_completed, TimeoutError
+        futures = {
+            pool.submit(_advance_candidate, c['key'], c['model'], n_iter - c['n_iter']): c
+            for c in alive
+        }
+        try:
+            for future in as_completed(futures, timeout=remaining()):
+                update(futures[future], future.result())
+                completed.append(futures[future])
+        except TimeoutError:
+            for future in futures:
+                future.cancel()
+            return completed, True
+        # Keep the submission order so ties rank the same as the serial path
+        done = {id(c) for c in completed}
+        return [c for c in alive if id(c) in done], False
+
+    # --- Persisted per-bank models (see topic_inference.TopicModelRegistry) ---
+
+    def load_bank_model(self, bank):
+        """
+        Loads the latest version of a bank's model state (cached in memory
+        after the first load). Returns None if the bank has no saved model.
+        """
+        if bank not in self._models:
+            state = self.registry.load(bank)
+            if state is None:
+                return None
+            self._models[bank] = state
+        return self._models[bank]
+
+    def save_bank_model(self, bank, state):
+        """
+        Saves a bank's model state (vectorizer, LDA, seen reviews, drift
+        baseline) as a new registry version. Returns the version number.
+        """
+        state['version'] = self.registry.save(bank, state)
+        self._models[bank] = state
+        return state['version']
+
+    @staticmethod
+    def _review_keys(bank_df):
+        """
+        Identifies review versions by review_id plus a hash of the text (the
+        hash alone if there is no review_id), so an edited review is new.
+        """
+        hashes = text_hashes(bank_df['review_text']).astype(str)
+        if 'review_id' in bank_df.columns:
+            return bank_df['review_id'].astype(str).to_numpy() + ':' + hashes
+        return hashes
+
+    @staticmethod
+    def detect_drift(state, texts, dtm, perplexity_ratio=DRIFT_PERPLEXITY_RATIO,
+                     coverage_ratio=DRIFT_COVERAGE_RATIO, min_reviews=DRIFT_MIN_REVIEWS):
+        """
+        Compares a batch of new reviews with the held-out baseline measured
+        when the model was fitted.
+
+        Args:
+            state: Persisted bank model state (see save_bank_model)
+            texts: Clean texts of the new reviews
+            dtm: Their document-term matrix under the model's vectorizer
+
+        Returns (drifted, stats) where stats holds the batch's perplexity and
+        vocabulary coverage relative to the baseline.
+        """
+        # A batch without a single known term is as far from the model as it gets
+        perplexity = state['lda'].perplexity(dtm) if dtm.sum() else np.inf
+        stats = {
+            'perplexity_ratio': perplexity / state['perplexity'],
+            'coverage_ratio': _vocabulary_coverage(state['vectorizer'], dtm, texts) / state['coverage'],
+        }
+        drifted = len(texts) >= min_reviews and (
+            stats['perplexity_ratio'] > perplexity_ratio or stats['coverage_ratio'] < coverage_ratio
+        )
+        return drifted, stats
+
+    def _drift_baseline(self, texts, n_topics, params):
+        """
+        Held-out perplexity and vocabulary coverage for drift detection.
+
+        Training perplexity understates what unseen reviews score, so the
+        baseline comes from a model fitted on all but a DRIFT_HOLDOUT share
+        of the texts and evaluated on the rest. Returns (perplexity, coverage).
+        """
+        texts = pd.Series(texts).reset_index(drop=True)
+        holdout = np.random.default_rng(42).random(len(texts)) < DRIFT_HOLDOUT
+        if holdout.sum() == 0 or (~holdout).sum() < 2:
+            holdout = np.ones(len(texts), dtype=bool)
+            train = texts
+        else:
+            train = texts[~holdout]
+        vectorizer, lda_model, _ = self._fit_lda_for_bank(train, n_topics=n_topics, params=params, cache=False)
+        held_out = texts[holdout].tolist()
+        dtm = vectorizer.transform(held_out)
+        return lda_model.perplexity(dtm), _vocabulary_coverage(vectorizer, dtm, held_out)
+
+    def _refit_bank_model(self, bank, bank_df, n_topics, params, previous=None, vectorizer=None, dtm=None):
+        """
+        Full fit of a bank's model, topic ids aligned to the previous model if
+        any. Pass a precomputed (vectorizer, dtm) to skip vectorization.
+        """
+        texts = bank_df['clean_text']
+        vectorizer, lda_model, dtm = self._fit_lda_for_bank(texts, n_topics=n_topics, vectorizer=vectorizer,
+                                                            dtm=dtm, params=params, bank=bank)
+        # Drift detection relies on LDA perplexity; other engines have no baseline
+        perplexity, coverage = self._drift_baseline(texts, n_topics, params) if self.engine == 'lda' else (None, None)
+        if previous is not None:
+            _align_topics(previous['vectorizer'], previous['lda'], vectorizer, lda_model)
+
+        now = datetime.now().isoformat(timespec='seconds')
+        state = {
+            'bank': bank,
+            'vectorizer': vectorizer,
+            'lda': lda_model,
+            'engine': self.engine,
+            'n_topics': lda_model.n_components,
+            'params': params,
+            'seen': self._review_keys(bank_df),
+            'n_reviews': len(bank_df),
+            'perplexity': perplexity,
+            'coverage': coverage,
+            'fitted_at': now,
+            'updated_at': now,
+            'n_updates': 0,
+        }
+        self.save_bank_model(bank, state)
+        return state, dtm
+
+    def _update_bank_model(self, bank, bank_df, n_topics=None, params=None, refit=False):
+        """
+        Incremental counterpart of _fit_lda_for_bank for run_analysis.
+
+        Reviews not seen by the persisted model (new, or edited since) are
+        transformed with its frozen vectorizer and absorbed with partial_fit,
+        so topic ids are unchanged. A full refit happens on request, when no
+        model exists, when n_topics or params change or when the new batch
+        drifts from the fit-time baseline.
+        Returns (vectorizer, lda_model, dtm) for all of bank_df.
+        """
+        previous = self.load_bank_model(bank)
+        reason = None
+        if previous is None:
+            reason = 'no saved model'
+        elif refit:
+            reason = 'refit requested'
+        elif n_topics and n_topics != previous['n_topics']:
+            reason = f"n_topics changed ({previous['n_topics']} → {n_topics})"
+        elif params is not None and params != previous['params']:
+            reason = f"params changed ({previous['params']} → {params})"
+
+        if reason is None:
+            state = previous
+            new = ~np.isin(self._review_keys(bank_df), state['seen'])
+            new_texts = bank_df.loc[new, 'clean_text']
+            if len(new_texts):
+                new_dtm = state['vectorizer'].transform(new_texts)
+                drifted, stats = self.detect_drift(state, new_texts.tolist(), new_dtm)
+                print(f"  {len(new_texts)} new reviews: perplexity x{stats['perplexity_ratio']:.2f}, "
+                      f"vocabulary coverage x{stats['coverage_ratio']:.2f} vs. held-out baseline")
+                if drifted:
+                    reason = 'drift detected'
+                else:
+                    start = time.perf_counter()
+                    lda_model = state['lda']
+                    lda_model.total_samples = state['n_reviews'] + len(new_texts)
+                    lda_model.partial_fit(new_dtm)
+                    state.update(
+                        seen=np.concatenate([state['seen'], self._review_keys(bank_df[new])]),
+                        n_reviews=lda_model.total_samples,
+                        updated_at=datetime.now().isoformat(timespec='seconds'),
+                        n_updates=state['n_updates'] + 1,
+                    )
+                    self.save_bank_model(bank, state)
+                    print(f"  ↻ partial_fit update in {(time.perf_counter() - start) * 1000:.0f} ms "
+                          f"(model fitted {state['fitted_at']}, {state['n_updates']} update(s) since)")
+            else:
+                print(f"  No new reviews — reusing model fitted {state['fitted_at']}")
+
+        if reason is not None:
+            print(f"  Full refit: {reason}")
+            # Unless overridden, a refit keeps the previous model's configuration
+            if previous is not None:
+                n_topics = n_topics or previous['n_topics']
+                params = params if params is not None else previous['params']
+            state, dtm = self._refit_bank_model(bank, bank_df, n_topics or self.n_topics, params, previous)
+        else:
+            dtm = state['vectorizer'].transform(bank_df['clean_text'])
+        return state['vectorizer'], state['lda'], dtm
+
+    def predict_topics(self, bank, texts, version=None):
+        """
+        Assigns topics to new reviews with a bank's persisted model, without
+        updating it (see topic_inference.TopicInference.predict).
+        """
+        inference = TopicInference(self.registry, preprocess=self.preprocess_texts)
+        return inference.predict(bank, texts, version=version)
+
+    # --- Topic -> theme mapping ---
+
+    @property
+    def theme_analyzer(self):
+        """ThemeAnalyzer whose theme_keywords / matcher define the themes (built on first use)."""
+        if self._theme_analyzer is None:
+            from src.theme_analysis import ThemeAnalyzer
+            self._theme_analyzer = ThemeAnalyzer()
+        return self._theme_analyzer
+
+    @property
+    def topic_matcher(self):
+        """
+        KeywordMatcher over the ThemeAnalyzer theme keywords, lemmatized like
+        the LDA features (preprocess_texts: POS-aware lemmas, LDA stopwords),
+        so verb and adjective keywords match their topic terms. Built on
+        first use.
+        """
+        if self._topic_matcher is None:
+            from src.theme_analysis import KeywordMatcher
+            theme_keywords = self.theme_analyzer.theme_keywords
+            keywords = list(dict.fromkeys(k for ks in theme_keywords.values() for k in ks))
+            lemmatized = dict(zip(keywords, self.preprocess_texts(keywords)))
+            self._topic_matcher = KeywordMatcher(theme_keywords, normalize=lambda k: lemmatized[k].split())
+        return self._topic_matcher
+
+    def map_topics_to_themes(self, model, feature_names, n_terms=20, min_similarity=0.1, max_themes=1):
+        """
+        Maps each topic of a fitted model to ThemeAnalyzer themes.
+
+        Each topic is represented by the weights of its n_terms top terms and
+        each theme by how many of its keywords every one of those terms
+        matches (topic_matcher, whole words and phrases). Topics and
+        themes are compared by cosine similarity over the union of the
+        topics' top terms, all at once. A topic gets its most similar theme
+        (first theme wins ties), or FALLBACK_THEME below min_similarity;
+        with max_themes > 1, further themes above min_similarity are
+        appended, '; '-separated.
+
+        Returns:
+            DataFrame indexed by topic id with one similarity column per
+            theme, plus 'theme'
+        """
+        matcher = self.topic_matcher
+        weights = model.components_ / model.components_.sum(axis=1, keepdims=True)
+
+        # Keep each topic's top terms only, over the union of those terms
+        top = np.argsort(-weights, axis=1, kind='stable')[:, :n_terms]
+        terms = np.unique(top)
+        rows = np.arange(len(weights))[:, None]
+        topic_vectors = np.zeros((len(weights), len(terms)))
+        topic_vectors[rows, np.searchsorted(terms, top)] = weights[rows, top]
+        theme_vectors = matcher.score_matrix(np.asarray(feature_names, dtype=object)[terms]).T
+
+        norms = np.outer(np.linalg.norm(topic_vectors, axis=1), np.linalg.norm(theme_vectors, axis=1))
+        similarity = np.divide(topic_vectors @ theme_vectors.T, norms,
+                               out=np.zeros(norms.shape), where=norms > 0)
+
+        themes = np.array(matcher.themes, dtype=object)
+        order = np.argsort(-similarity, axis=1, kind='stable')[:, :max_themes]
+        labels = []
+        for topic_order, topic_similarity in zip(order, similarity):
+            chosen = [t for t in topic_order if topic_similarity[t] >= min_similarity]
+            labels.append('; '.join(themes[chosen]) or FALLBACK_THEME)
+
+        result = pd.DataFrame(similarity, columns=matcher.themes)
+        result.index.name = 'topic_id'
+        result['theme'] = labels
+        return result
+
+    def run_analysis(self, n_topics_per_bank=None, params_per_bank=None, incremental=False, refit=False,
+                     save_models=False, shared_vocabulary=False, global_n_topics=None, map_themes=False):
         """
         Runs LDA topic modeling separately for each bank.
 
@@ -170,10 +1250,44 @@ class ThemeAnalyzerLDA:
             n_topics_per_bank: Optional dict mapping bank name to its optimal
                                n_topics, e.g. {'CBE': 4, 'Abyssinia': 5, 'Dashen': 3}.
                                If None, uses self.n_topics for all banks.
+            params_per_bank: Optional dict mapping bank name to a configuration
+                             found by search_hyperparameters (its 'params');
+                             n_topics_per_bank still takes precedence.
+            incremental: Reuse each bank's persisted model, absorbing only new
+                         reviews with partial_fit (full refit when there is no
+                         model, n_topics changes or drift is detected)
+            refit: With incremental, force a full refit of every bank's model
+            save_models: Without incremental, save each bank's fitted model as a
+                         new version in the registry (for TopicInference /
+                         the dashboard's /api/topics); off by default, as it
+                         also fits the drift baseline model per bank
+            shared_vocabulary: Vectorize the whole corpus once and fit each
+                               bank's model on its (uncopied) row block, with
+                               corpus-wide min_df/max_df; vectorizer settings
+                               in params_per_bank are ignored
+            global_n_topics: Also fit one corpus-wide model with this many
+                             topics (implies shared_vocabulary) and report
+                             per-bank topic mixtures
+            map_themes: Map every topic to a ThemeAnalyzer theme
+                        (map_topics_to_themes) and add the 'theme' column
+                        used by the insight report; off by default, as the
+                        mapping is also saved to DATA_PATHS['topic_theme_mapping']
 
         Returns:
             DataFrame with columns: topic_id, topic_confidence, identified_topic
+            (+ theme with map_themes, + global_topic_id, global_topic_confidence
+            with global_n_topics)
         """
+        shared_vocabulary = shared_vocabulary or bool(global_n_topics)
+        if shared_vocabulary and incremental:
+            raise ValueError("incremental mode keeps a vocabulary per bank; "
+                             "it cannot be combined with shared_vocabulary")
+        if incremental and self.engine != 'lda':
+            raise ValueError("incremental mode updates models with partial_fit; it requires engine='lda'")
+        # Fail before any fitting if a bank's configuration does not suit the engine
+        for params in (params_per_bank or {}).values():
+            make_engine(self.engine, self.n_topics, **_split_params(params)[2])
+
         print("Loading data...")
         try:
             df = pd.read_csv(DATA_PATHS.get('sentiment_results_twitter', DATA_PATHS['sentiment_results_twitter']))
@@ -181,41 +1295,79 @@ class ThemeAnalyzerLDA:
             print("Twitter results not found, falling back to processed reviews...")
             df = pd.read_csv(DATA_PATHS['processed_reviews'])
 
-        # Drop NaNs
-        df = df.dropna(subset=['review_text'])
+        # Drop NaNs (reviews without a bank belong to no per-bank model)
+        df = df.dropna(subset=['review_text', 'bank_name'])
         total_before = len(df)
 
         print(f"Preprocessing {total_before} reviews (POS-aware Lemmatization)...")
-        tqdm.pandas(desc="Preprocessing")
-        df['clean_text'] = df['review_text'].progress_apply(self.preprocess_text)
+        if 'review_id' in df.columns:
+            # Shared stage: tokens/tags/lemmas are reused across runs and analyzers
+            df = PreprocessingStage(n_jobs=self.n_jobs).run(df).attach(df, variant='lda')
+        else:
+            df['clean_text'] = self.preprocess_texts(df['review_text'])
 
         # Filter out empty rows after preprocessing
         df = df[df['clean_text'].str.len() > 0]
         total_after = len(df)
         dropped = total_before - total_after
 
+        # Contiguous rows per bank (banks in order of appearance, reviews in
+        # their original order), so every bank is a single row block
+        bank_codes, banks = pd.factorize(df['bank_name'])
+        df = df.iloc[np.argsort(bank_codes, kind='stable')].reset_index(drop=True)
+        blocks = {
+            bank: (idx[0], idx[-1] + 1)
+            for bank, idx in df.groupby('bank_name', sort=False).indices.items()
+        }
+
         print(f"\n  Preprocessing summary:")
         print(f"    Before: {total_before} reviews")
         print(f"    After:  {total_after} reviews ({dropped} dropped as empty)")
-        for bank in df['bank_name'].unique():
-            count = len(df[df['bank_name'] == bank])
-            print(f"    {bank}: {count} reviews")
+        for bank, (start, stop) in blocks.items():
+            print(f"    {bank}: {stop - start} reviews")
+
+        if shared_vocabulary:
+            # One vectorization pass; per-bank models see row blocks of it.
+            # float64 up front so LDA fits/transforms take the blocks as is.
+            shared_vectorizer, shared_dtm = self._vectorize(df['clean_text'])
+            shared_dtm = shared_dtm.astype(np.float64)
+            print(f"\n  Shared vocabulary: {shared_dtm.shape[1]} terms over {shared_dtm.shape[0]} reviews")
 
         # --- Per-bank LDA ---
-        banks = df['bank_name'].unique()
-        all_results = []
+        topic_ids = np.zeros(len(df), dtype=np.int64)
+        topic_confidence = np.zeros(len(df))
+        themes = np.empty(len(df), dtype=object)
+        theme_mappings = []
 
-        for bank in banks:
-            bank_df = df[df['bank_name'] == bank].copy()
-            n = (n_topics_per_bank or {}).get(bank, self.n_topics)
+        for bank, (start, stop) in blocks.items():
+            bank_df = df.iloc[start:stop]
+            params = (params_per_bank or {}).get(bank)
+            requested_n = (n_topics_per_bank or {}).get(bank) or (params or {}).get('n_topics')
+            n = requested_n or self.n_topics
 
             print(f"\n{'='*50}")
-            print(f"  LDA for {bank}  ({len(bank_df)} reviews, {n} topics)")
+            print(f"  {self.engine.upper()} for {bank}  ({stop - start} reviews, {n} topics)")
             print(f"{'='*50}")
 
-            vectorizer, lda_model, dtm = self._fit_lda_for_bank(
-                bank_df['clean_text'], n_topics=n
-            )
+            vectorizer = dtm = None
+            if shared_vocabulary:
+                vectorizer, dtm = shared_vectorizer, _row_block(shared_dtm, start, stop)
+
+            if incremental:
+                vectorizer, lda_model, dtm = self._update_bank_model(
+                    bank, bank_df, n_topics=requested_n, params=params, refit=refit
+                )
+            elif save_models:
+                state, dtm = self._refit_bank_model(bank, bank_df, n, params,
+                                                    vectorizer=vectorizer, dtm=dtm)
+                vectorizer, lda_model = state['vectorizer'], state['lda']
+            else:
+                vectorizer, lda_model, dtm = self._fit_lda_for_bank(
+                    bank_df['clean_text'], n_topics=n, vectorizer=vectorizer, dtm=dtm, params=params,
+                    bank=bank
+                )
+            if incremental or save_models:
+                print(f"  Model version: v{self._models[bank]['version']} ({self.registry.root})")
 
             # Display top words per topic
             feature_names = vectorizer.get_feature_names_out()
@@ -226,27 +1378,76 @@ class ThemeAnalyzerLDA:
 
             # Assign dominant topic
             topic_results = lda_model.transform(dtm)
-            bank_df['topic_id'] = topic_results.argmax(axis=1)
-            bank_df['topic_confidence'] = topic_results.max(axis=1)
-            bank_df['identified_topic'] = bank_df['topic_id'].apply(
-                lambda x: f"{bank}_Topic_{x}"
-            )
+            topic_ids[start:stop] = topic_results.argmax(axis=1)
+            topic_confidence[start:stop] = topic_results.max(axis=1)
+
+            if map_themes:
+                mapping = self.map_topics_to_themes(lda_model, feature_names)
+                themes[start:stop] = mapping['theme'].to_numpy()[topic_ids[start:stop]]
+                for topic_idx, row in mapping.iterrows():
+                    print(f"  Topic {topic_idx} → {row['theme']}")
+                theme_mappings.append(mapping.reset_index().assign(
+                    bank_name=bank, identified_topic=lambda m: bank + '_Topic_' + m['topic_id'].astype(str)
+                ))
 
-            all_results.append(bank_df)
+        df_final = df
+        df_final['topic_id'] = topic_ids
+        df_final['topic_confidence'] = topic_confidence
+        df_final['identified_topic'] = df_final['bank_name'] + '_Topic_' + df_final['topic_id'].astype(str)
+        if map_themes:
+            df_final['theme'] = themes
+            mapping_path = DATA_PATHS['topic_theme_mapping']
+            pd.concat(theme_mappings, ignore_index=True).to_csv(mapping_path, index=False)
+            print(f"\n  Topic → theme mapping saved to: {mapping_path}")
 
-        # Combine all banks
-        df_final = pd.concat(all_results, ignore_index=True)
+        if global_n_topics:
+            self._fit_global_model(df_final, shared_vectorizer, shared_dtm, global_n_topics, blocks)
 
         output_path = DATA_PATHS['theme_results_lda']
         df_final.to_csv(output_path, index=False)
         print(f"\n✅ Per-bank LDA theme analysis saved to: {output_path}")
         print(f"   Total reviews: {len(df_final)}")
-        for bank in banks:
-            count = len(df_final[df_final['bank_name'] == bank])
-            print(f"   {bank}: {count} reviews")
+        for bank, (start, stop) in blocks.items():
+            print(f"   {bank}: {stop - start} reviews")
 
         return df_final
 
+    def _fit_global_model(self, df, vectorizer, dtm, n_topics, blocks):
+        """
+        Fits one LDA on the shared corpus DTM for cross-bank comparison.
+
+        Adds global_topic_id / global_topic_confidence columns to df in place
+        and saves each bank's topic mixture (mean document-topic proportions)
+        to DATA_PATHS['lda_topic_mixtures'].
+        Returns the mixtures DataFrame (banks x Global_Topic_k).
+        """
+        print(f"\n{'='*50}")
+        print(f"  Global {self.engine.upper()}  ({dtm.shape[0]} reviews, {n_topics} topics)")
+        print(f"{'='*50}")
+        lda_model = _fit_topic_model(dtm, n_topics, self.engine)
+        for topic_idx, words in enumerate(_top_words(lda_model, vectorizer.get_feature_names_out())):
+            print(f"  Global_Topic_{topic_idx}: {', '.join(words)}")
+
+        doc_topics = lda_model.transform(dtm)
+        df['global_topic_id'] = doc_topics.argmax(axis=1)
+        df['global_topic_confidence'] = doc_topics.max(axis=1)
+
+        # Blocks are contiguous, so per-bank sums are one reduceat
+        starts = np.array([start for start, _ in blocks.values()])
+        sizes = np.array([stop - start for start, stop in blocks.values()])
+        mixtures = pd.DataFrame(
+            np.add.reduceat(doc_topics, starts, axis=0) / sizes[:, None],
+            index=pd.Index(list(blocks), name='bank_name'),
+            columns=[f"Global_Topic_{k}" for k in range(n_topics)],
+        )
+        print("\n  Per-bank topic mixtures:")
+        print(mixtures.round(3).to_string())
+
+        output_path = DATA_PATHS['lda_topic_mixtures']
+        mixtures.to_csv(output_path)
+        print(f"  Saved to: {output_path}")
+        return mixtures
+
 if __name__ == "__main__":
     analyzer = ThemeAnalyzerLDA(n_topics=5)
-    analyzer.run_analysis()
+    analyzer.run_analysis(map_themes=True)
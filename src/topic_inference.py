@@ -0,0 +1,251 @@
+"""
+Topic Inference Module
+Task 3: Thematic Analysis — persisted LDA models and batch inference
+
+Versioned per-bank artifacts of the fitted CountVectorizer + LDA models
+produced by ThemeAnalyzerLDA, and a lightweight inference API that loads a
+bank's model once and assigns topics to batches of new texts with a single
+vectorized transform. Used by scripts and by the dashboard backend.
+
+Registry layout (root defaults to DATA_PATHS['lda_models']):
+    <root>/<bank>/v0001.joblib, v0002.joblib, ...
+    <root>/<bank>/manifest.json   (latest version + metadata per version)
+"""
+
+import sys
+import os
+import re
+import json
+import joblib
+import pandas as pd
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import DATA_PATHS
+
+# Versions kept per bank; older artifacts are deleted on save
+KEEP_VERSIONS = 10
+
+# Model state keys copied into the manifest
+_MANIFEST_FIELDS = ('n_topics', 'n_reviews', 'fitted_at', 'updated_at', 'n_updates', 'params')
+
+# Columns of TopicInference.predict / predict_frame
+PREDICTION_COLUMNS = ['topic_id', 'topic_confidence', 'identified_topic', 'model_version']
+
+
+class TopicModelRegistry:
+    """
+    Versioned storage of per-bank topic model states.
+
+    A state is the dict ThemeAnalyzerLDA builds for a bank ('vectorizer',
+    'lda', 'n_topics', 'seen', drift baseline, timestamps). Every save
+    writes a new version; the manifest is replaced atomically after the
+    artifact is written, so readers never see a half-written model.
+    """
+
+    def __init__(self, root=None, keep=KEEP_VERSIONS):
+        self.root = root or DATA_PATHS['lda_models']
+        self.keep = keep
+
+    def _bank_dir(self, bank):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9_-]+', '_', bank))
+
+    def _read_manifest(self, bank):
+        try:
+            with open(os.path.join(self._bank_dir(bank), 'manifest.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'bank': bank, 'latest': None, 'versions': []}
+
+    def _write_manifest(self, bank, manifest):
+        path = os.path.join(self._bank_dir(bank), 'manifest.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+    def banks(self):
+        """Banks with at least one saved version."""
+        if not os.path.isdir(self.root):
+            return []
+        banks = []
+        for name in sorted(os.listdir(self.root)):
+            manifest_path = os.path.join(self.root, name, 'manifest.json')
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    banks.append(json.load(f)['bank'])
+        return banks
+
+    def versions(self, bank):
+        """Metadata of a bank's saved versions, oldest first."""
+        return self._read_manifest(bank)['versions']
+
+    def latest_version(self, bank):
+        """Latest version number of a bank's model, or None."""
+        return self._read_manifest(bank)['latest']
+
+    def save(self, bank, state):
+        """
+        Saves a bank's model state as a new version.
+
+        Returns:
+            The new version number
+        """
+        bank_dir = self._bank_dir(bank)
+        os.makedirs(bank_dir, exist_ok=True)
+        manifest = self._read_manifest(bank)
+        version = (manifest['latest'] or 0) + 1
+        filename = f"v{version:04d}.joblib"
+        joblib.dump(state, os.path.join(bank_dir, filename))
+
+        entry = {'version': version, 'file': filename,
+                 'saved_at': datetime.now().isoformat(timespec='seconds')}
+        entry.update({k: state[k] for k in _MANIFEST_FIELDS if k in state})
+        manifest['versions'].append(entry)
+        manifest['latest'] = version
+
+        # Drop the oldest artifacts beyond the retention limit
+        stale = manifest['versions'][:-self.keep] if self.keep else []
+        manifest['versions'] = manifest['versions'][len(stale):]
+        self._write_manifest(bank, manifest)
+        for entry in stale:
+            try:
+                os.remove(os.path.join(bank_dir, entry['file']))
+            except FileNotFoundError:
+                pass
+        return version
+
+    def load(self, bank, version=None):
+        """
+        Loads a bank's model state (latest version by default).
+
+        Returns:
+            The state dict, or None if the bank or version does not exist
+        """
+        manifest = self._read_manifest(bank)
+        version = version or manifest['latest']
+        entry = next((v for v in manifest['versions'] if v['version'] == version), None)
+        if entry is None:
+            return None
+        state = joblib.load(os.path.join(self._bank_dir(bank), entry['file']))
+        state['version'] = version
+        return state
+
+
+class TopicInference:
+    """
+    Assigns topics to new texts with persisted per-bank models.
+
+    Each (bank, version) model is loaded from the registry once and kept in
+    memory; a batch of texts is preprocessed with the LDA pipeline's
+    preprocessing and scored with one vectorizer + LDA transform.
+    """
+
+    def __init__(self, registry=None, preprocess=None):
+        """
+        Args:
+            registry: TopicModelRegistry (or its root directory)
+            preprocess: Callable mapping raw texts to clean texts; defaults to
+                        ThemeAnalyzerLDA.preprocess_texts (created on first use)
+        """
+        if registry is None or isinstance(registry, str):
+            registry = TopicModelRegistry(registry)
+        self.registry = registry
+        self._preprocess = preprocess
+        self._models = {}
+        self._latest = {}
+
+    def preprocess(self, texts):
+        """Clean texts exactly as the models were trained on."""
+        if self._preprocess is None:
+            from src.theme_analysis_lda import ThemeAnalyzerLDA
+            self._preprocess = ThemeAnalyzerLDA().preprocess_texts
+        return self._preprocess(texts)
+
+    def reload(self):
+        """Forget loaded models so the next call picks up new versions."""
+        self._models.clear()
+        self._latest.clear()
+
+    def model(self, bank, version=None):
+        """
+        Returns a bank's model state (latest version by default), loading it
+        on first use.
+        """
+        if version is None:
+            if bank not in self._latest:
+                self._latest[bank] = self.registry.latest_version(bank)
+            version = self._latest[bank]
+        key = (bank, version)
+        if key not in self._models:
+            state = self.registry.load(bank, version)
+            if state is None:
+                raise KeyError(f"No saved topic model for {bank}"
+                               + (f" (version {version})" if version else ""))
+            self._models[key] = state
+        return self._models[key]
+
+    def predict(self, bank, texts, version=None, preprocessed=False):
+        """
+        Assigns the dominant topic to each text.
+
+        Args:
+            bank: Bank name with a saved model
+            texts: Raw review texts (or clean texts with preprocessed=True)
+            version: Model version (latest by default)
+            preprocessed: Whether texts are already cleaned
+
+        Returns:
+            DataFrame with columns: topic_id, topic_confidence,
+            identified_topic, model_version (one row per text; empty for
+            no texts)
+        """
+        state = self.model(bank, version)
+        texts = list(texts)
+        if not texts:
+            return pd.DataFrame(columns=PREDICTION_COLUMNS)
+        clean = texts if preprocessed else self.preprocess(texts)
+        topic_results = state['lda'].transform(state['vectorizer'].transform(clean))
+        topic_ids = topic_results.argmax(axis=1)
+        return pd.DataFrame({
+            'topic_id': topic_ids,
+            'topic_confidence': topic_results.max(axis=1),
+            'identified_topic': [f"{bank}_Topic_{x}" for x in topic_ids],
+            'model_version': state['version'],
+        })
+
+    def predict_frame(self, df, text_col='review_text', bank_col='bank_name', preprocessed=False):
+        """
+        Assigns topics to a DataFrame of reviews from several banks, with one
+        transform per bank.
+
+        Returns:
+            DataFrame aligned with df.index (columns as in predict)
+        """
+        parts = []
+        for bank, bank_df in df.groupby(bank_col, sort=False):
+            result = self.predict(bank, bank_df[text_col], preprocessed=preprocessed)
+            result.index = bank_df.index
+            parts.append(result)
+        if not parts:
+            return pd.DataFrame(columns=PREDICTION_COLUMNS)
+        return pd.concat(parts).loc[df.index]
+
+    def topics(self, bank, n_words=10, version=None):
+        """
+        Top words of each topic of a bank's model.
+
+        Returns:
+            list of dicts: {'topic_id', 'identified_topic', 'top_words'}
+        """
+        state = self.model(bank, version)
+        feature_names = state['vectorizer'].get_feature_names_out()
+        return [
+            {
+                'topic_id': topic_idx,
+                'identified_topic': f"{bank}_Topic_{topic_idx}",
+                'top_words': [feature_names[i] for i in topic.argsort()[:-n_words - 1:-1]],
+            }
+            for topic_idx, topic in enumerate(state['lda'].components_)
+        ]
@@ -0,0 +1,45 @@
+"""Shared fixtures: NLTK stopwords, tagger and lemmatizer that need no data downloads."""
+
+import nltk.corpus
+import pytest
+
+import src.text_preprocessing as text_preprocessing
+import src.theme_analysis as theme_analysis
+import src.theme_analysis_lda as theme_analysis_lda
+
+
+class FakeStopwords:
+    @staticmethod
+    def words(language):
+        return ['the', 'and', 'is', 'was', 'very', 'not', 'this', 'with']
+
+
+class FakeLemmatizer:
+    """Strips a plural 's' from nouns and 'ing' from verbs."""
+
+    def lemmatize(self, word, pos='n'):
+        if pos == 'v' and word.endswith('ing'):
+            return word[:-3]
+        if pos == 'n' and word.endswith('s'):
+            return word[:-1]
+        return word
+
+
+@pytest.fixture
+def offline_nltk(monkeypatch):
+    """Patches NLTK resources; returns the list of token lists sent to the POS tagger."""
+    tagged = []
+
+    def pos_tag_batch(token_lists, n_jobs=1, chunk_size=5000):
+        token_lists = list(token_lists)
+        tagged.extend(token_lists)
+        return [[(w, 'VBG' if w.endswith('ing') else 'NN') for w in tokens] for tokens in token_lists]
+
+    monkeypatch.setattr(nltk.corpus, 'stopwords', FakeStopwords)
+    monkeypatch.setattr(text_preprocessing, 'pos_tag_batch', pos_tag_batch)
+    for module in (text_preprocessing, theme_analysis, theme_analysis_lda):
+        monkeypatch.setattr(module, 'WordNetLemmatizer', FakeLemmatizer)
+    for module in (theme_analysis, theme_analysis_lda):
+        monkeypatch.setattr(module, 'stopwords', FakeStopwords)
+    monkeypatch.setattr(theme_analysis_lda, 'pos_tag_batch', pos_tag_batch)
+    return tagged
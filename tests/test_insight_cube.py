@@ -0,0 +1,44 @@
+"""Tests for src.insight_cube.build_term_counts."""
+
+import pandas as pd
+import pytest
+
+from src.insight_cube import build_term_counts
+from src.text_preprocessing import PreprocessingStage
+
+REVIEWS = pd.DataFrame({
+    'review_id': ['r1', 'r2', 'r3'],
+    'bank_name': ['CBE', 'CBE', 'Dashen'],
+    'sentiment_label': ['negative', 'negative', 'positive'],
+    'review_text': ['Transfers failing, transfers slow', 'OTP codes late', 'Great app'],
+    # Deliberately different from the stage, to tell the two sources apart
+    'clean_text': ['vectorized', 'vectorized', 'vectorized'],
+})
+
+
+@pytest.fixture
+def stage(offline_nltk, tmp_path):
+    return PreprocessingStage(path=str(tmp_path / 'stage.npz'), n_jobs=1)
+
+
+def test_counts_from_stage(stage):
+    stage.run(REVIEWS)
+    counts = build_term_counts(REVIEWS, stage=stage)
+
+    assert counts.frequencies(bank_name='CBE') == {'transfer': 2, 'fail': 1, 'slow': 1, 'otp': 1,
+                                                   'code': 1, 'late': 1}
+    assert counts.frequencies(bank_name='Dashen') == {'great': 1}
+
+
+def test_reviews_missing_from_stage_fall_back_to_clean_text(stage):
+    stage.run(REVIEWS.iloc[:2])
+    counts = build_term_counts(REVIEWS, stage=stage)
+
+    assert counts.frequencies(bank_name='Dashen') == {'vectorized': 1}
+    assert counts.frequencies(bank_name='CBE')['transfer'] == 2
+    assert counts.cells['n_reviews'].sum() == len(REVIEWS)
+
+
+def test_clean_text_only():
+    counts = build_term_counts(REVIEWS[['bank_name', 'sentiment_label', 'clean_text']])
+    assert counts.frequencies() == {'vectorized': 3}
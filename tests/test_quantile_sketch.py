@@ -0,0 +1,93 @@
+"""Tests for src.quantile_sketch: KLL rank error, merging and cell building."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.quantile_sketch import KLLSketch, build_sketches
+
+QS = np.linspace(0.01, 0.99, 99)
+# KLL rank error is ~1.7/k (0.0085 at k=200); allow a margin for the
+# randomised compaction
+RANK_TOLERANCE = 0.02
+
+
+def _rank_errors(sketch, values):
+    """|true rank - requested rank| of each sketch quantile in QS."""
+    values = np.sort(values)
+    estimates = sketch.quantiles(QS)
+    true_ranks = np.searchsorted(values, estimates, side='right') / len(values)
+    return np.abs(true_ranks - QS)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_rank_error_within_bound(seed):
+    values = np.random.default_rng(seed).uniform(-1, 1, 100_000)
+    sketch = KLLSketch(k=200, seed=seed).update(values)
+
+    assert sketch.n == len(values)
+    assert _rank_errors(sketch, values).max() < RANK_TOLERANCE
+    assert abs(sketch.rank(0.0) - np.mean(values <= 0.0)) < RANK_TOLERANCE
+
+
+def test_sketch_stays_small():
+    sketch = KLLSketch(k=200).update(np.random.default_rng(0).normal(size=200_000))
+    assert sum(len(level) for level in sketch.levels) < 10 * 200
+
+
+def test_exact_extremes():
+    values = np.random.default_rng(1).normal(size=50_000)
+    sketch = KLLSketch(k=200).update(values)
+    assert sketch.quantiles([0, 1]).tolist() == [values.min(), values.max()]
+
+
+def test_merge_matches_combined():
+    rng = np.random.default_rng(2)
+    left, right = rng.uniform(-1, 0.5, 60_000), rng.uniform(-0.5, 1, 40_000)
+    combined = np.concatenate([left, right])
+
+    merged = KLLSketch(k=200, seed=0).update(left).merge(KLLSketch(k=200, seed=1).update(right))
+    whole = KLLSketch(k=200, seed=2).update(combined)
+
+    assert merged.n == whole.n == len(combined)
+    assert (merged.min, merged.max) == (combined.min(), combined.max())
+    assert _rank_errors(merged, combined).max() < RANK_TOLERANCE
+    assert np.abs(merged.quantiles(QS) - whole.quantiles(QS)).max() < 4 * RANK_TOLERANCE
+
+
+def test_nan_ignored_and_empty_sketch():
+    sketch = KLLSketch().update([np.nan, np.nan])
+    assert sketch.n == 0
+    assert np.isnan(sketch.quantiles([0.5])).all()
+
+    sketch.update([0.2, np.nan, -0.4])
+    assert sketch.n == 2
+    assert (sketch.min, sketch.max) == (-0.4, 0.2)
+
+
+def test_build_sketches_skips_unscored_cells():
+    df = pd.DataFrame({
+        'bank_name': ['A', 'A', 'A', 'B', 'B', None],
+        'theme': ['Fees', 'Fees', 'Login', 'Fees', 'Fees', 'Fees'],
+        'sentiment_score': [0.1, 0.5, np.nan, np.nan, np.nan, 0.3],
+    })
+    table = build_sketches(df, by=['bank_name', 'theme'])
+
+    assert table.cells[['bank_name', 'theme']].values.tolist() == [['A', 'Fees']]
+    assert table.cells['count'].tolist() == [2]
+    assert (table.sketches[0].min, table.sketches[0].max) == (0.1, 0.5)
+
+
+def test_rollup_equals_build_on_fewer_dimensions():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'bank_name': rng.choice(['A', 'B', 'C'], 20_000),
+        'theme': rng.choice(['Fees', 'Login', 'Speed'], 20_000),
+        'sentiment_score': rng.uniform(-1, 1, 20_000),
+    })
+    by_bank = build_sketches(df, by=['bank_name', 'theme']).rollup('bank_name')
+
+    assert by_bank.cells['count'].tolist() == df.groupby('bank_name').size().tolist()
+    for bank, sketch in zip(by_bank.cells['bank_name'], by_bank.sketches):
+        scores = df.loc[df['bank_name'] == bank, 'sentiment_score'].to_numpy()
+        assert _rank_errors(sketch, scores).max() < RANK_TOLERANCE
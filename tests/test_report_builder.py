@@ -0,0 +1,23 @@
+"""Tests for src.report_builder figure hashing."""
+
+import importlib
+import sys
+
+import src.report_builder as report_builder
+from src.report_builder import ReportBuilder
+
+
+def test_figure_hash_covers_helper_modules(offline_nltk, tmp_path, monkeypatch):
+    helper = tmp_path / 'report_helper.py'
+    helper.write_text("def box_stats():\n    return 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(report_builder, 'PLOTTING_MODULES',
+                        report_builder.PLOTTING_MODULES + ('report_helper',))
+    builder = ReportBuilder(str(tmp_path))
+
+    before = builder.figure_hash('plot_theme_distribution', 'data')
+    assert builder.figure_hash('plot_theme_distribution', 'data') == before
+
+    helper.write_text("def box_stats():\n    return 2\n")
+    importlib.reload(sys.modules['report_helper'])
+    assert builder.figure_hash('plot_theme_distribution', 'data') != before
@@ -0,0 +1,85 @@
+"""Tests for src.text_preprocessing (PreprocessingStage, LemmaCache) and their use by ThemeAnalyzer."""
+
+import pandas as pd
+import pytest
+
+from src.config import DATA_PATHS
+from src.text_preprocessing import LemmaCache, PreprocessingStage
+from src.theme_analysis import ThemeAnalyzer
+from tests.conftest import FakeLemmatizer
+
+
+@pytest.fixture
+def stage_path(monkeypatch, tmp_path):
+    path = str(tmp_path / 'stage.npz')
+    monkeypatch.setitem(DATA_PATHS, 'preprocessed_tokens', path)
+    return path
+
+
+def _reviews(ids, texts):
+    return pd.DataFrame({'review_id': ids, 'review_text': texts})
+
+
+FIRST = _reviews(['a1', 'a2', 'a3'], ['Transfers failing again', 'Login codes never arrive', 'Great app'])
+SECOND = _reviews(['b1', 'b2'], ['Slow loading screens', 'Fees are too high'])
+
+
+def test_run_merges_datasets(offline_nltk, stage_path):
+    stage = PreprocessingStage(n_jobs=1)
+    first = stage.run(FIRST).attach(FIRST, variant='lda')['clean_text'].tolist()
+    stage.run(SECOND)
+
+    assert len(stage) == len(FIRST) + len(SECOND)
+    assert (stage.positions(FIRST) >= 0).all()
+    assert stage.attach(FIRST, variant='lda')['clean_text'].tolist() == first
+    assert first[0] == 'transfer fail again'
+
+
+def test_rerun_processes_only_new_and_edited_reviews(offline_nltk, stage_path):
+    PreprocessingStage(n_jobs=1).run(pd.concat([FIRST, SECOND]))
+    n_tagged = len(offline_nltk)
+
+    edited = FIRST.assign(review_text=['Transfers failing again', 'Login works now', 'Great app'])
+    stage = PreprocessingStage(n_jobs=1).run(edited)
+
+    assert len(offline_nltk) == n_tagged + 1
+    assert len(stage) == len(FIRST) + len(SECOND)
+    assert stage.positions(FIRST).tolist()[1] == -1
+    assert (stage.positions(SECOND) >= 0).all()
+    assert stage.attach(edited, variant='theme')['clean_text'].tolist()[1] == 'login work now'
+
+
+def test_theme_analyzer_reads_stage_without_tagging(offline_nltk, stage_path, tmp_path):
+    PreprocessingStage(n_jobs=1).run(FIRST)
+    n_tagged = len(offline_nltk)
+    analyzer = ThemeAnalyzer(lemma_cache_path=str(tmp_path / 'lemmas.json'))
+
+    both = pd.concat([FIRST, SECOND], ignore_index=True)
+    before = analyzer.lemma_cache.hits + analyzer.lemma_cache.misses
+    cleaned = analyzer.clean_texts(both)
+
+    # Only the reviews missing from the stage are lemmatized, and nothing is tagged
+    lookups = analyzer.lemma_cache.hits + analyzer.lemma_cache.misses - before
+    assert lookups == sum(len(text.split()) for text in cleaned[len(FIRST):])
+    assert len(offline_nltk) == n_tagged
+    assert cleaned == analyzer.preprocess_texts(both['review_text'])
+
+
+def test_lemma_cache_evicts_least_recently_used(tmp_path):
+    cache = LemmaCache(FakeLemmatizer(), max_size=2)
+    cache.lemmatize('codes')
+    cache.lemmatize('fees')
+    cache.lemmatize('codes')   # hit: 'codes' becomes the most recently used
+    cache.lemmatize('loans')   # evicts 'fees'
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.lemmatize('codes')
+    cache.lemmatize('fees')
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    path = str(tmp_path / 'lemmas.json')
+    cache.save(path)
+    reloaded = LemmaCache(FakeLemmatizer(), max_size=1, path=path)
+    assert len(reloaded) == 1
+    reloaded.lemmatize('fees')
+    assert reloaded.hits == 1
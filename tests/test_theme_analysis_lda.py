@@ -0,0 +1,148 @@
+"""Tests for src.theme_analysis_lda: DTM reuse between tuning and fitting, hashed vectorizer."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+import src.theme_analysis_lda as lda
+from src.config import DATA_PATHS
+
+WORDS = ['login', 'otp', 'transfer', 'fee', 'slow', 'crash', 'update', 'balance',
+         'support', 'branch', 'loan', 'card', 'screen', 'error', 'fast', 'easy']
+
+
+@pytest.fixture
+def reviews():
+    rng = np.random.default_rng(0)
+    banks = np.repeat(['CBE', 'Abyssinia', 'Dashen'], 60)
+    texts = [' '.join(rng.choice(WORDS, 8)) for _ in banks]
+    return pd.DataFrame({'bank_name': banks, 'review_text': texts, 'clean_text': texts})
+
+
+@pytest.fixture
+def analyzer(offline_nltk, monkeypatch, tmp_path, reviews):
+    """ThemeAnalyzerLDA reading `reviews` (already clean) and counting vectorizer fits."""
+    monkeypatch.setattr(lda.ThemeAnalyzerLDA, 'preprocess_texts', lambda self, texts: list(texts))
+    monkeypatch.setitem(DATA_PATHS, 'sentiment_results_twitter', str(tmp_path / 'reviews.csv'))
+    monkeypatch.setitem(DATA_PATHS, 'theme_results_lda', str(tmp_path / 'themes.csv'))
+    reviews[['bank_name', 'review_text']].to_csv(tmp_path / 'reviews.csv', index=False)
+
+    fits = []
+
+    class CountingVectorizer(CountVectorizer):
+        def fit_transform(self, raw_documents, y=None):
+            fits.append(self.get_params())
+            return super().fit_transform(raw_documents, y)
+
+    monkeypatch.setattr(lda, 'CountVectorizer', CountingVectorizer)
+    analyzer = lda.ThemeAnalyzerLDA(n_topics=2)
+    analyzer.fits = fits
+    return analyzer
+
+
+def test_run_analysis_reuses_tuning_dtm(analyzer, reviews):
+    analyzer.find_optimal_topics(reviews, topic_range=range(2, 4), n_jobs=1)
+    assert len(analyzer.fits) == 3
+
+    analyzer.run_analysis(map_themes=False)
+    assert len(analyzer.fits) == 3
+
+
+def test_run_analysis_reuses_search_winner_dtm(analyzer, reviews):
+    analyzer.find_optimal_topics(reviews, topic_range=range(2, 4), n_jobs=1)
+    results = analyzer.search_hyperparameters(reviews, n_configs=6, max_iter=1, n_jobs=1)
+    n_fits = len(analyzer.fits)
+
+    analyzer.run_analysis(params_per_bank={bank: r['params'] for bank, r in results.items()},
+                          map_themes=False)
+    assert len(analyzer.fits) == n_fits
+
+
+def test_run_analysis_refits_search_winner_with_its_pass_count(analyzer, reviews, monkeypatch):
+    results = analyzer.search_hyperparameters(reviews, n_configs=3, min_iter=1, max_iter=3, n_jobs=1)
+    fitted = []
+    fit_topic_model = lda._fit_topic_model
+    monkeypatch.setattr(lda, '_fit_topic_model',
+                        lambda dtm, n, engine='lda', **params: fitted.append(params)
+                        or fit_topic_model(dtm, n, engine, **params))
+
+    analyzer.run_analysis(params_per_bank={bank: r['params'] for bank, r in results.items()})
+    # Winners were selected at 3 passes, not the engine default of 10
+    assert [p['max_iter'] for p in fitted] == [r['n_iter'] for r in results.values()] == [3] * 3
+
+
+def test_dtm_cache_bounded_per_bank(analyzer, reviews):
+    texts = reviews.loc[reviews['bank_name'] == 'CBE', 'clean_text']
+    for min_df in (1, 2, 3):
+        analyzer._vectorize(texts, min_df=min_df, bank='CBE')
+    analyzer._vectorize(texts, bank='Dashen')
+
+    assert len(analyzer._dtm_cache['CBE']) == lda.DTM_CACHE_SIZE
+    assert len(analyzer._dtm_cache['Dashen']) == 1
+
+
+@pytest.mark.parametrize('min_df, max_df', [(2, 0.95), (0.05, 0.5), (3, 40)])
+def test_hashed_vectorizer_thresholds_match_count_vectorizer(reviews, min_df, max_df):
+    texts = reviews['clean_text'].tolist()[:100]
+    # Rare terms (3-4 documents each) sit between the absolute and proportional thresholds
+    texts = [' '.join(t.split()[:3 + i % 5]) + f' rare{i % 30}' for i, t in enumerate(texts)]
+    count = CountVectorizer(min_df=min_df, max_df=max_df, ngram_range=(1, 1)).fit(texts)
+    hashed = lda.HashedTermVectorizer(n_features=2 ** 16, min_df=min_df, max_df=max_df,
+                                      ngram_range=(1, 1)).fit(texts)
+
+    assert sorted(hashed.get_feature_names_out()) == sorted(count.get_feature_names_out())
+
+
+def test_topic_matcher_lemmatizes_keywords_like_features(offline_nltk):
+    analyzer = lda.ThemeAnalyzerLDA()
+    # 'confusing' is tagged as a verb, so the LDA features hold its verb lemma
+    feature = analyzer.preprocess_texts(['confusing'])[0]
+    ui = analyzer.theme_analyzer.matcher.themes.index('User Interface (UI/UX)')
+
+    assert analyzer.topic_matcher.score_matrix([feature])[0, ui] == 1
+    assert analyzer.theme_analyzer.matcher.score_matrix([feature])[0, ui] == 0
+
+
+def test_run_analysis_maps_themes_only_on_request(analyzer, tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, 'topic_theme_mapping', str(tmp_path / 'mapping.csv'))
+
+    assert 'theme' not in analyzer.run_analysis().columns
+    assert not (tmp_path / 'mapping.csv').exists()
+
+    assert analyzer.run_analysis(map_themes=True)['theme'].notna().all()
+    assert (tmp_path / 'mapping.csv').exists()
+
+
+@pytest.fixture
+def bank_reviews(reviews):
+    bank_df = reviews[reviews['bank_name'] == 'CBE'].reset_index(drop=True)
+    return bank_df.assign(review_id=[f'r{i}' for i in range(len(bank_df))])
+
+
+def test_incremental_update_absorbs_edited_reviews(offline_nltk, tmp_path, bank_reviews):
+    analyzer = lda.ThemeAnalyzerLDA(n_topics=2, model_dir=str(tmp_path / 'models'))
+    analyzer._update_bank_model('CBE', bank_reviews)
+
+    edited = bank_reviews.copy()
+    edited.loc[0, ['review_text', 'clean_text']] = 'otp login error otp'
+    analyzer._update_bank_model('CBE', edited)
+    state = analyzer.load_bank_model('CBE')
+    assert (state['n_updates'], state['n_reviews']) == (1, len(bank_reviews) + 1)
+
+    analyzer._update_bank_model('CBE', edited)
+    assert analyzer.load_bank_model('CBE')['n_updates'] == 1
+
+
+def test_incremental_update_refits_on_new_params(offline_nltk, tmp_path, bank_reviews):
+    analyzer = lda.ThemeAnalyzerLDA(n_topics=2, model_dir=str(tmp_path / 'models'))
+    analyzer._update_bank_model('CBE', bank_reviews, params={'learning_decay': 0.7})
+    first = analyzer.load_bank_model('CBE')['version']
+
+    analyzer._update_bank_model('CBE', bank_reviews, params={'learning_decay': 0.7})
+    assert analyzer.load_bank_model('CBE')['version'] == first
+
+    analyzer._update_bank_model('CBE', bank_reviews, params={'learning_decay': 0.5})
+    state = analyzer.load_bank_model('CBE')
+    assert state['version'] == first + 1
+    assert state['params'] == {'learning_decay': 0.5}
@@ -0,0 +1,38 @@
+"""Tests for src.topic_inference.TopicInference."""
+
+import pytest
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+
+from src.topic_inference import PREDICTION_COLUMNS, TopicInference, TopicModelRegistry
+
+TEXTS = ['otp login error', 'transfer fee high', 'login otp code', 'fee transfer slow'] * 5
+
+
+@pytest.fixture
+def inference(tmp_path):
+    registry = TopicModelRegistry(str(tmp_path))
+    vectorizer = CountVectorizer()
+    lda = LatentDirichletAllocation(n_components=2, random_state=0).fit(vectorizer.fit_transform(TEXTS))
+    registry.save('CBE', {'vectorizer': vectorizer, 'lda': lda, 'n_topics': 2})
+    return TopicInference(registry, preprocess=list)
+
+
+def test_predict(inference):
+    result = inference.predict('CBE', ['otp login', 'fee transfer'])
+
+    assert list(result.columns) == PREDICTION_COLUMNS
+    assert len(result) == 2
+    assert result['identified_topic'].str.startswith('CBE_Topic_').all()
+
+
+def test_predict_empty_input(inference):
+    result = inference.predict('CBE', [])
+
+    assert list(result.columns) == PREDICTION_COLUMNS
+    assert result.empty
+
+
+def test_predict_unknown_bank(inference):
+    with pytest.raises(KeyError):
+        inference.predict('Dashen', [])